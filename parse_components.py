@@ -1,40 +1,73 @@
-import json, sys
-from collections import defaultdict
+import argparse
+import json
+import sys
+from pathlib import Path
 
-data = json.load(open(sys.argv[1]))
-components = data.get('components', [])
-print(f'Total components: {len(components)}\n')
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scripts'))
+from inventory_snapshot import load_inventory
+from variant_matrix import VariantMatrix
 
-by_page = defaultdict(list)
-for c in components:
-    page = c.get('pageName', 'Unknown')
-    by_page[page].append(c)
+# How many missing / duplicate combinations to print per set
+SHOW = 5
 
-for page in sorted(by_page.keys()):
-    comps = by_page[page]
-    print(f'=== {page} ({len(comps)} components) ===')
-    sets = defaultdict(list)
-    standalone = []
-    for c in comps:
-        cs = c.get('componentSetName')
-        if cs:
-            sets[cs].append(c)
-        else:
-            standalone.append(c)
+parser = argparse.ArgumentParser(description='Summarize a Figma component inventory by page and component set.')
+parser.add_argument('inventory', help='inventory dump (components, meta.components or result.items)')
+parser.add_argument('--json', dest='json_out', type=Path, help='write the per-set variant matrices as JSON')
+args = parser.parse_args()
+
+# page -> (component count, {set name: (VariantMatrix, first variant)}, [standalone summaries])
+pages = {}
+total = 0
+for c in load_inventory(args.inventory):
+    total += 1
+    page = c.page or 'Unknown'
+    if page not in pages:
+        pages[page] = [0, {}, []]
+    entry = pages[page]
+    entry[0] += 1
+    cs = c.set_name
+    if cs:
+        if cs not in entry[1]:
+            first = {k: '?' if getattr(c, k) is None else getattr(c, k) for k in ('width', 'height', 'id')}
+            entry[1][cs] = (VariantMatrix(cs), first)
+        entry[1][cs][0].add(c.props, c.id)
+    else:
+        entry[2].append(tuple('?' if v is None else v for v in (c.name, c.width, c.height, c.id)))
+
+print(f'Total components: {total}\n')
+
+report = []
+for page in sorted(pages.keys()):
+    count, sets, standalone = pages[page]
+    print(f'=== {page} ({count} components) ===')
     for name in sorted(sets.keys()):
-        variants = sets[name]
-        print(f'  ComponentSet: {name} ({len(variants)} variants)')
-        if variants:
-            v = variants[0]
-            props = v.get('variantProperties', {})
-            if props:
-                keys = list(props.keys())
-                print(f'    Variant axes: {keys}')
-                for key in keys:
-                    vals = sorted(set(vv.get('variantProperties',{}).get(key,'') for vv in variants))
-                    print(f'      {key}: {vals}')
-            print(f'    Size: {v.get("width","?")}x{v.get("height","?")}')
-            print(f'    ID: {v.get("id","?")}')
-    for c in standalone:
-        print(f'  Component: {c.get("name","?")} ({c.get("width","?")}x{c.get("height","?")}) id={c.get("id","?")}')
+        matrix, first = sets[name]
+        print(f'  ComponentSet: {name} ({len(matrix)} variants)')
+        cardinality = matrix.cardinality()
+        if cardinality:
+            print(f'    Variant axes: {list(cardinality)}')
+            for key, vals in matrix.axis_values().items():
+                print(f'      {key}: {vals}  ({cardinality[key]})')
+            present = matrix.present_count()
+            combos = matrix.combinations
+            duplicates = matrix.duplicates()
+            print(f'    Matrix: {present}/{combos} combinations, '
+                  f'{combos - present} missing, {len(duplicates)} duplicated')
+            for i, combo in enumerate(matrix.iter_missing()):
+                if i == SHOW:
+                    print(f'      … {combos - present - SHOW} more missing')
+                    break
+                print(f'      missing: {combo}')
+            for combo, ids in duplicates[:SHOW]:
+                print(f'      duplicate: {combo} ids={ids}')
+        print(f'    Size: {first["width"]}x{first["height"]}')
+        print(f'    ID: {first["id"]}')
+        if args.json_out:
+            report.append({'page': page, 'id': first['id'], **matrix.to_json()})
+    for name, width, height, node_id in standalone:
+        print(f'  Component: {name} ({width}x{height}) id={node_id}')
     print()
+
+if args.json_out:
+    args.json_out.write_text(json.dumps({'totalComponents': total, 'componentSets': report}, indent=2))
+    print(f'Wrote {len(report)} component set matrices to {args.json_out}')
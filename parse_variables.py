@@ -1,7 +1,19 @@
 import json, sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scripts'))
+from variable_aliases import AliasResolver, payload_meta, rgba_to_css_one
 
 data = json.load(open(sys.argv[1]))
-meta = data.get('meta', {})
+meta = payload_meta(data)
+resolver = AliasResolver(meta)
+
+
+def css_color(val):
+    rgba = [val.get('r', 0), val.get('g', 0), val.get('b', 0), val.get('a', 1)]
+    return rgba_to_css_one(rgba)
+
+
 collections = meta.get('variableCollections', {})
 variables = meta.get('variables', {})
 print(f'Total collections: {len(collections)}')
@@ -23,13 +35,14 @@ for cid, coll in collections.items():
         for mid, val in values.items():
             if isinstance(val, dict):
                 if 'r' in val:
-                    r = val.get('r', 0)
-                    g = val.get('g', 0)
-                    b = val.get('b', 0)
-                    vals_summary[mid] = f'#{int(r*255):02x}{int(g*255):02x}{int(b*255):02x}'
+                    vals_summary[mid] = css_color(val)
                 elif 'id' in val:
-                    target = variables.get(val['id'], {}).get('name', val['id'])
-                    vals_summary[mid] = f'-> {target}'
+                    res = resolver.resolve(vid, mid)
+                    chain = ' -> '.join(resolver.name(ref) for ref in res.aliasChain[1:])
+                    final = res.value
+                    if isinstance(final, dict) and 'r' in final:
+                        final = css_color(final)
+                    vals_summary[mid] = f'-> {chain} = {final}' if res.reason == 'resolved' else f'-> {chain} ({res.reason})'
                 else:
                     vals_summary[mid] = str(val)
             else:
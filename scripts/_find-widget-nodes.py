@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 """Find ecommerce widget component node IDs in V2 Figma file."""
-import json, sys
+import sys
 
-data = json.load(sys.stdin)
-comps = data.get("meta", {}).get("components", [])
+from inventory_snapshot import load_inventory
+
+# A path argument uses the cached snapshot; stdin is streamed
+comps = load_inventory(sys.argv[1] if len(sys.argv) > 1 else "-")
 
 keywords = [
     "widget", "cart", "product", "checkout", "wishlist",
@@ -11,14 +13,11 @@ keywords = [
 ]
 
 for c in comps:
-    name = c.get("name", "")
-    frame = c.get("containing_frame", {})
-    page = frame.get("pageName", "")
-    frame_name = frame.get("name", "")
-    node_id = c.get("node_id", "")
-    cset_name = ""
-    if frame.get("containingComponentSet"):
-        cset_name = frame["containingComponentSet"].get("name", "")
+    name = c.name or ""
+    page = c.page or ""
+    frame_name = c.frame or ""
+    node_id = c.id or ""
+    cset_name = c.set_name or ""
 
     searchable = f"{name} {page} {frame_name} {cset_name}".lower()
     if any(kw in searchable for kw in keywords):
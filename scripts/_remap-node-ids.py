@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 """Replace V1 node IDs with V2 component node IDs in Code Connect files."""
-import os
+import argparse
 
-os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from node_id_rewriter import add_walk_arguments, load_mapping, report, rewrite_tree
 
-# V1 -> V2 node ID mapping
+# V1 -> V2 node ID mapping (used when no --mapping file is given)
 mapping = {
     "3068:13907": "5007:4606",  # ProductGrid
     "3068:14121": "5007:4605",  # ProductCard
@@ -20,39 +20,21 @@ mapping = {
     "3068:14087": "5007:4667",  # Wishlist
 }
 
-# Also map hyphenated versions (used in URLs)
-mapping_hyphen = {k.replace(":", "-"): v.replace(":", "-") for k, v in mapping.items()}
-
-
-def replace_in_file(filepath):
-    with open(filepath, "r") as f:
-        content = f.read()
-    original = content
-    for old, new in mapping.items():
-        content = content.replace(old, new)
-    for old, new in mapping_hyphen.items():
-        content = content.replace(old, new)
-    if content != original:
-        with open(filepath, "w") as f:
-            f.write(content)
-        return True
-    return False
-
-
-# Update .figma.tsx files
-tsx_dir = "figma/code-connect/components"
-for fname in sorted(os.listdir(tsx_dir)):
-    if fname.endswith(".figma.tsx"):
-        path = os.path.join(tsx_dir, fname)
-        changed = replace_in_file(path)
-        print(f"  {fname}: {'UPDATED' if changed else 'no change'}")
-
-# Update mappings JSONs
-for fname in [
+# Code Connect files and mappings JSONs; pass --include to widen (e.g. --include '*')
+CODE_CONNECT = [
+    "figma/code-connect/components/*.figma.tsx",
     "figma/code-connect/mappings.source.json",
     "figma/code-connect/mappings.generated.json",
-]:
-    changed = replace_in_file(fname)
-    print(f"  {os.path.basename(fname)}: {'UPDATED' if changed else 'no change'}")
-
-print("Done!")
+]
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("--mapping", help="JSON mapping file instead of the built-in V1 -> V2 table")
+add_walk_arguments(parser)
+args = parser.parse_args()
+
+if args.mapping:
+    mapping = load_mapping(args.mapping)
+# Both the colon form and the hyphenated form (used in URLs) are rewritten
+exclude = args.exclude + ["scripts/_remap-node-ids.py"]  # keep the table above intact
+changed = rewrite_tree(args.root, mapping, args.include or CODE_CONNECT, exclude, args.jobs, args.dry_run)
+report(changed, args.root, args.dry_run)
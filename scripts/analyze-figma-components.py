@@ -4,25 +4,29 @@ import json
 import sys
 from collections import Counter
 
-INPUT_FILE = sys.argv[1] if len(sys.argv) > 1 else '/Users/kari.basavaraj.k.m/Library/Application Support/Code/User/workspaceStorage/cb51544ffd997adb9291227b28cfe4bf/GitHub.copilot-chat/chat-session-resources/b28cb6fd-c412-4fc1-9f84-b39660392047/toolu_vrtx_01EC92ENgz1omHQXt5KFHN4y__vscode-1772368644767/content.json'
-
-with open(INPUT_FILE) as f:
-    data = json.load(f)
+from inventory_snapshot import load_inventory
 
-result = data.get('result', data)
-if isinstance(result, str):
-    result = json.loads(result)
-
-print(f"Component Sets: {result.get('totalComponentSets')}")
-print(f"Standalone Components: {result.get('totalStandaloneComponents')}")
-print()
-
-items = result.get('items', [])
+INPUT_FILE = sys.argv[1] if len(sys.argv) > 1 else '/Users/kari.basavaraj.k.m/Library/Application Support/Code/User/workspaceStorage/cb51544ffd997adb9291227b28cfe4bf/GitHub.copilot-chat/chat-session-resources/b28cb6fd-c412-4fc1-9f84-b39660392047/toolu_vrtx_01EC92ENgz1omHQXt5KFHN4y__vscode-1772368644767/content.json'
 
-# Group by parent
+# Normalized records (parentName → frame, variantCount → variants), snapshot-cached
+inventory = load_inventory(INPUT_FILE)
+fields = inventory.fields
 parents = Counter()
-for item in items:
-    parents[item['parentName']] += 1
+sets = []
+standalone = []
+for item in inventory:
+    parents[item.frame] += 1
+    row = {'id': item.id, 'name': item.name, 'variantCount': item.variants,
+           'parentName': item.frame, 'description': item.description}
+    if item.type == 'COMPONENT_SET':
+        sets.append(row)
+    elif item.type == 'COMPONENT':
+        del row['variantCount']
+        standalone.append(row)
+
+print(f"Component Sets: {fields.get('totalComponentSets')}")
+print(f"Standalone Components: {fields.get('totalStandaloneComponents')}")
+print()
 
 print("--- By parent section ---")
 for name, count in parents.most_common(40):
@@ -30,13 +34,11 @@ for name, count in parents.most_common(40):
 
 print()
 print("--- All component sets (DS primitives) ---")
-sets = [i for i in items if i['type'] == 'COMPONENT_SET']
 for s in sorted(sets, key=lambda x: x['name']):
     print(f"  {s['name']} (id={s['id']}, variants={s['variantCount']}, parent={s['parentName']})")
 
 print()
 print("--- Standalone components (not in a set) ---")
-standalone = [i for i in items if i['type'] == 'COMPONENT']
 for s in sorted(standalone, key=lambda x: x['name']):
     print(f"  {s['name']} (id={s['id']}, parent={s['parentName']})")
 
@@ -1,36 +1,21 @@
 #!/usr/bin/env python3
 """Batch embed product images into all Figma widget emoji nodes."""
+import argparse
+import base64
+import collections
+import hashlib
 import json
 import os
-import subprocess
-import sys
+import time
 from pathlib import Path
 
-REPO_ROOT = Path(__file__).resolve().parents[1]
-
+from foxy_bridge import BridgeError, BridgePool, resolve_foxy_tool, wait_result
+from foxy_result import ResultError, is_success, tool_data, tool_payload
 
-def resolve_foxy_tool():
-    explicit = os.environ.get("FOXY_TOOL_CALL")
-    if explicit:
-        p = Path(explicit).expanduser().resolve()
-        if p.exists():
-            return p
-        raise FileNotFoundError(f"FOXY_TOOL_CALL does not exist: {p}")
-
-    foxy_root = os.environ.get("FOXY_ROOT")
-    if foxy_root:
-        p = Path(foxy_root).expanduser().resolve() / "scripts" / "foxy-tool-call.mjs"
-        if p.exists():
-            return p
-        raise FileNotFoundError(f"FOXY_ROOT configured but tool missing: {p}")
-
-    sibling = (REPO_ROOT.parent / "foxy-design-system-master" / "scripts" / "foxy-tool-call.mjs").resolve()
-    if sibling.exists():
-        return sibling
-
-    raise FileNotFoundError(
-        "Unable to resolve foxy-tool-call.mjs. Set FOXY_TOOL_CALL or FOXY_ROOT."
-    )
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = REPO_ROOT / ".figma-cache"
+DEFAULT_JOURNAL = CACHE_DIR / "embed-journal.jsonl"
+IMAGE_HASH_CACHE = CACHE_DIR / "image-hashes.json"
 
 
 def resolve_image_dir():
@@ -49,7 +34,6 @@ def resolve_image_dir():
 
 
 FOXY_TOOL = resolve_foxy_tool()
-FOXY_DIR = FOXY_TOOL.parent.parent
 IMG_DIR = resolve_image_dir()
 
 # Emoji → product image file mapping
@@ -149,64 +133,370 @@ EMBED_TARGETS = [
     ("3039:8684", "👟", "Dark > Product Detail"),
 ]
 
-def embed_image(node_id, image_path, context):
+def resolve_image(emoji, context):
+    if emoji == "👟":
+        return resolve_shoe_image(context)
+    return EMOJI_TO_IMAGE.get(emoji)
+
+
+def submit_embed(bridge, node_id, image_path):
+    """Queue an embed on the bridge; returns a Future for the RESULT."""
+    return bridge.submit("embed_image_in_node", {
+        "nodeId": node_id,
+        "imagePath": image_path,
+        "removePlaceholderText": True,
+    })
+
+
+def embed_outcome(fut):
+    """Wait for a queued embed and return (ok, message)."""
+    try:
+        inner = tool_payload(wait_result(fut, "embed_image_in_node"))
+    except (BridgeError, ResultError) as exc:
+        return False, str(exc)
+    if inner.get("success"):
+        return True, inner.get("data", "OK")
+    return False, inner.get("data", "unknown error")
+
+
+def embed_image(bridge, node_id, image_path, context):
     """Embed an image into a Figma node."""
-    result = subprocess.run(
-        ["node", str(FOXY_TOOL)],
-        capture_output=True, text=True,
-        cwd=str(FOXY_DIR),
-        env={
-            **os.environ,
-            "JOIN_CHANNEL": os.environ.get("JOIN_CHANNEL", "default"),
-            "TOOL": "embed_image_in_node",
-            "ARGS": json.dumps({
-                "nodeId": node_id,
-                "imagePath": image_path,
-                "removePlaceholderText": True,
-            }),
-        },
-        timeout=30,
+    return embed_outcome(submit_embed(bridge, node_id, image_path))
+
+
+# ── Content-addressed uploads ─────────────────────────────────────────
+# Each distinct image file is uploaded once per Figma document via
+# figma.createImage; nodes then get an IMAGE fill by hash. The sha256 of the
+# file → Figma image hash mapping is cached per document on disk.
+#
+# The base64 travels inside the code string, and a tool call's ARGS must stay
+# under the 128 KiB environment string limit, so larger images are staged in
+# figma.clientStorage in UPLOAD_CHUNK pieces and assembled by the last call.
+
+UPLOAD_CHUNK = 64 * 1024
+
+# Document names are not unique; without a file key there is no safe cache key
+DOCUMENT_KEY_CODE = """
+if (!figma.fileKey) throw new Error("figma.fileKey unavailable");
+return figma.fileKey;
+"""
+
+UPLOAD_CODE = """
+const image = figma.createImage(figma.base64Decode(%s));
+return image.hash;
+"""
+
+STAGE_CODE = """
+await figma.clientStorage.setAsync(%(key)s, %(chunk)s);
+return %(index)d;
+"""
+
+ASSEMBLE_CODE = """
+const parts = [];
+for (let i = 0; i < %(count)d; i++) {
+  const key = %(prefix)s + i;
+  parts.push(await figma.clientStorage.getAsync(key));
+  await figma.clientStorage.deleteAsync(key);
+}
+if (parts.some((p) => typeof p !== "string")) throw new Error("Upload chunk missing for " + %(prefix)s);
+const image = figma.createImage(figma.base64Decode(parts.join("")));
+return image.hash;
+"""
+
+FILL_CODE = """
+const node = await figma.getNodeByIdAsync(%(node_id)s);
+if (!node || !("fills" in node)) throw new Error("Cannot fill node " + %(node_id)s);
+if (!figma.getImageByHash(%(image_hash)s)) return JSON.stringify({ missing: true });
+node.fills = [{ type: "IMAGE", imageHash: %(image_hash)s, scaleMode: "FILL" }];
+if ("children" in node) {
+  for (const child of [...node.children]) if (child.type === "TEXT") child.remove();
+}
+return JSON.stringify({ nodeId: node.id, imageHash: %(image_hash)s });
+"""
+
+
+def figma_code_data(fut, what):
+    """Return the execute_figma_code value of a queued call, or raise BridgeError."""
+    inner = tool_payload(wait_result(fut, "execute_figma_code"))
+    if not is_success(inner):
+        raise BridgeError(f"{what} failed: {inner.get('data') or inner.get('error')}")
+    return tool_data(inner)
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ImageHashCache:
+    """sha256(file) → Figma image hash, per document, persisted as JSON."""
+
+    def __init__(self, path, document):
+        self.path = path
+        self.document = document
+        self.all = json.loads(path.read_text()) if path.exists() else {}
+        self.hashes = self.all.setdefault(document, {})
+        self.digests = {}
+        self.refreshed = set()
+        self.uploaded_bytes = 0
+        self.uploads = 0
+
+    def digest(self, image_path):
+        if image_path not in self.digests:
+            self.digests[image_path] = file_digest(image_path)
+        return self.digests[image_path]
+
+    def get(self, image_path):
+        return self.hashes.get(self.digest(image_path))
+
+    def upload(self, bridge, image_paths):
+        """Upload every image not yet known for this document, concurrently.
+
+        Returns {image path: error} for the images that could not be uploaded;
+        their nodes are embedded by path instead.
+        """
+        missing = {}
+        for image_path in image_paths:
+            digest = self.digest(image_path)
+            if digest not in self.hashes and digest not in missing:
+                missing[digest] = image_path
+        staged, errors = [], {}
+        for digest, image_path in missing.items():
+            try:
+                data = Path(image_path).read_bytes()
+            except OSError as exc:
+                errors[image_path] = str(exc)
+                continue
+            encoded = base64.b64encode(data).decode("ascii")
+            chunks = [encoded[i:i + UPLOAD_CHUNK] for i in range(0, len(encoded), UPLOAD_CHUNK)] or [""]
+            if len(chunks) == 1:
+                staged.append((digest, image_path, len(data), [], UPLOAD_CODE % json.dumps(encoded)))
+                continue
+            prefix = f"upload:{digest}:"
+            futures = [
+                bridge.submit("execute_figma_code", {
+                    "code": STAGE_CODE % {"key": json.dumps(prefix + str(i)), "chunk": json.dumps(chunk), "index": i},
+                })
+                for i, chunk in enumerate(chunks)
+            ]
+            code = ASSEMBLE_CODE % {"count": len(chunks), "prefix": json.dumps(prefix)}
+            staged.append((digest, image_path, len(data), futures, code))
+
+        pending = []
+        for digest, image_path, size, chunk_futures, code in staged:
+            what = f"upload {os.path.basename(image_path)}"
+            try:
+                for fut in chunk_futures:
+                    figma_code_data(fut, what)
+            except (BridgeError, ResultError) as exc:
+                errors[image_path] = str(exc)
+                continue
+            pending.append((digest, image_path, size, what, bridge.submit("execute_figma_code", {"code": code})))
+        for digest, image_path, size, what, fut in pending:
+            try:
+                self.hashes[digest] = figma_code_data(fut, what)
+            except (BridgeError, ResultError) as exc:
+                errors[image_path] = str(exc)
+                continue
+            self.uploaded_bytes += size
+            self.uploads += 1
+        self.save()
+        return errors
+
+    def refresh(self, bridge, image_path):
+        """Re-upload an image whose cached hash the document no longer has (once per run)."""
+        digest = self.digest(image_path)
+        if digest in self.refreshed:
+            return
+        self.refreshed.add(digest)
+        self.hashes.pop(digest, None)
+        errors = self.upload(bridge, [image_path])
+        if errors:
+            raise BridgeError(errors[image_path])
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.all, indent=2, sort_keys=True))
+        os.replace(tmp, self.path)
+
+
+def submit_fill(bridge, node_id, image_hash):
+    """Queue an IMAGE fill by hash; returns a Future for the RESULT."""
+    code = FILL_CODE % {"node_id": json.dumps(node_id), "image_hash": json.dumps(image_hash)}
+    return bridge.submit("execute_figma_code", {"code": code})
+
+
+def fill_outcome(fut):
+    """Wait for a queued fill and return (ok, message); message "missing" means re-upload."""
+    try:
+        data = figma_code_data(fut, "fill")
+    except (BridgeError, ResultError) as exc:
+        return False, str(exc)
+    if isinstance(data, dict) and data.get("missing"):
+        return False, "missing"
+    return True, data
+
+
+def load_journal(path):
+    """Latest journal record per node ID (append-only JSONL, last write wins)."""
+    done = {}
+    if not path.exists():
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn final line from an interrupted run
+            done[rec["nodeId"]] = rec
+    return done
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "start_from", nargs="?", type=int, default=1,
+        help="1-based target index to start from (legacy; prefer the journal)",
+    )
+    parser.add_argument(
+        "-j", "--concurrency", type=int,
+        default=int(os.environ.get("EMBED_CONCURRENCY", "8")),
+        help="max embeds in flight (default: EMBED_CONCURRENCY or 8)",
+    )
+    parser.add_argument(
+        "--journal", type=Path, default=DEFAULT_JOURNAL,
+        help=f"append-only progress journal (default: {DEFAULT_JOURNAL.relative_to(REPO_ROOT)})",
+    )
+    parser.add_argument(
+        "--fresh", action="store_true",
+        help="ignore earlier journal entries and embed every target again",
     )
-    raw = result.stdout
-    idx = raw.find("RESULT ")
-    if idx >= 0:
-        obj = json.loads(raw[idx + 7:])
-        inner = json.loads(obj["content"][0]["text"])
-        if inner.get("success"):
-            return True, inner.get("data", "OK")
-        return False, inner.get("data", "unknown error")
-    return False, f"No RESULT in output: {raw[:200]}"
+    parser.add_argument(
+        "--no-image-cache", action="store_true",
+        help="send imagePath per node via embed_image_in_node instead of uploading once",
+    )
+    return parser.parse_args()
+
 
 def main():
-    start_from = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    args = parse_args()
     total = len(EMBED_TARGETS)
+    concurrency = max(1, args.concurrency)
+    journal = {} if args.fresh else load_journal(args.journal)
+    args.journal.parent.mkdir(parents=True, exist_ok=True)
+
     success = 0
     failed = 0
+    skipped = 0
+    filled = 0
+    started = time.monotonic()
+    # The pool's Node processes must go even on an exception or Ctrl-C
+    with BridgePool(tool_path=FOXY_TOOL, workers=concurrency) as bridge:
+        inflight = collections.deque()
+
+        todo = []
+        for i, (node_id, emoji, context) in enumerate(EMBED_TARGETS, 1):
+            if i < args.start_from:
+                continue
+            image_path = resolve_image(emoji, context)
+            if not image_path:
+                print(f"[{i}/{total}] SKIP {context} — no image for {emoji}")
+                continue
+
+            prev = journal.get(node_id)
+            if prev and prev.get("ok") and prev.get("image") == os.path.basename(image_path):
+                skipped += 1
+                continue
+            todo.append((i, node_id, context, image_path))
+
+        cache = None
+        if todo and not args.no_image_cache:
+            try:
+                document = figma_code_data(
+                    bridge.submit("execute_figma_code", {"code": DOCUMENT_KEY_CODE}), "document key"
+                )
+                cache = ImageHashCache(IMAGE_HASH_CACHE, str(document))
+            except (BridgeError, ResultError) as exc:
+                print(f"Image cache unavailable, embedding by path: {exc}")
+                cache = None
+        if cache:
+            errors = cache.upload(bridge, {image_path for _, _, _, image_path in todo})
+            for image_path, error in sorted(errors.items()):
+                print(f"Upload failed for {os.path.basename(image_path)}, embedding by path: {error}")
+
+        def submit(node_id, image_path):
+            """(filled by hash?, Future); images without a cached hash are embedded by path."""
+            image_hash = cache.get(image_path) if cache else None
+            if image_hash:
+                return True, submit_fill(bridge, node_id, image_hash)
+            return False, submit_embed(bridge, node_id, image_path)
+
+        def outcome(node_id, image_path, submitted):
+            """(ok, message, filled by hash?) of one node, after a retry if its hash went stale."""
+            by_hash, fut = submitted
+            if not by_hash:
+                return (*embed_outcome(fut), False)
+            ok, msg = fill_outcome(fut)
+            if msg == "missing":
+                # Cached hash is no longer in the document: upload again, retry once.
+                try:
+                    cache.refresh(bridge, image_path)
+                except BridgeError as exc:
+                    return False, str(exc), True
+                by_hash, fut = submit(node_id, image_path)
+                ok, msg = fill_outcome(fut) if by_hash else embed_outcome(fut)
+            return ok, msg, by_hash
+
+        def report(entry, log):
+            nonlocal success, failed, filled
+            i, node_id, context, image_path, submitted = entry
+            ok, msg, by_hash = outcome(node_id, image_path, submitted)
+            if ok:
+                success += 1
+                filled += by_hash
+            else:
+                failed += 1
+            log.write(json.dumps({
+                "nodeId": node_id,
+                "image": os.path.basename(image_path),
+                "ok": ok,
+                "message": msg if isinstance(msg, str) else json.dumps(msg),
+                "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }) + "\n")
+            log.flush()
+            status = "✅" if ok else "❌"
+            print(f"[{i}/{total}] {status} {context} ({node_id}) → {os.path.basename(image_path)}")
+            if not ok:
+                print(f"         Error: {msg}")
+
+        with open(args.journal, "a", encoding="utf-8") as log:
+            for i, node_id, context, image_path in todo:
+                # Bounded window: results are reported in list order, so wait on
+                # the oldest call before queueing another once the window is full.
+                if len(inflight) >= concurrency:
+                    report(inflight.popleft(), log)
+                inflight.append((i, node_id, context, image_path, submit(node_id, image_path)))
+
+            while inflight:
+                report(inflight.popleft(), log)
+
+    elapsed = time.monotonic() - started
+    print(
+        f"\nDone: {success} succeeded, {failed} failed, {skipped} already done "
+        f"out of {total} ({elapsed:.1f}s)"
+    )
+    if cache:
+        print(
+            f"Images: {cache.uploads} uploaded ({cache.uploaded_bytes / 1024:.0f} KB), "
+            f"{filled} nodes filled by hash, {success - filled} embedded by path"
+        )
+    if failed:
+        print(f"Rerun to retry failures; progress is kept in {args.journal}")
 
-    for i, (node_id, emoji, context) in enumerate(EMBED_TARGETS, 1):
-        if i < start_from:
-            continue
-        # Resolve image path
-        if emoji == "👟":
-            image_path = resolve_shoe_image(context)
-        else:
-            image_path = EMOJI_TO_IMAGE.get(emoji)
-
-        if not image_path:
-            print(f"[{i}/{total}] SKIP {context} — no image for {emoji}")
-            continue
-
-        ok, msg = embed_image(node_id, image_path, context)
-        status = "✅" if ok else "❌"
-        if ok:
-            success += 1
-        else:
-            failed += 1
-        print(f"[{i}/{total}] {status} {context} ({node_id}) → {os.path.basename(image_path)}")
-        if not ok:
-            print(f"         Error: {msg}")
-
-    print(f"\nDone: {success} succeeded, {failed} failed out of {total}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark peak memory of inventory_stream.iter_components() against json.load
+on a synthetic component dump.
+
+Run: python3 scripts/bench-inventory-stream.py [--components 1000000] [--shape meta]
+
+Each reader runs in its own child process that aggregates the dump the way
+parse_components.py does (components per page, variants per set) and reports
+its own peak RSS, so the numbers do not include the generator or each other.
+"""
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from inventory_stream import iter_components
+
+SHAPES = {
+    "components": ('{"components": [', ']}'),
+    "meta": ('{"status": 200, "error": false, "meta": {"components": [', ']}}'),
+    "items": ('{"result": {"totalComponentSets": 0, "items": [', ']}}'),
+}
+
+PAGES = ["Icons", "Primitives", "Widgets", "Cards", "Forms", "Navigation"]
+AXES = {"Size": ["Small", "Medium", "Large"], "State": ["Default", "Hover", "Disabled"]}
+
+
+def generate_dump(path, count, shape, seed=7):
+    """Write `count` component records without holding them in memory."""
+    rng = random.Random(seed)
+    head, tail = SHAPES[shape]
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write(head)
+        for i in range(count):
+            page = rng.choice(PAGES)
+            record = {
+                "node_id": f"{i // 1000}:{i % 1000}",
+                "name": f"Icon {i % 5000}/{rng.choice(['16', '24', '32'])}",
+                "pageName": page,
+                "containing_frame": {"name": rng.choice(["16", "24", "Primitives"]), "pageName": page},
+                "width": rng.choice([16, 24, 32]),
+                "height": rng.choice([16, 24, 32]),
+            }
+            if rng.random() < 0.6:
+                record["componentSetName"] = f"Set {i % 2000}"
+                record["variantProperties"] = {k: rng.choice(v) for k, v in AXES.items()}
+            if i:
+                fp.write(",")
+            fp.write(json.dumps(record, separators=(",", ":")))
+        fp.write(tail)
+
+
+def aggregate(records):
+    pages = Counter()
+    sets = Counter()
+    for c in records:
+        pages[c.get("pageName", "Unknown")] += 1
+        if c.get("componentSetName"):
+            sets[c["componentSetName"]] += 1
+    return len(pages), len(sets), sum(pages.values())
+
+
+def load_all(path):
+    with open(path, encoding="utf-8") as fp:
+        data = json.load(fp)
+    for key in ("meta", "result"):
+        if isinstance(data.get(key), dict):
+            data = data[key]
+    return data.get("components") or data.get("items") or []
+
+
+def child(mode, path):
+    started = time.perf_counter()
+    records = iter_components(path) if mode == "stream" else load_all(path)
+    pages, sets, total = aggregate(records)
+    elapsed = time.perf_counter() - started
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": elapsed, "peakMiB": peak_kib / 1024, "total": total, "sets": sets}))
+
+
+def run_child(mode, path):
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", mode, str(path)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--components", type=int, default=1_000_000)
+    parser.add_argument("--shape", choices=sorted(SHAPES), default="meta")
+    parser.add_argument("--skip-load", action="store_true", help="only measure the streaming reader")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "inventory.json"
+        generate_dump(path, args.components, args.shape)
+        size = path.stat().st_size
+        print(f"Dump: {args.components:,} components ({args.shape}), {size / 1e6:.1f} MB")
+
+        modes = ["stream"] if args.skip_load else ["json.load", "stream"]
+        results = {mode: run_child(mode, path) for mode in modes}
+        for mode, r in results.items():
+            print(f"  {mode:<10} {r['seconds']:7.1f} s  peak {r['peakMiB']:8.1f} MiB  "
+                  f"({r['total']:,} components, {r['sets']:,} sets)")
+        if len(results) == 2:
+            ratio = results["json.load"]["peakMiB"] / results["stream"]["peakMiB"]
+            print(f"  peak memory ratio {ratio:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Benchmark tokenize-widgets.py's single-pass scanner against the previous
+re.sub chain on a generated widget corpus.
+
+Run: python3 scripts/bench-tokenize-widgets.py [--files 400] [--rules 300] [--repeat 3]
+
+The chain applies the reviewed APPROVED map one entry at a time; the scanner
+must produce identical output on the corpus, and the run fails if it does not.
+"""
+import argparse
+import importlib.util
+import random
+import re
+import time
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent / "tokenize-widgets.py"
+
+
+def load_tokenizer():
+    spec = importlib.util.spec_from_file_location("tokenize_widgets", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Reviewed literal → token expectations for the corpus below, per role. The
+# scanner derives its tokens from variables.normalized.json; this map is what
+# it is expected to produce. A literal missing from a role stays hardcoded.
+# `-on-*` tokens are never chosen for a bare literal (#ffffff, #f5f5f5 and
+# #fee9e7 as text stay literal), and `-hover` tokens only inside :hover rules.
+APPROVED = {
+    "background": {
+        "#ffffff": "--sds-color-background-default-default",
+        "#f5f5f5": "--sds-color-background-default-secondary",
+        "#2c2c2c": "--sds-color-background-brand-default",
+        "#eb221e": "--sds-color-background-danger-default",
+        "#fee9e7": "--sds-color-background-danger-tertiary",
+        "#ebffee": "--sds-color-background-positive-tertiary",
+        "#e5e5e5": "--sds-color-background-brand-secondary",
+        "#d9d9d9": "--sds-color-background-default-tertiary",
+        "#14ae5c": "--sds-color-background-positive-default",
+        "rgba(0, 0, 0, 0.5)": "--sds-color-background-utilities-overlay",
+    },
+    "hover": {
+        "#f5f5f5": "--sds-color-background-default-default-hover",
+        "#d9d9d9": "--sds-color-background-brand-secondary-hover",
+        "#1e1e1e": "--sds-color-background-brand-hover",
+        "#b3b3b3": "--sds-color-background-default-tertiary-hover",
+    },
+    "text": {
+        "#2c2c2c": "--sds-color-text-brand-default",
+        "#eb221e": "--sds-color-text-danger-tertiary",
+        "#1e1e1e": "--sds-color-text-default-default",
+        "#757575": "--sds-color-text-default-secondary",
+        "#b3b3b3": "--sds-color-text-default-tertiary",
+        "#900b09": "--sds-color-text-danger-default",
+        "#02542d": "--sds-color-text-positive-default",
+        "#14ae5c": "--sds-color-text-positive-tertiary",
+    },
+    "border": {
+        "#2c2c2c": "--sds-color-border-brand-default",
+        "#eb221e": "--sds-color-border-danger-tertiary",
+        "#d9d9d9": "--sds-color-border-default-default",
+        "#757575": "--sds-color-border-default-secondary",
+        "#b3b3b3": "--sds-color-border-disabled-default",
+        "#900b09": "--sds-color-border-danger-default",
+        "#02542d": "--sds-color-border-positive-default",
+        "#14ae5c": "--sds-color-border-positive-tertiary",
+    },
+}
+
+
+def tokenize_chain(content, approved=APPROVED):
+    """The previous re.sub chain, one pass per map entry, with its maps taken from `approved`."""
+
+    # ── Step 1: Remove body { display:flex; ... background:#f5f5f5; } override ──
+    # shared.css already handles body styling
+    content = re.sub(
+        r'\n?\s*body\s*\{\s*display\s*:\s*flex\s*;[^}]*\}',
+        '',
+        content
+    )
+
+    # ── Step 2: Dividers use "height:1px; background:" as separators → border token ──
+    for literal, token in approved["border"].items():
+        content = re.sub(
+            rf'(height\s*:\s*1px\s*;\s*background\s*:\s*){re.escape(literal)}',
+            rf'\g<1>var({token})',
+            content,
+            flags=re.IGNORECASE
+        )
+
+    # ── Step 3: Border replacements (do FIRST so border #d9d9d9 doesn't get caught by bg) ──
+    for literal, token in approved["border"].items():
+        content = re.sub(
+            rf'(border\s*:\s*\d+px\s+solid\s+|border-color\s*:\s*){re.escape(literal)}',
+            rf'\g<1>var({token})',
+            content,
+            flags=re.IGNORECASE
+        )
+
+    # ── Step 4: Background property replacements, :hover rules first ──
+    for literal, token in approved["hover"].items():
+        content = re.sub(
+            rf'(:hover\s*\{{\s*background(?:-color)?\s*:\s*){re.escape(literal)}',
+            rf'\g<1>var({token})',
+            content,
+            flags=re.IGNORECASE
+        )
+    for literal, token in approved["background"].items():
+        content = re.sub(
+            rf'(background(?:-color)?\s*:\s*){re.escape(literal)}',
+            rf'\g<1>var({token})',
+            content,
+            flags=re.IGNORECASE
+        )
+
+    # ── Step 5: Text color property replacements ──
+    for literal, token in approved["text"].items():
+        # Match "color:" NOT preceded by "background-" or "border-"
+        content = re.sub(
+            rf'(?<![a-zA-Z-])color\s*:\s*{re.escape(literal)}',
+            rf'color: var({token})',
+            content,
+            flags=re.IGNORECASE
+        )
+
+    return content
+
+
+DECLARATIONS = [
+    "background: {hex}", "background-color: {hex}", "color: {hex}", "color: white",
+    "border: 1px solid {hex}", "border-color: {hex}", "border-radius: 8px",
+    "background: rgba(0, 0, 0, 0.5)", "padding: 12px 16px", "font-size: 14px",
+    "display: flex", "gap: 8px", "box-shadow: 0 1px 2px rgba(0,0,0,0.1)",
+]
+HEXES = [
+    "#ffffff", "#f5f5f5", "#2c2c2c", "#eb221e", "#fee9e7", "#ebffee", "#e5e5e5",
+    "#d9d9d9", "#f5a623", "#1e1e1e", "#757575", "#b3b3b3", "#900b09", "#02542d",
+    "#14ae5c", "#123456", "#FFFFFF", "#abcdef",
+]
+
+
+def generate_widget(rng, rules):
+    """One widget-sized HTML file with hardcoded colors in CSS and inline styles."""
+    css = []
+    for i in range(rules):
+        decls = [rng.choice(DECLARATIONS).format(hex=rng.choice(HEXES)) for _ in range(rng.randint(2, 6))]
+        if i % 25 == 0:
+            decls.insert(0, "height: 1px; background: #d9d9d9")
+        css.append(f"    .w-{i} {{ {'; '.join(decls)}; }}")
+        if i % 10 == 0:
+            css.append(f"    .w-{i}:hover {{ background: {rng.choice(HEXES)}; }}")
+    markup = []
+    for i in range(rules // 3):
+        style = f"color: {rng.choice(HEXES)}; background: {rng.choice(HEXES)}"
+        markup.append(f'  <div class="w-{i}" style="{style}"><span>Item {i}</span></div>')
+    script = "\n".join(f"  const item{i} = {{ id: {i}, label: 'Item {i}' }};" for i in range(rules // 2))
+    return (
+        "<!DOCTYPE html>\n<html>\n<head>\n<style>\n"
+        "    body { display: flex; justify-content: center; background: #f5f5f5; }\n"
+        + "\n".join(css)
+        + "\n</style>\n</head>\n<body>\n"
+        + "\n".join(markup)
+        + f"\n<script>\n{script}\n</script>\n</body>\n</html>\n"
+    )
+
+
+def timed(fn, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = [fn(doc) for doc in corpus]
+        best = min(best, time.perf_counter() - started)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--rules", type=int, default=300, help="CSS rules per file")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [generate_widget(rng, args.rules) for _ in range(args.files)]
+    size = sum(len(doc) for doc in corpus)
+    print(f"Corpus: {args.files} files, {size / 1e6:.1f} MB")
+
+    tokenizer = load_tokenizer()
+    chain_s, expected = timed(tokenize_chain, corpus, args.repeat)
+    scan_s, actual = timed(tokenizer.tokenize, corpus, args.repeat)
+
+    mismatches = sum(a != b for a, b in zip(expected, actual))
+    print(f"  re.sub chain   {chain_s * 1000:9.1f} ms  ({size / chain_s / 1e6:6.1f} MB/s)")
+    print(f"  single pass    {scan_s * 1000:9.1f} ms  ({size / scan_s / 1e6:6.1f} MB/s)")
+    print(f"  speedup        {chain_s / scan_s:9.1f}x")
+    if mismatches:
+        raise SystemExit(f"Output differs from the approved map in {mismatches} of {len(corpus)} files")
+    print("  outputs identical")
+
+
+if __name__ == "__main__":
+    main()
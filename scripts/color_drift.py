@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Find hardcoded color literals (hex, rgb/rgba, hsl/hsla, named colors) in the
+widgets (including mcp-server/src/widgets/shared.css), shared and web-client
+HTML/CSS/TSX, with the nearest token for each.
+
+By default only files changed against --base (HEAD) are scanned: tracked
+changes, staged or not, plus untracked files. --staged scans the staged
+contents for a pre-commit hook, read from the index (`git show :path`) rather
+than the working tree, and --all-files scans everything. Files are read
+through mmap and scanned with byte regexes in a process pool. Nearest tokens
+are looked up in one vectorized OKLab pass over every finding.
+
+    hex / rgb() / hsl()   anywhere in the file
+    named colors          only as the value of a color property (CSS or a
+                          camelCase style object key), so prose is left alone
+
+Custom property definitions (`--x: #fff`) are the token sheets themselves and
+are skipped. A literal used as a var() fallback is reported at note level;
+--no-fallbacks drops those. A line containing `color-drift: ignore` is skipped.
+
+    python3 scripts/color_drift.py [--base origin/main | --staged | --all-files] [--format text|json|sarif]
+"""
+import argparse
+import json
+import math
+import mmap
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from token_colors import DEFAULT_TOLERANCE, NAMED_COLORS, NORMALIZED_PATH, TokenColorIndex, parse_color
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ROOTS = ("mcp-server/widgets", "mcp-server/src/widgets", "shared", "web-client")
+SUFFIXES = (".html", ".css", ".tsx", ".jsx")
+# Build output, dependencies and the generated token sheets
+EXCLUDE_DIRS = {"node_modules", ".next", "dist", "build", "tokens"}
+IGNORE_MARK = b"color-drift: ignore"
+RULE_ID = "hardcoded-color"
+# Below this many files a worker pool costs more than it saves
+POOL_THRESHOLD = 16
+
+_HEX = rb"(?<![\w&#])#(?:[0-9a-fA-F]{8}|[0-9a-fA-F]{6}|[0-9a-fA-F]{3,4})(?![\w-])"
+_FUNC = rb"(?<![\w-])(?:rgba?|hsla?)\([^()]*\)"
+_LITERAL = re.compile(_HEX + b"|" + _FUNC, re.IGNORECASE)
+_NAMES = b"|".join(sorted((n.encode() for n in NAMED_COLORS if n != "transparent"), key=len, reverse=True))
+# a color property then its value up to the end of the declaration
+_NAMED_DECL = re.compile(
+    rb"(?<![\w-])(?P<prop>(?:background|border|outline|text-decoration)(?:-[\w-]+)?|"
+    rb"(?:background|border|outline|textDecoration)[A-Z]\w*|color|fill|stroke|caret-color|caretColor|"
+    rb"accent-color|accentColor|box-shadow|boxShadow|text-shadow|textShadow)"
+    rb"[\"']?\s*:\s*(?P<value>[^;{}\n]*)",
+)
+_NAMED = re.compile(rb"(?<![\w#.-])(?:" + _NAMES + rb")(?![\w-])", re.IGNORECASE)
+# the declaration a literal sits in: property name, then anything up to the literal
+_PROP = re.compile(rb"(?P<prop>-{0,2}[A-Za-z][\w-]*)[\"']?\s*:\s*[^;{}:]*$")
+_FALLBACK = re.compile(rb"var\(\s*--[\w-]+\s*,\s*$")
+_DELIMITERS = re.compile(rb"[;{}\n]")
+
+
+def role_for(prop):
+    """Token role for a (kebab or camelCase) property name; None when unknown."""
+    prop = re.sub(r"(?<=[a-z])([A-Z])", r"-\1", prop).lower()
+    if prop.startswith("background"):
+        return "background"
+    if prop.startswith(("border", "outline")) or prop.endswith("shadow"):
+        return "border"
+    if prop in ("fill", "stroke"):
+        return "icon"
+    if prop in ("color", "caret-color", "text-decoration-color", "accent-color"):
+        return "text"
+    return None
+
+
+def _context(buf, start):
+    """(property, is var() fallback) for a literal at `start`, from the text before it."""
+    line_start = max(buf.rfind(b"\n", 0, start), start - 240, -1)
+    head = bytes(buf[line_start + 1:start])
+    cut = [m.end() for m in _DELIMITERS.finditer(head)]
+    head = head[cut[-1]:] if cut else head
+    m = _PROP.search(head)
+    return (m.group("prop").decode() if m else None), bool(_FALLBACK.search(head))
+
+
+def scan_buffer(buf):
+    """[(line, column, literal, property, fallback)] in one file's bytes (or mmap)."""
+    hits = [(m.start(), m.group()) for m in _LITERAL.finditer(buf)]
+    for decl in _NAMED_DECL.finditer(buf):
+        base = decl.start("value")
+        hits.extend((base + m.start(), m.group()) for m in _NAMED.finditer(decl.group("value")))
+    hits.sort()
+
+    found = []
+    line, pos, line_start = 1, 0, 0
+    for start, literal in hits:
+        newlines = buf[pos:start].count(b"\n")
+        if newlines:
+            line += newlines
+            line_start = buf.rfind(b"\n", 0, start) + 1
+        pos = start
+        line_end = buf.find(b"\n", start)
+        if IGNORE_MARK in buf[line_start:line_end if line_end >= 0 else len(buf)]:
+            continue
+        prop, fallback = _context(buf, start)
+        if prop and prop.startswith("--"):
+            continue
+        text = literal.decode("ascii", "replace")
+        if parse_color(text) is None:
+            continue
+        found.append((line, start - line_start + 1, text, prop, fallback))
+    return found
+
+
+def scan_file(path):
+    """scan_buffer() of one file; [] for empty or unreadable files."""
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError:
+        return []
+    with buf:
+        return scan_buffer(buf)
+
+
+def scan_staged(path, root=REPO_ROOT):
+    """scan_buffer() of the staged blob of a repo-relative path; [] when it is not in the index."""
+    result = subprocess.run(["git", "show", f":{path}"], cwd=root, capture_output=True)
+    return scan_buffer(result.stdout) if result.returncode == 0 else []
+
+
+def discover(root=REPO_ROOT):
+    """Every scannable file under ROOTS, as repo-relative posix paths."""
+    files = []
+    for top in ROOTS:
+        for path in (root / top).rglob("*"):
+            if path.suffix in SUFFIXES and path.is_file() \
+                    and not EXCLUDE_DIRS.intersection(path.relative_to(root).parts[:-1]):
+                files.append(path.relative_to(root).as_posix())
+    return sorted(files)
+
+
+def _git(*args, root=REPO_ROOT):
+    result = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"git {' '.join(args)} failed")
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def changed_files(base="HEAD", staged=False, root=REPO_ROOT):
+    """Repo-relative paths changed against `base` (or staged), filtered to scannable files."""
+    if staged:
+        names = _git("diff", "--cached", "--name-only", "--diff-filter=d", root=root)
+    else:
+        names = _git("diff", "--name-only", "--diff-filter=d", base, root=root)
+        names += _git("ls-files", "--others", "--exclude-standard", root=root)
+    return sorted({
+        n for n in names
+        if n.endswith(SUFFIXES) and n.startswith(tuple(r + "/" for r in ROOTS))
+        and not EXCLUDE_DIRS.intersection(n.split("/")[:-1])
+    })
+
+
+def scan(files, root=REPO_ROOT, jobs=None, staged=False):
+    """{path: findings} for repo-relative `files`, in a process pool when there are many.
+
+    With `staged` the index contents are scanned instead of the working tree.
+    """
+    if staged:
+        paths, worker = list(files), partial(scan_staged, root=root)
+    else:
+        paths, worker = [str(root / f) for f in files], scan_file
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(paths) or 1))
+    if jobs == 1 or len(paths) < POOL_THRESHOLD:
+        results = map(worker, paths)
+    else:
+        with ProcessPoolExecutor(jobs) as pool:
+            results = list(pool.map(worker, paths, chunksize=8))
+    return {f: hits for f, hits in zip(files, results) if hits}
+
+
+def attach_tokens(found, index):
+    """Findings as dicts with the nearest token (in the property's role, else any role)."""
+    rows = [(path, *hit) for path, hits in found.items() for hit in hits]
+    out = []
+    if not rows:
+        return out
+    colors = np.array([parse_color(r[3]) for r in rows])
+    best = [(None, math.inf, None)] * len(rows)
+    for role in index.roles:
+        for i, (token, delta) in enumerate(index.nearest_many(colors, role)):
+            role_i = role_for(rows[i][4]) if rows[i][4] else None
+            if role_i is not None and role_i in index.roles and role != role_i:
+                continue
+            if delta < best[i][1]:
+                best[i] = (token, delta, role)
+    for (path, line, column, literal, prop, fallback), (token, delta, role) in zip(rows, best):
+        out.append({
+            "file": path,
+            "line": line,
+            "column": column,
+            "literal": literal,
+            "property": prop,
+            "fallback": fallback,
+            "token": token,
+            "deltaE": round(delta, 4) if math.isfinite(delta) else None,
+            "exact": delta < 1e-6,
+            "withinTolerance": delta <= DEFAULT_TOLERANCE,
+        })
+    return out
+
+
+def _message(f):
+    where = "var() fallback" if f["fallback"] else "hardcoded color"
+    if f["token"] is None:
+        return f"{where} {f['literal']}: no token of a matching role"
+    match = "exact match" if f["exact"] else f"ΔE {f['deltaE']:.3f}"
+    return f"{where} {f['literal']}: nearest token var({f['token']}) ({match})"
+
+
+def to_sarif(findings):
+    return {
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "version": "2.1.0",
+        "runs": [{
+            "tool": {"driver": {
+                "name": "color-drift",
+                "rules": [{
+                    "id": RULE_ID,
+                    "shortDescription": {"text": "Hardcoded color literal instead of a design token"},
+                    "defaultConfiguration": {"level": "warning"},
+                }],
+            }},
+            "results": [{
+                "ruleId": RULE_ID,
+                "level": "note" if f["fallback"] else "warning",
+                "message": {"text": _message(f)},
+                "locations": [{"physicalLocation": {
+                    "artifactLocation": {"uri": f["file"], "uriBaseId": "%SRCROOT%"},
+                    "region": {
+                        "startLine": f["line"],
+                        "startColumn": f["column"],
+                        "endColumn": f["column"] + len(f["literal"]),
+                    },
+                }}],
+                "properties": {k: f[k] for k in ("literal", "property", "token", "deltaE")},
+            } for f in findings],
+        }],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find hardcoded color literals and their nearest tokens.")
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument("--base", default="HEAD", help="scan files changed against this ref (default: HEAD)")
+    scope.add_argument("--staged", action="store_true", help="scan only staged files (pre-commit)")
+    scope.add_argument("--all-files", action="store_true", help="scan every file under the roots")
+    parser.add_argument("files", nargs="*", help="explicit repo-relative files (overrides the scope)")
+    parser.add_argument("--format", choices=("text", "json", "sarif"), default="text")
+    parser.add_argument("-o", "--output", type=Path, help="write the report here (default: stdout)")
+    parser.add_argument("--no-fallbacks", action="store_true", help="ignore literals used as var() fallbacks")
+    parser.add_argument("--normalized", type=Path, default=NORMALIZED_PATH)
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--exit-zero", action="store_true", help="exit 0 even when literals are found")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.files:
+        files = sorted({Path(f).resolve().relative_to(REPO_ROOT).as_posix() for f in args.files})
+    elif args.all_files:
+        files = discover()
+    else:
+        try:
+            files = changed_files(args.base, args.staged)
+        except RuntimeError as exc:
+            parser.error(str(exc))
+
+    found = scan(files, jobs=args.jobs, staged=args.staged and not args.files)
+    if args.no_fallbacks:
+        found = {p: [h for h in hits if not h[4]] for p, hits in found.items()}
+    findings = attach_tokens(found, TokenColorIndex.from_normalized(args.normalized, tolerance=math.inf)) \
+        if any(found.values()) else []
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if args.format == "sarif":
+        text = json.dumps(to_sarif(findings), indent=2, ensure_ascii=False) + "\n"
+    elif args.format == "json":
+        text = json.dumps({"files": len(files), "findings": findings}, indent=2, ensure_ascii=False) + "\n"
+    else:
+        lines = [f"{f['file']}:{f['line']}:{f['column']}: {_message(f)}" for f in findings]
+        lines.append(f"{len(findings)} color literals in {len(files)} files scanned ({elapsed:.0f} ms)")
+        text = "\n".join(lines) + "\n"
+    if args.output:
+        args.output.write_text(text)
+    else:
+        sys.stdout.write(text)
+    return 1 if findings and not args.exit_zero else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+WCAG contrast of every foreground token against every background token, per
+Color mode (SDS Light / SDS Dark), from variables.normalized.json.
+
+The full text x background and border/icon x background matrices are built
+with NumPy broadcasting: translucent foregrounds are composited over each
+background, translucent backgrounds over the mode's page background
+(--sds-color-background-default-default), and contrast is
+(L1 + 0.05) / (L2 + 0.05) on WCAG relative luminance.
+
+Thresholds: text needs 4.5 (AA) / 7 (AAA); borders and icons are non-text
+UI and need 3 (WCAG 1.4.11, which has no AAA level).
+
+Only pairs the widgets use are checked unless --all is given. A pair is
+"used" when a CSS rule in a widget sets a foreground token (color, fill,
+stroke, border*, outline*) and a background token. Content colors are paired
+with the rule's own background; a rule without one falls back to the nearest
+ancestor selector in the same file that sets a background (`.row.active` for
+`.row.active .name`), else the page background. Borders and outlines sit on
+the element's edge and must stand out from what surrounds it, so they are
+always paired with that enclosing background, never the rule's own.
+
+    python3 scripts/contrast_matrix.py [--level AA|AAA] [--all] [--json]
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from token_colors import NORMALIZED_PATH, parse_color, token_role
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+WIDGETS_DIR = REPO_ROOT / "mcp-server" / "widgets"
+PAGE_BACKGROUND = "--sds-color-background-default-default"
+
+# (foreground roles, AA, AAA); AAA None = no AAA criterion
+GROUPS = {
+    "text": (("text",), 4.5, 7.0),
+    "non-text": (("border", "icon"), 3.0, None),
+}
+
+_RULE = re.compile(r"([^{}]*)\{([^{}]*)\}")
+_DECL = re.compile(r"([\w-]+)\s*:\s*([^;]+)")
+_VAR = re.compile(r"var\(\s*(--sds-color-[\w-]+)")
+_STYLE = re.compile(r"<style[^>]*>(.*?)</style>", re.DOTALL | re.IGNORECASE)
+FOREGROUND_PROPS = re.compile(r"^(?:color|fill|stroke|caret-color)$")
+EDGE_PROPS = re.compile(r"^(?:border(?:-[\w-]+)?|outline(?:-color)?)$")
+BACKGROUND_PROPS = re.compile(r"^background(?:-color)?$")
+
+
+def relative_luminance(rgb):
+    """WCAG relative luminance of (…, 3) sRGB floats in 0..1."""
+    rgb = np.asarray(rgb, dtype=np.float64)
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    return linear @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def composite(top, bottom):
+    """RGBA `top` over opaque RGB `bottom` (broadcasting) → RGB."""
+    alpha = top[..., 3:4]
+    return top[..., :3] * alpha + bottom * (1 - alpha)
+
+
+def contrast_matrix(fg, bg, page):
+    """(F, B) contrast ratios of RGBA foregrounds over RGBA backgrounds.
+
+    Backgrounds are first flattened onto the opaque `page` RGB color.
+    """
+    bg_rgb = composite(bg, page)                      # (B, 3)
+    fg_rgb = composite(fg[:, None, :], bg_rgb[None])  # (F, B, 3)
+    lf, lb = relative_luminance(fg_rgb), relative_luminance(bg_rgb)[None, :]
+    high, low = np.maximum(lf, lb), np.minimum(lf, lb)
+    return (high + 0.05) / (low + 0.05)
+
+
+def load_tokens(path=NORMALIZED_PATH):
+    """({mode id: mode name}, {role: [css var]}, {mode id: {css var: RGBA}}) for the Color modes."""
+    data = json.loads(Path(path).read_text())
+    selection = data.get("modeSelection", {})
+    modes = {
+        selection[f"{kind}ModeId"]: selection.get(f"{kind}ModeName", kind)
+        for kind in ("light", "dark") if selection.get(f"{kind}ModeId")
+    }
+    by_role = defaultdict(list)
+    values = {mode: {} for mode in modes}
+    for var in data.get("variables", []):
+        css_var = var.get("cssVar", "")
+        role = token_role(css_var)
+        if var.get("resolvedType") != "COLOR" or role is None:
+            continue
+        by_role[role].append(css_var)
+        for mode in modes:
+            rgba = parse_color(str(var.get("modes", {}).get(mode, {}).get("value") or ""))
+            if rgba is not None:
+                values[mode][css_var] = rgba
+    return modes, dict(by_role), values
+
+
+def _rules(path):
+    """[(selectors, foreground vars, edge vars, background vars, line)] of one widget's CSS."""
+    text = path.read_text(encoding="utf-8")
+    sheets = [(m.group(1), m.start(1)) for m in _STYLE.finditer(text)] if path.suffix == ".html" \
+        else [(text, 0)]
+    rules = []
+    for css, offset in sheets:
+        for rule in _RULE.finditer(css):
+            fgs, edges, bgs = set(), set(), set()
+            for prop, value in _DECL.findall(rule.group(2)):
+                tokens = [t for t in _VAR.findall(value) if token_role(t) in ("text", "border", "icon")]
+                if BACKGROUND_PROPS.match(prop):
+                    bgs.update(t for t in _VAR.findall(value) if token_role(t) == "background")
+                elif FOREGROUND_PROPS.match(prop):
+                    fgs.update(tokens)
+                elif EDGE_PROPS.match(prop):
+                    edges.update(tokens)
+            selectors = [" ".join(sel.split()) for sel in rule.group(1).split(",")]
+            line = text.count("\n", 0, offset + rule.start(2)) + 1
+            rules.append((selectors, fgs, edges, bgs, line))
+    return rules
+
+
+def _ancestors(selector):
+    """Descendant-combinator prefixes of a selector, nearest first."""
+    parts = re.sub(r"\s*([>+~])\s*", " ", selector).split()
+    return [" ".join(parts[:i]) for i in range(len(parts) - 1, 0, -1)]
+
+
+def used_pairs(files):
+    """{(foreground var, background var): [(file, line)]} from the widgets' CSS rules."""
+    pairs = defaultdict(list)
+    for path in files:
+        rules = _rules(path)
+        painted = defaultdict(set)
+        for selectors, _, _, bgs, _ in rules:
+            for sel in selectors:
+                painted[sel] |= bgs
+        label = str(path.relative_to(REPO_ROOT)) if path.is_relative_to(REPO_ROOT) else str(path)
+        for selectors, fgs, edges, bgs, line in rules:
+            if not (fgs or edges):
+                continue
+            enclosing = set()
+            for sel in selectors:
+                enclosing |= next((painted[a] for a in _ancestors(sel) if painted.get(a)), {PAGE_BACKGROUND})
+            for tokens, under in ((fgs, bgs or enclosing), (edges, enclosing)):
+                for fg in tokens:
+                    for bg in under:
+                        pairs[fg, bg].append((label, line))
+    return pairs
+
+
+def widget_files(root=WIDGETS_DIR):
+    return sorted(p for p in root.rglob("*") if p.suffix in (".html", ".css") and p.is_file())
+
+
+def evaluate(modes, by_role, values, pairs=None, level="AA"):
+    """Failures (and counts) per mode; every pair when `pairs` is None, else only those."""
+    report = {"modes": {}, "pairsChecked": 0}
+    backgrounds = by_role.get("background", [])
+    for mode, mode_name in modes.items():
+        colors = values[mode]
+        page = np.array(colors.get(PAGE_BACKGROUND, (1.0, 1.0, 1.0, 1.0))[:3])
+        bg_names = [b for b in backgrounds if b in colors]
+        bg = np.array([colors[b] for b in bg_names]).reshape(-1, 4)
+        bg_index = {name: i for i, name in enumerate(bg_names)}
+        failures = []
+        checked = 0
+        for group, (roles, aa, aaa) in GROUPS.items():
+            fg_names = [f for role in roles for f in by_role.get(role, []) if f in colors]
+            if not fg_names or not bg_names:
+                continue
+            fg = np.array([colors[f] for f in fg_names])
+            ratios = contrast_matrix(fg, bg, page)
+            required = aaa if level == "AAA" and aaa is not None else aa
+            if pairs is None:
+                mask = np.ones(ratios.shape, dtype=bool)
+            else:
+                mask = np.zeros(ratios.shape, dtype=bool)
+                fg_index = {name: i for i, name in enumerate(fg_names)}
+                for fg_name, bg_name in pairs:
+                    if fg_name in fg_index and bg_name in bg_index:
+                        mask[fg_index[fg_name], bg_index[bg_name]] = True
+            checked += int(mask.sum())
+            for i, j in zip(*np.nonzero(mask & (ratios < required))):
+                ratio = float(ratios[i, j])
+                failures.append({
+                    "group": group,
+                    "foreground": fg_names[i],
+                    "background": bg_names[j],
+                    "ratio": round(ratio, 2),
+                    "required": required,
+                    "aa": ratio >= aa,
+                    "usedAt": [] if pairs is None else [f"{f}:{n}" for f, n in pairs[fg_names[i], bg_names[j]]],
+                })
+        failures.sort(key=lambda f: f["ratio"])
+        report["modes"][mode_name] = {"modeId": mode, "checked": checked, "failures": failures}
+        report["pairsChecked"] += checked
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WCAG contrast of foreground tokens on background tokens.")
+    parser.add_argument("--normalized", type=Path, default=NORMALIZED_PATH)
+    parser.add_argument("--widgets", type=Path, default=WIDGETS_DIR, help="where to look for used pairs")
+    parser.add_argument("--level", choices=("AA", "AAA"), default="AA")
+    parser.add_argument("--all", action="store_true", help="check every pair, not only the ones widgets use")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--limit", type=int, default=40, help="failures listed per mode")
+    args = parser.parse_args()
+
+    modes, by_role, values = load_tokens(args.normalized)
+    pairs = None if args.all else used_pairs(widget_files(args.widgets))
+    started = time.perf_counter()
+    report = evaluate(modes, by_role, values, pairs, args.level)
+    elapsed = (time.perf_counter() - started) * 1000
+    failed = sum(len(m["failures"]) for m in report["modes"].values())
+
+    if args.json:
+        print(json.dumps({"level": args.level, "allPairs": args.all, **report}, indent=2))
+    else:
+        scope = "all pairs" if args.all else f"{len(pairs)} pairs used by widgets"
+        print(f"WCAG {args.level}, {scope}: {report['pairsChecked']} checks in {elapsed:.1f} ms, {failed} failing")
+        for mode_name, result in report["modes"].items():
+            print(f"\n{mode_name}: {len(result['failures'])} of {result['checked']} below {args.level}")
+            for f in result["failures"][:args.limit]:
+                where = f"  ({f['usedAt'][0]})" if f["usedAt"] else ""
+                print(f"  {f['ratio']:5.2f} < {f['required']:<4} {f['foreground']} on {f['background']}{where}")
+            if len(result["failures"]) > args.limit:
+                print(f"  … {len(result['failures']) - args.limit} more")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
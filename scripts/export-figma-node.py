@@ -1,100 +1,288 @@
 #!/usr/bin/env python3
-"""Export a Figma node to PNG via foxy-tool-call.mjs"""
+"""Export Figma nodes to PNG/SVG/JPG via foxy-tool-call.mjs
+
+Single node (legacy):
+    python3 scripts/export-figma-node.py [NODE_ID] [OUT_PATH]
+
+Batch (node IDs × formats × scales; 1x exports share a bridge call, larger ones go alone):
+    python3 scripts/export-figma-node.py --manifest export.json
+    python3 scripts/export-figma-node.py --labels Light,Dark --formats PNG --scales 1,2
+    python3 scripts/export-figma-node.py --nodes 3036:15036,3036:15731 --formats PNG,SVG
+
+Manifest shape (per-node formats/scales override the top-level defaults):
+    {"outDir": "screenshots/figma", "formats": ["PNG"], "scales": [1],
+     "nodes": ["3036:15036", {"id": "5014:1629", "name": "product-grid-light", "scales": [2]}]}
+"""
+import argparse
 import base64
+import binascii
 import json
 import os
-import subprocess
 import sys
+import tempfile
+import time
 from pathlib import Path
 
+from foxy_bridge import BridgeError, BridgePool, FoxyBridge, wait_result
+from foxy_result import ResultError, iter_images, tool_data, tool_payload
+
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_NODE_ID = "3036:15036"
+DEFAULT_OUT_DIR = "screenshots/figma-export"
+MAPPINGS_PATH = REPO_ROOT / "figma" / "code-connect" / "mappings.source.json"
+FORMATS = ("PNG", "SVG", "JPG")
+EXTENSIONS = {"PNG": "png", "SVG": "svg", "JPG": "jpg"}
+B64_CHUNK = 1 << 20  # multiple of 4, so every slice decodes on its own
+# Exports above this scale come back several times larger; batching them would
+# put several of those base64 strings in one response
+MAX_BATCHED_SCALE = 1
+
+EXPORT_CODE = """
+const items = %s;
+const out = [];
+for (const item of items) {
+  const node = await figma.getNodeByIdAsync(item.nodeId);
+  if (!node || !("exportAsync" in node)) {
+    out.push({ ...item, error: "node not found or not exportable" });
+    continue;
+  }
+  const started = Date.now();
+  const settings = item.format === "SVG"
+    ? { format: "SVG" }
+    : { format: item.format, constraint: { type: "SCALE", value: item.scale } };
+  const bytes = await node.exportAsync(settings);
+  out.push({ ...item, ms: Date.now() - started, data: figma.base64Encode(bytes) });
+}
+return out;
+"""
+
+
+def write_base64(path, text):
+    """Decode a base64 string to a file slice by slice; returns bytes written.
+
+    Writes to a temp file next to `path` and replaces `path` only once every
+    slice decoded, so invalid base64 leaves no truncated file behind.
+    """
+    path = Path(path)
+    written = 0
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for start in range(0, len(text), B64_CHUNK):
+                chunk = base64.b64decode(text[start:start + B64_CHUNK], validate=True)
+                f.write(chunk)
+                written += len(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return written
+
 
+def safe_name(node_id):
+    return node_id.replace(":", "-")
 
-def resolve_foxy_tool():
-    explicit = os.environ.get("FOXY_TOOL_CALL")
-    if explicit:
-        p = Path(explicit).expanduser().resolve()
-        if p.exists():
-            return p
-        raise FileNotFoundError(f"FOXY_TOOL_CALL does not exist: {p}")
 
-    foxy_root = os.environ.get("FOXY_ROOT")
-    if foxy_root:
-        p = Path(foxy_root).expanduser().resolve() / "scripts" / "foxy-tool-call.mjs"
-        if p.exists():
-            return p
-        raise FileNotFoundError(f"FOXY_ROOT configured but tool missing: {p}")
+def parse_csv(value, cast=str):
+    return [cast(v.strip()) for v in value.split(",") if v.strip()]
 
-    sibling = (REPO_ROOT.parent / "foxy-design-system-master" / "scripts" / "foxy-tool-call.mjs").resolve()
-    if sibling.exists():
-        return sibling
 
-    raise FileNotFoundError(
-        "Unable to resolve foxy-tool-call.mjs. Set FOXY_TOOL_CALL or FOXY_ROOT."
+def expand_jobs(nodes, formats, scales, out_dir):
+    """Expand node entries × formats × scales into export jobs with output paths."""
+    jobs = []
+    seen = set()
+    for entry in nodes:
+        if isinstance(entry, str):
+            entry = {"id": entry}
+        node_id = entry["id"]
+        name = entry.get("name") or safe_name(node_id)
+        for fmt in entry.get("formats", formats):
+            fmt = fmt.upper().replace("JPEG", "JPG")
+            if fmt not in FORMATS:
+                raise SystemExit(f"Unsupported format {fmt} for {node_id}; use {', '.join(FORMATS)}")
+            # SVG is vector output, scale does not apply
+            for scale in ([1] if fmt == "SVG" else entry.get("scales", scales)):
+                suffix = "" if fmt == "SVG" or scale == 1 else f"@{scale:g}x"
+                out_path = out_dir / f"{name}{suffix}.{EXTENSIONS[fmt]}"
+                if out_path in seen:
+                    continue
+                seen.add(out_path)
+                jobs.append({"nodeId": node_id, "format": fmt, "scale": scale, "path": out_path})
+    return jobs
+
+
+def load_manifest(path):
+    manifest = json.loads(Path(path).read_text())
+    return (
+        manifest.get("nodes", []),
+        manifest.get("formats", ["PNG"]),
+        manifest.get("scales", [1]),
+        manifest.get("outDir", DEFAULT_OUT_DIR),
     )
 
 
+def nodes_from_mappings(labels):
+    """Node entries for the given mappings.source.json labels (e.g. Light, Dark)."""
+    data = json.loads(MAPPINGS_PATH.read_text())
+    wanted = {label.lower() for label in labels}
+    return [
+        {"id": m["nodeId"], "name": m["id"]}
+        for m in data.get("mappings", [])
+        if str(m.get("label", "")).lower() in wanted
+    ]
+
+
+def _job_key(item):
+    return item.get("nodeId"), item.get("format"), float(item.get("scale") or 1)
+
+
+def chunk_jobs(jobs, batch_size):
+    """Group jobs into bridge calls: up to batch_size small exports, large ones alone."""
+    small, large = [], []
+    for job in jobs:
+        (small if job["format"] == "SVG" or job["scale"] <= MAX_BATCHED_SCALE else large).append(job)
+    return [small[i:i + batch_size] for i in range(0, len(small), batch_size)] + [[j] for j in large]
+
+
+def match_results(chunk, results):
+    """One result per job in chunk, matched on (nodeId, format, scale); missing ones become errors."""
+    by_key = {}
+    for res in results:
+        if isinstance(res, dict):
+            by_key.setdefault(_job_key(res), res)
+    matched = []
+    for job in chunk:
+        res = by_key.get(_job_key(job))
+        if res is None:
+            res = {"error": f"no result (bridge returned {len(results)} for {len(chunk)} exports)"}
+        matched.append(res)
+    return matched
+
+
+def export_batch(jobs, batch_size):
+    """Export jobs, batch_size small exports per bridge call, streaming results to disk."""
+    summary = []
+    with BridgePool() as bridge:
+        pending = []
+        for chunk in chunk_jobs(jobs, batch_size):
+            items = [{"nodeId": j["nodeId"], "format": j["format"], "scale": j["scale"]} for j in chunk]
+            code = EXPORT_CODE % json.dumps(items)
+            pending.append((chunk, time.monotonic(), bridge.submit("execute_figma_code", {"code": code}, 120)))
+
+        for chunk, submitted, fut in pending:
+            try:
+                inner = tool_payload(wait_result(fut, "execute_figma_code", 120))
+                results = tool_data(inner)
+                if not isinstance(results, list):
+                    raise BridgeError(f"Unexpected export result: {str(inner)[:200]}")
+                results = match_results(chunk, results)
+            except (BridgeError, ResultError) as exc:
+                results = [{"error": str(exc)}] * len(chunk)
+            elapsed = time.monotonic() - submitted
+            for job, res in zip(chunk, results):
+                data = res.get("data")
+                error = res.get("error") or (None if data else "export returned no data")
+                if error:
+                    summary.append((job, None, res.get("ms"), error))
+                    continue
+                job["path"].parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    size = write_base64(job["path"], data)
+                except (binascii.Error, ValueError, OSError) as exc:
+                    summary.append((job, None, res.get("ms"), f"cannot write {job['path'].name}: {exc}"))
+                    continue
+                summary.append((job, size, res.get("ms"), None))
+            print(f"  batch of {len(chunk)} done in {elapsed:.1f}s")
+    return summary
+
+
+def print_summary(summary):
+    total_bytes = 0
+    failures = 0
+    print()
+    for job, size, ms, error in summary:
+        label = f"{job['nodeId']:>12}  {job['format']:<3} @{job['scale']:g}x"
+        if error:
+            failures += 1
+            print(f"  ❌ {label}  {error}")
+            continue
+        total_bytes += size
+        timing = f"{ms} ms" if ms is not None else "-"
+        print(f"  ✅ {label}  {size:>9,} bytes  {timing:>8}  {job['path']}")
+    print(f"\nExported {len(summary) - failures}/{len(summary)} files, {total_bytes:,} bytes")
+    return failures
+
+
+def batch_main(args):
+    if args.manifest:
+        nodes, formats, scales, out_dir = load_manifest(args.manifest)
+    else:
+        nodes = nodes_from_mappings(parse_csv(args.labels)) if args.labels else parse_csv(args.nodes)
+        formats, scales, out_dir = ["PNG"], [1], DEFAULT_OUT_DIR
+    if args.formats:
+        formats = parse_csv(args.formats)
+    if args.scales:
+        scales = parse_csv(args.scales, float)
+    out_dir = Path(args.out_dir or out_dir)
+    if not out_dir.is_absolute():
+        out_dir = (REPO_ROOT / out_dir).resolve()
+
+    jobs = expand_jobs(nodes, formats, scales, out_dir)
+    if not jobs:
+        raise SystemExit("Nothing to export")
+    print(f"Exporting {len(jobs)} files from {len(nodes)} nodes in batches of {args.batch_size}")
+    failures = print_summary(export_batch(jobs, max(1, args.batch_size)))
+    sys.exit(1 if failures else 0)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("node_id", nargs="?", default=DEFAULT_NODE_ID)
+    parser.add_argument("out_path", nargs="?", default="assets/product-grid-figma-preview.png")
+    parser.add_argument("--manifest", help="JSON manifest of nodes, formats and scales")
+    parser.add_argument("--nodes", help="comma-separated node IDs")
+    parser.add_argument("--labels", help="export mappings.source.json entries with these labels")
+    parser.add_argument("--formats", help="comma-separated formats (PNG, SVG, JPG)")
+    parser.add_argument("--scales", help="comma-separated scales, e.g. 1,2")
+    parser.add_argument("--out-dir", help=f"output directory (default: {DEFAULT_OUT_DIR})")
+    parser.add_argument("--batch-size", type=int, default=8,
+                        help=f"exports per bridge call at scale <= {MAX_BATCHED_SCALE:g} (larger scales go alone)")
+    return parser.parse_args()
+
+
 def main():
-    node_id = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_NODE_ID
-    out_path = Path(sys.argv[2]) if len(sys.argv) > 2 else Path("assets/product-grid-figma-preview.png")
+    args = parse_args()
+    if args.manifest or args.nodes or args.labels:
+        batch_main(args)
+        return
+
+    node_id = args.node_id
+    out_path = Path(args.out_path)
     if not out_path.is_absolute():
         out_path = (REPO_ROOT / out_path).resolve()
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    foxy_tool = resolve_foxy_tool()
-    foxy_cwd = foxy_tool.parent.parent
-
-    result = subprocess.run(
-        ["node", str(foxy_tool)],
-        capture_output=True,
-        text=True,
-        cwd=str(foxy_cwd),
-        env={
-            **os.environ,
-            "JOIN_CHANNEL": os.environ.get("JOIN_CHANNEL", "default"),
-            "TOOL": "export_node_as_image",
-            "ARGS": json.dumps({"nodeId": node_id, "format": "PNG", "scale": 1}),
-        },
-        timeout=30,
-    )
-
-    raw = result.stdout
-    idx = raw.find("RESULT ")
-    if idx < 0:
+    try:
+        with FoxyBridge() as bridge:
+            obj = bridge.call(
+                "export_node_as_image", {"nodeId": node_id, "format": "PNG", "scale": 1}
+            )
+    except BridgeError:
         print("No RESULT found")
         sys.exit(1)
 
-    rest = raw[idx + 7 :]
-    obj = json.loads(rest)
-    inner = json.loads(obj["content"][0]["text"])
-
-    data = inner.get("data", inner)
-    if isinstance(data, dict) and "content" in data:
-        for item in data["content"]:
-            if item.get("type") == "image":
-                img_data = base64.b64decode(item["data"])
-                out_path.write_bytes(img_data)
-                print(f"Saved {len(img_data)} bytes to {out_path}")
-                return
-
-    for item in inner.get("content", []):
-        if item.get("type") == "image":
-            img_data = base64.b64decode(item["data"])
-            out_path.write_bytes(img_data)
-            print(f"Saved {len(img_data)} bytes to {out_path}")
-            return
-
-    if isinstance(data, str) and len(data) > 100:
+    for image in iter_images(obj):
         try:
-            img_data = base64.b64decode(data)
-            out_path.write_bytes(img_data)
-            print(f"Saved {len(img_data)} bytes to {out_path}")
-            return
-        except Exception:
-            pass
+            size = write_base64(out_path, image)
+        except (binascii.Error, ValueError):
+            continue
+        print(f"Saved {size} bytes to {out_path}")
+        return
 
+    inner = tool_payload(obj)
     print("Structure keys:", list(inner.keys()) if isinstance(inner, dict) else type(inner))
     if isinstance(inner, dict):
         for k, v in inner.items():
@@ -1,4 +1,5 @@
 #!/usr/bin/env node
+import { rmSync } from 'node:fs';
 import { resolve } from 'node:path';
 import {
   PATHS,
@@ -12,14 +13,33 @@ import {
   writeJson,
 } from './figma-lib.mjs';
 
+// Written by scripts/generate-ds-connectors.py: DS connectors changed / deleted since the last
+// publish. The generator adds to it on every run; a successful publish apply removes it.
+const DELTA_PATH = resolve(REPO_ROOT, '.figma-cache/ds-connectors-delta.json');
+const DELTA_CONFIG_PATH = resolve(REPO_ROOT, '.figma-cache/figma.config.delta.json');
+
 function parseArgs(argv) {
   const flags = new Set(argv.slice(2));
   return {
     apply: flags.has('--apply'),
     dryRun: !flags.has('--apply') || flags.has('--dry-run'),
+    delta: flags.has('--delta'),
   };
 }
 
+// Code Connect config that includes only the connectors in the generator's delta.
+function writeDeltaConfig(delta) {
+  const base = readJson(PATHS.figmaConfig, {});
+  writeJson(DELTA_CONFIG_PATH, {
+    ...base,
+    codeConnect: {
+      ...base.codeConnect,
+      include: delta.written.map((item) => resolve(REPO_ROOT, item.file)),
+    },
+  });
+  return DELTA_CONFIG_PATH;
+}
+
 async function main() {
   const args = parseArgs(process.argv);
   const config = loadSyncConfig();
@@ -43,6 +63,11 @@ async function main() {
   }
 
   const configPath = resolve(REPO_ROOT, 'figma/figma.config.json');
+  const pending = readJson(DELTA_PATH, null);
+  const delta = args.delta ? pending : null;
+  if (args.delta && !delta) {
+    throw new Error(`Missing ${DELTA_PATH}. Run python3 scripts/generate-ds-connectors.py first.`);
+  }
 
   const verifyCli = runCommand('npx', ['-y', '@figma/code-connect', 'connect', 'parse', '--config', configPath]);
   const report = {
@@ -53,6 +78,10 @@ async function main() {
     codeConnectMode: config.codeConnectMode,
     parseCheck: verifyCli,
     publish: null,
+    delta: delta && {
+      written: delta.written.map((item) => item.file),
+      deleted: delta.deleted,
+    },
     unresolvedNodeIds: unresolved.map((item) => ({ id: item.id, componentName: item.componentName, nodeId: item.nodeId })),
   };
 
@@ -60,8 +89,11 @@ async function main() {
     throw new Error(`Code Connect parse failed: ${verifyCli.stderr || verifyCli.stdout || 'unknown error'}`);
   }
 
-  if (args.apply && !args.dryRun) {
-    const publish = runCommand('npx', ['-y', '@figma/code-connect', 'connect', 'publish', '--config', configPath], { capture: true });
+  if (args.apply && !args.dryRun && delta && delta.written.length === 0) {
+    report.publish = { ok: true, skipped: 'no changed connectors in delta' };
+  } else if (args.apply && !args.dryRun) {
+    const publishConfig = delta ? writeDeltaConfig(delta) : configPath;
+    const publish = runCommand('npx', ['-y', '@figma/code-connect', 'connect', 'publish', '--config', publishConfig], { capture: true });
     report.publish = publish;
 
     if (!publish.ok) {
@@ -69,10 +101,20 @@ async function main() {
     }
   }
 
+  if (args.apply && !args.dryRun && pending) {
+    // Publishing never unpublishes: deleted connectors stay live in Figma until removed by hand
+    // (npx @figma/code-connect connect unpublish --node <url>). Record them before the delta goes.
+    report.deletedNotUnpublished = pending.deleted || [];
+    for (const item of report.deletedNotUnpublished) {
+      console.warn(`Deleted connector still published: ${item.file}${item.url ? ` (${item.url})` : ''}`);
+    }
+    rmSync(DELTA_PATH, { force: true });
+  }
+
   const reportPath = resolve(REPO_ROOT, `docs/code reports/figma-codeconnect-publish-${nowIso().replace(/[:.]/g, '-')}.json`);
   writeJson(reportPath, report);
 
-  appendRolloutLog(`figma:codeconnect:publish ${args.dryRun ? 'dry-run' : 'apply'} unresolved=${unresolved.length}`);
+  appendRolloutLog(`figma:codeconnect:publish ${args.dryRun ? 'dry-run' : 'apply'} unresolved=${unresolved.length}${delta ? ` delta=${delta.written.length}` : ''}`);
 
   console.log(JSON.stringify({
     ok: true,
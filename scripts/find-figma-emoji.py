@@ -1,36 +1,13 @@
 #!/usr/bin/env python3
-"""Find all emoji text nodes in the current Figma page."""
-import json
-import os
-import subprocess
-import sys
-from pathlib import Path
-
-REPO_ROOT = Path(__file__).resolve().parents[1]
-
+"""Find all emoji text nodes in the current Figma page.
 
-def resolve_foxy_tool():
-    explicit = os.environ.get("FOXY_TOOL_CALL")
-    if explicit:
-        p = Path(explicit).expanduser().resolve()
-        if p.exists():
-            return p
-        raise FileNotFoundError(f"FOXY_TOOL_CALL does not exist: {p}")
-
-    foxy_root = os.environ.get("FOXY_ROOT")
-    if foxy_root:
-        p = Path(foxy_root).expanduser().resolve() / "scripts" / "foxy-tool-call.mjs"
-        if p.exists():
-            return p
-        raise FileNotFoundError(f"FOXY_ROOT configured but tool missing: {p}")
+Pass --ndjson to print one JSON node record per line instead of the summary.
+"""
+import sys
 
-    sibling = (REPO_ROOT.parent / "foxy-design-system-master" / "scripts" / "foxy-tool-call.mjs").resolve()
-    if sibling.exists():
-        return sibling
+from foxy_bridge import BridgeError, FoxyBridge
+from foxy_result import iter_items, tool_data, tool_payload, write_ndjson
 
-    raise FileNotFoundError(
-        "Unable to resolve foxy-tool-call.mjs. Set FOXY_TOOL_CALL or FOXY_ROOT."
-    )
 
 code = r"""
 const page = figma.currentPage;
@@ -60,32 +37,19 @@ page.findAll(n => {
 return results;
 """
 
-FOXY_TOOL = resolve_foxy_tool()
-FOXY_DIR = FOXY_TOOL.parent.parent
-
-result = subprocess.run(
-    ["node", str(FOXY_TOOL)],
-    capture_output=True, text=True,
-    cwd=str(FOXY_DIR),
-    env={
-        **os.environ,
-        "JOIN_CHANNEL": os.environ.get("JOIN_CHANNEL", "default"),
-        "TOOL": "execute_figma_code",
-        "ARGS": json.dumps({"code": code.strip()}),
-    },
-    timeout=30,
-)
-
-raw = result.stdout
-idx = raw.find("RESULT ")
-if idx < 0:
+try:
+    with FoxyBridge() as bridge:
+        obj = bridge.call("execute_figma_code", {"code": code.strip()})
+except BridgeError as exc:
     print("No RESULT found")
-    print(raw[:500])
+    print(str(exc)[:500])
     sys.exit(1)
 
-obj = json.loads(raw[idx + 7:])
-inner = json.loads(obj["content"][0]["text"])
-data = inner["data"]
+data = tool_data(tool_payload(obj))
+
+if "--ndjson" in sys.argv[1:]:
+    write_ndjson(iter_items(data), sys.stdout)
+    sys.exit(0)
 
 for item in data:
     print(f"{item['chars']}  id={item['id']}  parentId={item['parentId']}  parentType={item['parentType']}")
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Alias-flattened widget CSS per Color mode (SDS Light / SDS Dark).
+
+Every `var(--sds-…)` in shared.css and in the widgets' <style> blocks is
+replaced by the literal it resolves to in a mode, so a widget iframe does no
+custom-property lookup at render time and needs no token sheet.
+
+Token values per mode are merged like figma-generate-tokens.mjs does: the
+Color mode's tokens, then every other collection's default mode (Responsive
+→ Desktop). The `--sds-comp-*` component aliases are not Figma variables; they
+are read from the generated sheets in mcp-server/tokens (the dark sheet's
+overrides apply to SDS Dark). Alias chains are followed to the end. An
+undefined token falls back to its var() fallback, or is left as var() and
+reported.
+
+The widget scripts (mcp-server/src/widgets/*.ts) also inject markup with
+inline var(--sds-…) styles at runtime, which no stylesheet pass can see. Those
+tokens are collected from the sources, reported, and kept defined in a small
+:root block at the top of the flattened shared.css, with their literal values.
+
+Output goes to mcp-server/dist/flat-css/<mode>/: shared.css and one
+<widget>.css per widget. --inline is a post-build step instead (npm run
+build:flat in mcp-server): it takes the single-file widgets vite built into
+mcp-server/dist/widgets, whose scripts and styles are already inlined, and
+writes each one as <mode>/<widget>.html with its styles flattened. The token
+declarations vite inlined are dropped, apart from the :root block for the
+script-referenced tokens, so the page can be shipped as is.
+
+    python3 scripts/flatten_css.py [--inline] [--mode "SDS Dark"] [--json]
+"""
+import argparse
+import json
+import re
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+NORMALIZED_PATH = REPO_ROOT / "tokens" / "figma" / "variables.normalized.json"
+MCP_DIR = REPO_ROOT / "mcp-server"
+WIDGETS_DIR = MCP_DIR / "widgets"
+BUILT_DIR = MCP_DIR / "dist" / "widgets"
+SCRIPTS_DIR = MCP_DIR / "src" / "widgets"
+SHARED_CSS = SCRIPTS_DIR / "shared.css"
+SHEETS = {"light": MCP_DIR / "tokens" / "figma-tokens-light.css", "dark": MCP_DIR / "tokens" / "figma-tokens-dark.css"}
+DEFAULT_OUT = MCP_DIR / "dist" / "flat-css"
+COMPONENT_PREFIX = "--sds-comp-"
+MAX_DEPTH = 16
+
+# var(--name) or var(--name, fallback); the fallback may hold one level of parentheses
+_VAR = re.compile(r"var\(\s*(--[\w-]+)\s*(?:,\s*((?:[^()]|\([^()]*\))*?))?\s*\)")
+_DECL = re.compile(r"(--[\w-]+)\s*:\s*([^;{}]+);")
+_STYLE = re.compile(r"(<style\b[^>]*>)(.*?)(</style>)", re.DOTALL | re.IGNORECASE)
+_STYLE_ATTR = re.compile(r"((?<![\w-])style\s*=\s*)([\"'])(.*?)\2", re.DOTALL | re.IGNORECASE)
+# a --sds-* custom property declaration, and a rule left empty once they are gone
+_TOKEN_DECL = re.compile(r"(?<=[{;])\s*--sds-[\w-]+\s*:[^;{}]*(?:;|(?=\}))")
+_EMPTY_RULE = re.compile(r"(?:^|(?<=[{}]))[^{};]*\{\s*\}")
+_TOKEN_IMPORT = re.compile(r"@import\s+['\"][^'\"]*figma-tokens-[\w-]+\.css['\"]\s*;\n?")
+
+Mode = namedtuple("Mode", "id name slug dark")
+
+
+def load_modes(data):
+    """The Color modes (light first) from modeSelection."""
+    selection = data.get("modeSelection", {})
+    modes = []
+    for kind in ("light", "dark"):
+        mode_id = selection.get(f"{kind}ModeId")
+        if mode_id:
+            name = selection.get(f"{kind}ModeName") or data.get("modeMeta", {}).get(mode_id, {}).get("modeName", kind)
+            modes.append(Mode(mode_id, name, re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-"), kind == "dark"))
+    return modes
+
+
+def collection_values(data, chosen=None):
+    """{css var: value} with one mode per collection, merged in figma-generate-tokens.mjs order.
+
+    `chosen` maps collection id → mode id; other collections use their default
+    mode. The Color collection's tokens go first and the rest are laid over them.
+    """
+    by_mode, meta = data.get("byMode", {}), data.get("modeMeta", {})
+    chosen = chosen or {}
+    light = data.get("modeSelection", {}).get("lightModeId")
+    color_collection = meta.get(light, {}).get("collectionId")
+    values = dict(by_mode.get(chosen.get(color_collection, light), {}))
+    for mode_id, info in meta.items():
+        collection = info.get("collectionId")
+        if collection == color_collection:
+            continue
+        if mode_id == chosen[collection] if collection in chosen else info.get("isDefault"):
+            values.update(by_mode.get(mode_id, {}))
+    return values
+
+
+def token_values(data, mode):
+    """{css var: value} for one Color mode, every other collection in its default mode."""
+    return collection_values(data, {data.get("modeMeta", {}).get(mode.id, {}).get("collectionId"): mode.id})
+
+
+def component_aliases(dark=False):
+    """--sds-comp-* declarations from the generated sheets (dark overrides on top for dark)."""
+    aliases = {}
+    for kind in ("light", "dark") if dark else ("light",):
+        try:
+            css = SHEETS[kind].read_text(encoding="utf-8")
+        except OSError:
+            continue
+        if kind == "dark":
+            # the sheet repeats its overrides under @media and [data-theme]; one copy is enough
+            css = css.split("[data-theme", 1)[-1]
+        aliases.update((k, v.strip()) for k, v in _DECL.findall(css) if k.startswith(COMPONENT_PREFIX))
+    return aliases
+
+
+class Flattener:
+    """Resolves var(--sds-…) references to literals for one mode."""
+
+    def __init__(self, values):
+        self.values = values
+        self.resolved = {}
+        self.unresolved = set()
+
+    def resolve(self, token, depth=0):
+        """Literal value of a token, or None when it is undefined or cyclic."""
+        if token in self.resolved:
+            return self.resolved[token]
+        self.resolved[token] = None  # a cycle back to this token resolves to None
+        value = self.values.get(token)
+        if value is not None and depth < MAX_DEPTH:
+            value = self.flatten(value, depth + 1)
+            if "var(--sds-" in value:
+                value = None
+        else:
+            value = None
+        self.resolved[token] = value
+        return value
+
+    def flatten(self, css, depth=0):
+        """css with every resolvable var(--sds-…) replaced; innermost var() first."""
+        def replace(m):
+            token, fallback = m.group(1), m.group(2)
+            if not token.startswith("--sds-"):
+                return m.group(0)
+            value = self.resolve(token, depth)
+            if value is not None:
+                return value
+            if fallback is not None:
+                return fallback.strip()
+            self.unresolved.add(token)
+            return m.group(0)
+
+        for _ in range(MAX_DEPTH):
+            updated = _VAR.sub(replace, css)
+            if updated == css:
+                break
+            css = updated
+        return css
+
+
+def script_tokens(scripts_dir=SCRIPTS_DIR):
+    """{token: ["file:line", …]} of var(--sds-…) uses in the widget scripts."""
+    uses = {}
+    for path in sorted(Path(scripts_dir).glob("*.ts")):
+        text = path.read_text(encoding="utf-8")
+        for m in _VAR.finditer(text):
+            if m.group(1).startswith("--sds-"):
+                line = text.count("\n", 0, m.start()) + 1
+                uses.setdefault(m.group(1), []).append(f"{path.name}:{line}")
+    return uses
+
+
+def runtime_root(flattener, tokens):
+    """:root block defining `tokens` as literals, for var() uses the stylesheets never see."""
+    declarations = []
+    for token in sorted(tokens):
+        value = flattener.resolve(token)
+        if value is None:
+            flattener.unresolved.add(token)
+        else:
+            declarations.append(f"  {token}: {value};\n")
+    return f":root {{\n{''.join(declarations)}}}\n" if declarations else ""
+
+
+def count_vars(css):
+    return len(re.findall(r"var\(\s*--sds-", css))
+
+
+def drop_token_declarations(css):
+    """css without --sds-* declarations and the rules (and at-rules) that leaves empty."""
+    css = _TOKEN_DECL.sub("", css)
+    while True:
+        pruned = _EMPTY_RULE.sub("", css)
+        if pruned == css:
+            return css
+        css = pruned
+
+
+def flatten_html(html, flattener, root_block=None):
+    """Widget HTML with its <style> blocks and style="" attributes flattened.
+
+    With root_block (a built single-file widget) the token declarations are
+    dropped from its styles and root_block is put at the top of the first one.
+    """
+    def style(m):
+        css = flattener.flatten(m.group(2))
+        if root_block is not None:
+            css = drop_token_declarations(css)
+        return m.group(1) + css + m.group(3)
+
+    html = _STYLE.sub(style, html)
+    html = _STYLE_ATTR.sub(lambda m: m.group(1) + m.group(2) + flattener.flatten(m.group(3)) + m.group(2), html)
+    if root_block:
+        html = _STYLE.sub(lambda m: m.group(1) + root_block + m.group(2) + m.group(3), html, count=1)
+    return html
+
+
+def widget_css(html):
+    return "".join(m.group(2) for m in _STYLE.finditer(html))
+
+
+def build(modes, out_dir=DEFAULT_OUT, inline=False, normalized=NORMALIZED_PATH, built_dir=BUILT_DIR):
+    """Write the flattened files; returns the savings report.
+
+    With inline the sources are the built widgets in built_dir.
+    """
+    data = json.loads(Path(normalized).read_text())
+    shared_source = SHARED_CSS.read_text(encoding="utf-8")
+    shared_rules = _TOKEN_IMPORT.sub("", shared_source)
+    sheets_bytes = sum(len(p.read_bytes()) for p in SHEETS.values() if p.exists())
+    widgets = sorted(Path(built_dir if inline else WIDGETS_DIR).glob("*.html"))
+    if inline and not widgets:
+        raise FileNotFoundError(
+            f"no built widgets in {_label(built_dir)}; run `npm run build` in mcp-server first"
+        )
+    runtime = script_tokens()
+    report = {"outDir": str(out_dir), "inline": inline, "runtimeTokens": runtime, "modes": {}}
+
+    for mode in modes:
+        flattener = Flattener({**token_values(data, mode), **component_aliases(mode.dark)})
+        target = Path(out_dir) / mode.slug
+        target.mkdir(parents=True, exist_ok=True)
+        root_block = runtime_root(flattener, runtime)
+        flat_shared = root_block + flattener.flatten(shared_rules)
+        if not inline:
+            (target / "shared.css").write_text(flat_shared, encoding="utf-8")
+
+        # what one widget iframe loads: the token sheets, shared.css and its own styles
+        before_bytes = after_bytes = before_vars = after_vars = 0
+        rows = []
+        for path in widgets:
+            html = path.read_text(encoding="utf-8")
+            if inline:
+                # the built page already carries shared.css and the token sheets
+                output = flatten_html(html, flattener, root_block)
+                (target / path.name).write_text(output, encoding="utf-8")
+                row = {
+                    "widget": path.stem,
+                    "bytesBefore": len(html.encode()),
+                    "bytesAfter": len(output.encode()),
+                    "varsBefore": count_vars(html),
+                    "varsAfter": count_vars(output),
+                }
+            else:
+                source = widget_css(html)
+                output = flattener.flatten(source)
+                (target / f"{path.stem}.css").write_text(output, encoding="utf-8")
+                row = {
+                    "widget": path.stem,
+                    "bytesBefore": len(source.encode()) + len(shared_source.encode()) + sheets_bytes,
+                    "bytesAfter": len(output.encode()) + len(flat_shared.encode()),
+                    "varsBefore": count_vars(source) + count_vars(shared_source),
+                    "varsAfter": count_vars(output) + count_vars(flat_shared),
+                }
+            rows.append(row)
+            before_bytes += row["bytesBefore"]
+            after_bytes += row["bytesAfter"]
+            before_vars += row["varsBefore"]
+            after_vars += row["varsAfter"]
+
+        report["modes"][mode.name] = {
+            "dir": str(target),
+            "bytesBefore": before_bytes,
+            "bytesAfter": after_bytes,
+            "varsBefore": before_vars,
+            "varsAfter": after_vars,
+            "unresolved": sorted(flattener.unresolved),
+            "widgets": rows,
+        }
+    return report
+
+
+def _label(path):
+    path = Path(path)
+    return str(path.relative_to(REPO_ROOT)) if path.is_relative_to(REPO_ROOT) else str(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alias-flattened widget CSS per Color mode.")
+    parser.add_argument("--normalized", type=Path, default=NORMALIZED_PATH)
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT)
+    parser.add_argument("--mode", action="append", help="mode name to build (repeatable; default: light and dark)")
+    parser.add_argument("--inline", action="store_true",
+                        help="flatten the built single-file widgets (post-build step after npm run build)")
+    parser.add_argument("--built", type=Path, default=BUILT_DIR, help="built widgets for --inline")
+    parser.add_argument("--json", action="store_true", help="print the savings report as JSON")
+    args = parser.parse_args()
+
+    modes = load_modes(json.loads(args.normalized.read_text()))
+    if args.mode:
+        wanted = {m.lower() for m in args.mode}
+        unknown = wanted - {m.name.lower() for m in modes}
+        if unknown:
+            parser.error(f"unknown mode(s): {', '.join(sorted(unknown))}; have {', '.join(m.name for m in modes)}")
+        modes = [m for m in modes if m.name.lower() in wanted]
+
+    try:
+        report = build(modes, args.out, args.inline, args.normalized, args.built)
+    except FileNotFoundError as exc:
+        parser.error(str(exc))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    for name, result in report["modes"].items():
+        saved = result["bytesBefore"] - result["bytesAfter"]
+        print(f"{name} → {_label(result['dir'])}")
+        print(f"  {len(result['widgets'])} widgets: {result['bytesBefore']:,} → {result['bytesAfter']:,} bytes "
+              f"(-{saved:,}, {saved / (result['bytesBefore'] or 1):.0%}), "
+              f"var() {result['varsBefore']} → {result['varsAfter']}")
+        if result["unresolved"]:
+            print(f"  unresolved (left as var()): {', '.join(result['unresolved'])}")
+    if report["runtimeTokens"]:
+        print("Kept in :root for script-injected markup: "
+              + ", ".join(f"{t} ({', '.join(uses)})" for t, uses in sorted(report["runtimeTokens"].items())))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
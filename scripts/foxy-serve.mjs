@@ -0,0 +1,123 @@
+#!/usr/bin/env node
+/**
+ * Pipelining front end for foxy-tool-call.mjs, used by foxy_bridge.py.
+ *
+ * foxy-tool-call.mjs runs one TOOL/ARGS call per process. This shim stays up
+ * for the whole run, prints READY, then reads newline-delimited requests on
+ * stdin and answers each with one RESULT line on stdout:
+ *
+ *   -> {"id": 1, "tool": "export_node_as_image", "args": {...}, "timeout": 30}
+ *   <- RESULT {"id": 1, "content": [...]}
+ *   <- RESULT {"id": 1, "error": "export_node_as_image timed out after 30s"}
+ *
+ * foxy-tool-call.mjs serves one call per process and has no way to keep its
+ * channel connection between calls. So each request still runs in its own
+ * process, which starts Node and joins JOIN_CHANNEL again, at most
+ * FOXY_SERVE_WORKERS (default 4) at once. The shim adds request ids,
+ * pipelining and per-request timeouts. It does not save the per-call startup.
+ *
+ * Env: FOXY_TOOL_CALL (required, path of foxy-tool-call.mjs), JOIN_CHANNEL,
+ * FOXY_SERVE_WORKERS.
+ */
+import { spawn } from "child_process";
+import readline from "readline";
+
+const TOOL = process.env.FOXY_TOOL_CALL;
+if (!TOOL) {
+  console.error("FOXY_TOOL_CALL required");
+  process.exit(2);
+}
+const WORKERS = Math.max(1, parseInt(process.env.FOXY_SERVE_WORKERS || "4", 10) || 1);
+const DEFAULT_TIMEOUT = 30;
+const MARKER = "RESULT ";
+
+const queue = [];
+let running = 0;
+let closing = false;
+
+function reply(id, body) {
+  process.stdout.write(MARKER + JSON.stringify({ id, ...body }) + "\n");
+}
+
+function resultLine(stdout) {
+  const idx = stdout.indexOf(MARKER);
+  if (idx < 0) return null;
+  const end = stdout.indexOf("\n", idx);
+  try {
+    return JSON.parse(stdout.slice(idx + MARKER.length, end < 0 ? undefined : end));
+  } catch {
+    return null;
+  }
+}
+
+function run({ id, tool, args, timeout }) {
+  return new Promise((resolve) => {
+    const env = { ...process.env, TOOL: tool, ARGS: JSON.stringify(args ?? {}) };
+    let child;
+    try {
+      child = spawn(process.execPath, [TOOL], { env, stdio: ["ignore", "pipe", "pipe"] });
+    } catch (err) {
+      // E2BIG and friends: ARGS travels in the environment
+      reply(id, { error: `${tool} could not start: ${err.message}` });
+      return resolve();
+    }
+    const out = [];
+    const err = [];
+    let timedOut = false;
+    const seconds = timeout || DEFAULT_TIMEOUT;
+    const timer = setTimeout(() => {
+      timedOut = true;
+      child.kill("SIGKILL");
+    }, seconds * 1000);
+    child.stdout.on("data", (chunk) => out.push(chunk));
+    child.stderr.on("data", (chunk) => err.push(chunk));
+    child.on("error", (e) => {
+      clearTimeout(timer);
+      reply(id, { error: `${tool} could not start: ${e.message}` });
+      resolve();
+    });
+    child.on("close", (code) => {
+      clearTimeout(timer);
+      if (timedOut) {
+        reply(id, { error: `${tool} timed out after ${seconds}s` });
+        return resolve();
+      }
+      const stdout = Buffer.concat(out).toString("utf-8");
+      const result = resultLine(stdout);
+      if (result) reply(id, result);
+      else reply(id, { error: `No RESULT from ${tool} (exit ${code}): ${(stdout + Buffer.concat(err)).slice(-200)}` });
+      resolve();
+    });
+  });
+}
+
+function pump() {
+  while (running < WORKERS && queue.length) {
+    running++;
+    run(queue.shift()).then(() => {
+      running--;
+      pump();
+    });
+  }
+  if (closing && !running && !queue.length) process.exit(0);
+}
+
+const rl = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+rl.on("line", (line) => {
+  if (!line.trim()) return;
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (e) {
+    console.error(`Malformed request: ${e.message}`);
+    return;
+  }
+  queue.push(request);
+  pump();
+});
+rl.on("close", () => {
+  closing = true;
+  pump();
+});
+
+console.log("READY");
@@ -0,0 +1,290 @@
+"""
+Pipelined foxy-tool-call bridge shared by the Figma automation scripts.
+
+A bridge process (foxy-serve.mjs, next to this file) is started once per run
+and takes tool calls as newline-delimited JSON over stdin/stdout:
+
+    -> {"id": 1, "tool": "export_node_as_image", "args": {...}, "timeout": 30}
+    <- RESULT {"id": 1, "content": [...]}
+    <- RESULT {"id": 1, "error": "..."}
+
+Calls are pipelined: submit() returns a Future straight away and responses are
+matched back by request id, so many calls can be in flight on one bridge;
+`workers` bounds how many run at once. BridgePool spreads calls over several
+bridges.
+
+The bridge does not keep a channel connection open. foxy-tool-call.mjs serves
+exactly one TOOL/ARGS call per process, so every call still starts Node and
+joins JOIN_CHANNEL. What the bridge gives is request ids, bounded concurrency
+and per-call timeouts behind one interface.
+
+If the bridge does not print READY (no node, or it exits), calls are served in
+one-shot mode instead: one TOOL/ARGS foxy-tool-call.mjs process per call from
+this process, at most `workers` at once.
+"""
+import collections
+import itertools
+import json
+import os
+import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from foxy_result import ResultError, decode_envelope
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SERVE_SHIM = Path(__file__).resolve().with_name("foxy-serve.mjs")
+DEFAULT_TIMEOUT = 30
+START_TIMEOUT = 15
+
+
+class BridgeError(RuntimeError):
+    """Raised when a bridge call produces no usable RESULT."""
+
+
+def resolve_foxy_tool():
+    explicit = os.environ.get("FOXY_TOOL_CALL")
+    if explicit:
+        p = Path(explicit).expanduser().resolve()
+        if p.exists():
+            return p
+        raise FileNotFoundError(f"FOXY_TOOL_CALL does not exist: {p}")
+
+    foxy_root = os.environ.get("FOXY_ROOT")
+    if foxy_root:
+        p = Path(foxy_root).expanduser().resolve() / "scripts" / "foxy-tool-call.mjs"
+        if p.exists():
+            return p
+        raise FileNotFoundError(f"FOXY_ROOT configured but tool missing: {p}")
+
+    sibling = (REPO_ROOT.parent / "foxy-design-system-master" / "scripts" / "foxy-tool-call.mjs").resolve()
+    if sibling.exists():
+        return sibling
+
+    raise FileNotFoundError(
+        "Unable to resolve foxy-tool-call.mjs. Set FOXY_TOOL_CALL or FOXY_ROOT."
+    )
+
+
+def parse_result(raw):
+    """Extract the RESULT envelope from foxy-tool-call stdout."""
+    try:
+        return decode_envelope(raw)
+    except ResultError as exc:
+        raise BridgeError(str(exc)) from exc
+
+
+def wait_result(fut, tool, timeout=DEFAULT_TIMEOUT):
+    """Block on a submitted call, reporting timeouts as BridgeError.
+
+    A call that times out is cancelled, which drops it from its bridge.
+    """
+    try:
+        return fut.result(timeout)
+    except TimeoutError as exc:
+        fut.cancel()
+        raise BridgeError(f"{tool} timed out after {timeout}s") from exc
+
+
+class FoxyBridge:
+    """One foxy-serve.mjs process with pipelined requests, or one-shot calls without it."""
+
+    def __init__(self, tool_path=None, channel=None, start_timeout=START_TIMEOUT, workers=1, shim=SERVE_SHIM):
+        self.tool_path = Path(tool_path) if tool_path else resolve_foxy_tool()
+        self.cwd = self.tool_path.parent.parent
+        self.channel = channel or os.environ.get("JOIN_CHANNEL", "default")
+        self.start_timeout = start_timeout
+        self.workers = max(1, workers)
+        self.shim = Path(shim)
+        self.served = False
+        self._proc = None
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stderr = collections.deque(maxlen=50)
+        self._ready = threading.Event()
+        self._oneshot = None
+
+    def _env(self, **extra):
+        return {**os.environ, "JOIN_CHANNEL": self.channel, **extra}
+
+    def start(self):
+        """Spawn the bridge and wait for READY; fall back to one-shot calls."""
+        if self._proc or self._oneshot:
+            return self
+        env = self._env(FOXY_TOOL_CALL=str(self.tool_path), FOXY_SERVE_WORKERS=str(self.workers))
+        env.pop("TOOL", None)
+        env.pop("ARGS", None)
+        try:
+            self._proc = subprocess.Popen(
+                ["node", str(self.shim)],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                text=True, encoding="utf-8", bufsize=1,
+                cwd=str(self.cwd), env=env,
+            )
+        except OSError:
+            self._proc = None
+            self._oneshot = ThreadPoolExecutor(max_workers=self.workers)
+            return self
+
+        threading.Thread(target=self._read_stdout, args=(self._proc,), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self._proc,), daemon=True).start()
+
+        self._ready.wait(self.start_timeout)
+        if not self.served:
+            self._kill()
+            self._oneshot = ThreadPoolExecutor(max_workers=self.workers)
+        return self
+
+    def _read_stdout(self, proc):
+        for line in proc.stdout:
+            if not self._ready.is_set():
+                if line.strip() == "READY":
+                    self.served = True
+                    self._ready.set()
+                continue
+            if not line.startswith("RESULT "):
+                continue
+            try:
+                obj = decode_envelope(line)
+            except ResultError:
+                continue
+            with self._lock:
+                fut = self._pending.pop(obj.pop("id", None), None)
+            if fut is None or fut.done():
+                continue
+            if "error" in obj and "content" not in obj:
+                fut.set_exception(BridgeError(obj["error"]))
+            else:
+                fut.set_result(obj)
+        self._ready.set()
+        self._fail_pending(BridgeError(
+            f"Bridge exited (code {proc.wait()}): {''.join(self._stderr)[-200:]}"
+        ))
+
+    def _read_stderr(self, proc):
+        for line in proc.stderr:
+            self._stderr.append(line)
+
+    def _fail_pending(self, exc):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+
+    def _run_once(self, tool, args, timeout):
+        try:
+            result = subprocess.run(
+                ["node", str(self.tool_path)],
+                capture_output=True, text=True,
+                cwd=str(self.cwd),
+                env=self._env(TOOL=tool, ARGS=json.dumps(args)),
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired as exc:
+            raise BridgeError(f"{tool} timed out after {timeout}s") from exc
+        except OSError as exc:
+            # E2BIG when ARGS outgrows the environment, ENOENT without node
+            raise BridgeError(f"{tool} could not start: {exc}") from exc
+        return parse_result(result.stdout)
+
+    def submit(self, tool, args, timeout=DEFAULT_TIMEOUT):
+        """Queue a tool call and return a Future for its RESULT object."""
+        self.start()
+        if self._oneshot:
+            return self._oneshot.submit(self._run_once, tool, args, timeout)
+
+        fut = Future()
+        request_id = next(self._ids)
+        line = json.dumps({"id": request_id, "tool": tool, "args": args, "timeout": timeout}) + "\n"
+        fut.add_done_callback(lambda _: self._forget(request_id))
+        error = None
+        with self._lock:
+            self._pending[request_id] = fut
+            try:
+                self._proc.stdin.write(line)
+                self._proc.stdin.flush()
+            except (BrokenPipeError, ValueError) as exc:
+                error = BridgeError(f"Bridge not accepting requests: {exc}")
+        if error:
+            fut.set_exception(error)  # the done callback drops it from _pending
+        return fut
+
+    def _forget(self, request_id):
+        with self._lock:
+            self._pending.pop(request_id, None)
+
+    def call(self, tool, args, timeout=DEFAULT_TIMEOUT):
+        """Run a tool call and block for its RESULT object."""
+        return wait_result(self.submit(tool, args, timeout), tool, timeout)
+
+    def _kill(self):
+        if self._proc and self._proc.poll() is None:
+            self._proc.kill()
+            self._proc.wait()
+        self._proc = None
+
+    def close(self):
+        if self._proc:
+            try:
+                self._proc.stdin.close()
+                self._proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+            self._kill()
+        if self._oneshot:
+            self._oneshot.shutdown(wait=True)
+            self._oneshot = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BridgePool:
+    """Round-robin pool of FoxyBridge processes (FOXY_BRIDGE_PROCS, default 1).
+
+    `workers` is the concurrency of the whole pool, split across the bridges.
+    """
+
+    def __init__(self, size=None, workers=1, **kwargs):
+        size = max(1, size or int(os.environ.get("FOXY_BRIDGE_PROCS", "1")))
+        size = min(size, max(1, workers))
+        share, extra = divmod(max(1, workers), size)
+        self.bridges = [FoxyBridge(workers=share + (i < extra), **kwargs) for i in range(size)]
+        self._next = itertools.cycle(self.bridges)
+        self._lock = threading.Lock()
+
+    def start(self):
+        threads = [threading.Thread(target=b.start) for b in self.bridges]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return self
+
+    @property
+    def served(self):
+        return all(b.served for b in self.bridges)
+
+    def submit(self, tool, args, timeout=DEFAULT_TIMEOUT):
+        with self._lock:
+            bridge = next(self._next)
+        return bridge.submit(tool, args, timeout)
+
+    def call(self, tool, args, timeout=DEFAULT_TIMEOUT):
+        return wait_result(self.submit(tool, args, timeout), tool, timeout)
+
+    def close(self):
+        for b in self.bridges:
+            b.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,132 @@
+"""
+Decoder for the `RESULT {...}` envelope printed by foxy-tool-call.mjs.
+
+The envelope is an MCP tool result whose text content holds the tool's own
+JSON ({"success": ..., "data": ...}); `data` is sometimes JSON-encoded again.
+The envelope is parsed with JSONDecoder.raw_decode at the marker offset, so the
+RESULT line is not sliced out of the raw output first. That parse is complete:
+a multi-megabyte image is held once in the raw output and once as the decoded
+string. The text items inside are decoded only when iter_payloads() reaches
+them, and a JSON-encoded `data` string only when tool_data() is asked for it.
+"""
+import json
+
+MARKER = "RESULT "
+
+_decoder = json.JSONDecoder()
+
+
+class ResultError(ValueError):
+    """Raised when output holds no decodable RESULT envelope."""
+
+
+def decode_envelope(raw, start=0):
+    """Decode the first RESULT envelope at or after `start`."""
+    idx = raw.find(MARKER, start)
+    if idx < 0:
+        raise ResultError(f"No RESULT in output: {raw[:200]}")
+    try:
+        obj, _ = _decoder.raw_decode(raw, idx + len(MARKER))
+    except json.JSONDecodeError as exc:
+        raise ResultError(f"Malformed RESULT at offset {idx}: {exc}") from exc
+    return obj
+
+
+def iter_envelopes(raw):
+    """Yield every RESULT envelope in the output, skipping malformed ones."""
+    pos = 0
+    while True:
+        idx = raw.find(MARKER, pos)
+        if idx < 0:
+            return
+        try:
+            obj, pos = _decoder.raw_decode(raw, idx + len(MARKER))
+        except json.JSONDecodeError:
+            pos = idx + len(MARKER)
+            continue
+        yield obj
+
+
+def maybe_json(text):
+    """Decode text that holds a JSON document; return other strings unchanged."""
+    if not isinstance(text, str):
+        return text
+    start = len(text) - len(text.lstrip())
+    if text[start:start + 1] not in ("{", "[", '"'):
+        return text
+    try:
+        value, end = _decoder.raw_decode(text, start)
+    except json.JSONDecodeError:
+        return text
+    return value if not text[end:].strip() else text
+
+
+def iter_payloads(envelope):
+    """Yield each content item of an envelope: text items decoded, others as-is."""
+    for item in envelope.get("content", []):
+        if item.get("type") == "text":
+            yield maybe_json(item.get("text", ""))
+        else:
+            yield item
+
+
+def tool_payload(envelope):
+    """The tool's own result object (first content item)."""
+    for payload in iter_payloads(envelope):
+        return payload
+    raise ResultError("RESULT envelope has no content")
+
+
+def tool_data(payload):
+    """`data` of a tool payload, decoding a JSON-encoded string once more."""
+    data = payload.get("data", payload) if isinstance(payload, dict) else payload
+    return maybe_json(data)
+
+
+def is_success(payload):
+    return not isinstance(payload, dict) or payload.get("success", True)
+
+
+def iter_images(envelope):
+    """Yield base64 image data from every shape the export tools return.
+
+    Checked in order: image items in the envelope, in the payload's
+    `content[]`, in `data.content[]`, and finally a bare base64 `data` string.
+    """
+    found = False
+    for payload in iter_payloads(envelope):
+        if isinstance(payload, dict) and payload.get("type") == "image":
+            found = True
+            yield payload["data"]
+            continue
+        if not isinstance(payload, dict):
+            continue
+        data = tool_data(payload)
+        # Without a `data` key tool_data() hands back the payload itself
+        for source in (payload,) if data is payload else (payload, data):
+            if isinstance(source, dict):
+                for item in source.get("content", []):
+                    if isinstance(item, dict) and item.get("type") == "image":
+                        found = True
+                        yield item["data"]
+        if not found and isinstance(data, str) and len(data) > 100:
+            found = True
+            yield data
+
+
+def iter_items(data):
+    """Yield array elements one by one (a non-array value is a single item)."""
+    if isinstance(data, list):
+        yield from data
+    elif data is not None:
+        yield data
+
+
+def write_ndjson(items, fp):
+    """Write items as newline-delimited JSON; returns the count written."""
+    count = 0
+    for item in items:
+        fp.write(json.dumps(item, ensure_ascii=False, separators=(",", ":")))
+        fp.write("\n")
+        count += 1
+    return count
@@ -8,8 +8,19 @@ that are used INSIDE the 12 widget compositions.
 
 Run: python3 scripts/generate-ds-connectors.py
 Then: cd figma && npx @figma/code-connect publish --token $FIGMA_ACCESS_TOKEN
+
+Connectors are rendered in memory and compared against the content hashes
+in .figma-cache/ds-connectors-manifest.json; only changed files are written,
+so untouched connectors keep their mtimes. Connectors that are no longer in
+DS_COMPONENTS are deleted. The changed and deleted files are added to
+.figma-cache/ds-connectors-delta.json for the publish step
+(npm run figma:codeconnect:publish -- --apply --delta). The delta accumulates
+over runs until a successful publish consumes it. Publishing does not
+unpublish deleted connectors; the publish step lists them for manual removal.
 """
 
+import argparse
+import hashlib
 import os
 import json
 
@@ -17,7 +28,16 @@ FIGMA_FILE_KEY = "dbPjFeLfAFp8Sz9YGPs0CZ"
 FIGMA_FILE_NAME = "MCPUI-DS-V2"
 BASE_URL = f"https://www.figma.com/design/{FIGMA_FILE_KEY}/{FIGMA_FILE_NAME}"
 
-OUT_DIR = os.path.join(os.path.dirname(__file__), "..", "figma", "code-connect", "components", "ds")
+REPO_ROOT = os.path.join(os.path.dirname(__file__), "..")
+DS_SOURCE_DIR = "figma/code-connect/components/ds"
+OUT_DIR = os.path.join(REPO_ROOT, *DS_SOURCE_DIR.split("/"))
+MAPPINGS_PATH = os.path.join(REPO_ROOT, "figma", "code-connect", "mappings.source.json")
+DEFAULT_MANIFEST = os.path.join(REPO_ROOT, ".figma-cache", "ds-connectors-manifest.json")
+DEFAULT_DELTA = os.path.join(REPO_ROOT, ".figma-cache", "ds-connectors-delta.json")
+
+# Header of every generated connector: "// <Name> — Design System Component"
+# followed by "// Figma node: <id>"
+GENERATED_MARKER = "— Design System Component"
 
 # ── DS Component Definitions ──────────────────────────────────────────
 # Each entry: (filename, figma_node_id, component_name, example_jsx)
@@ -814,51 +834,191 @@ figma.connect("{url}", {{
 '''
 
 
-def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
-    
-    created = []
-    for filename, node_id, name, jsx in DS_COMPONENTS:
-        filepath = os.path.join(OUT_DIR, f"{filename}.figma.tsx")
-        content = generate_connector(filename, node_id, name, jsx)
-        with open(filepath, 'w') as f:
-            f.write(content)
-        created.append((filename, node_id, name))
-    
-    print(f"Generated {len(created)} DS component connectors in {OUT_DIR}/")
-    print()
-    for filename, node_id, name in created:
-        print(f"  ✓ {filename}.figma.tsx → {name} ({node_id})")
-    
-    # Also update mappings.source.json
-    mappings_path = os.path.join(os.path.dirname(__file__), "..", "figma", "code-connect", "mappings.source.json")
-    if os.path.exists(mappings_path):
-        with open(mappings_path) as f:
+def render_all():
+    """{connector filename: content} for every DS component, rendered in memory."""
+    return {
+        f"{filename}.figma.tsx": generate_connector(filename, node_id, name, jsx)
+        for filename, node_id, name, jsx in DS_COMPONENTS
+    }
+
+
+def render_mappings():
+    """mappings.source.json text with the DS entries rebuilt from DS_COMPONENTS."""
+    if os.path.exists(MAPPINGS_PATH):
+        with open(MAPPINGS_PATH) as f:
             data = json.load(f)
     else:
         data = {"version": 1, "fileKey": FIGMA_FILE_KEY, "mappings": []}
-    
-    mappings_list = data.get("mappings", [])
-    
-    # Remove existing DS entries
-    mappings_list = [m for m in mappings_list if m.get('label') != 'DS']
-    
-    # Add new DS entries
-    for filename, node_id, name in created:
+
+    # Remove existing DS entries, then add the current ones
+    mappings_list = [m for m in data.get("mappings", []) if m.get('label') != 'DS']
+    for filename, node_id, name, _ in DS_COMPONENTS:
         mappings_list.append({
             "id": filename.lower(),
             "componentName": name,
             "nodeId": node_id,
             "label": "DS",
-            "source": f"figma/code-connect/components/ds/{filename}.figma.tsx"
+            "source": f"{DS_SOURCE_DIR}/{filename}.figma.tsx"
         })
-    
     data["mappings"] = mappings_list
-    
-    with open(mappings_path, 'w') as f:
-        json.dump(data, f, indent=2)
-    
-    print(f"\nUpdated {mappings_path} with {len(created)} DS entries (total: {len(mappings_list)})")
+    return json.dumps(data, indent=2), len(mappings_list)
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def load_json(path):
+    """A JSON object from path, or {} when it is missing or unreadable."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_manifest(path):
+    """{connector filename: {"sha256", "mtime_ns"}} as written by the last run."""
+    return load_json(path).get("files", {})
+
+
+def merge_delta(pending, written, deleted):
+    """(written, deleted) still to publish: a pending delta plus this run's changes.
+
+    A connector deleted now drops out of `written`; one written again drops out
+    of `deleted`. Both map filename → node id.
+    """
+    all_written = {os.path.basename(i["file"]): i["nodeId"] for i in pending.get("written", [])}
+    all_deleted = {os.path.basename(i["file"]): i["nodeId"] for i in pending.get("deleted", [])}
+    for name in written:
+        all_deleted.pop(name, None)
+    for name, node_id in deleted.items():
+        # Fall back to the node id recorded when it was written, if its header was lost
+        all_deleted[name] = node_id or all_written.pop(name, None) or all_deleted.get(name)
+        all_written.pop(name, None)
+    all_written.update(written)
+    return all_written, all_deleted
+
+
+def write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def atomic_write(path, text):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _on_disk(path):
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def generated_node(text):
+    """Node id of a connector this script wrote (from its header comments), else None."""
+    lines = text.split("\n", 4)
+    if len(lines) > 3 and GENERATED_MARKER in lines[2] and lines[3].startswith("// Figma node: "):
+        return lines[3][len("// Figma node: "):].strip()
+    return None
+
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def sync_connectors(rendered, previous, force=False):
+    """Write changed connectors and delete orphans; returns (written, deleted, manifest)."""
+    os.makedirs(OUT_DIR, exist_ok=True)
+    written = []
+    manifest = {}
+    for name, content in rendered.items():
+        path = os.path.join(OUT_DIR, name)
+        digest = content_hash(content)
+        entry = previous.get(name, {})
+        # Same rendered hash and the file untouched since we wrote it: nothing to do
+        unchanged = entry.get("sha256") == digest and entry.get("mtime_ns") == _mtime_ns(path)
+        if force or not (unchanged or _on_disk(path) == content):
+            atomic_write(path, content)
+            written.append(name)
+        manifest[name] = {"sha256": digest, "mtime_ns": _mtime_ns(path)}
+
+    # Orphans: connectors from an earlier run (or carrying our header) that are no longer defined
+    deleted = {}
+    for name in sorted(os.listdir(OUT_DIR)):
+        if not name.endswith(".figma.tsx") or name in rendered:
+            continue
+        path = os.path.join(OUT_DIR, name)
+        node_id = generated_node(_on_disk(path) or "")
+        if name in previous or node_id:
+            os.remove(path)
+            deleted[name] = node_id
+    return written, deleted, manifest
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate Code Connect files for the DS components.")
+    parser.add_argument("--force", action="store_true", help="rewrite every connector")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="content-hash manifest")
+    parser.add_argument("--delta", default=DEFAULT_DELTA,
+                        help="changed and deleted connectors pending publish (accumulated across runs)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rendered = render_all()
+    previous = {} if args.force else load_manifest(args.manifest)
+    written, deleted, manifest = sync_connectors(rendered, previous, args.force)
+
+    print(f"Generated {len(rendered)} DS component connectors in {OUT_DIR}/")
+    print()
+    by_file = {f"{filename}.figma.tsx": (node_id, name) for filename, node_id, name, _ in DS_COMPONENTS}
+    for filename in written:
+        node_id, name = by_file[filename]
+        print(f"  ✓ {filename} → {name} ({node_id})")
+    for filename in deleted:
+        print(f"  ✗ {filename} (no longer defined, deleted)")
+    print(f"  {len(rendered) - len(written)} unchanged")
+
+    # Also update mappings.source.json
+    text, total = render_mappings()
+    mappings_changed = args.force or _on_disk(MAPPINGS_PATH) != text
+    if mappings_changed:
+        atomic_write(MAPPINGS_PATH, text)
+        print(f"\nUpdated {MAPPINGS_PATH} with {len(rendered)} DS entries (total: {total})")
+    else:
+        print(f"\n{MAPPINGS_PATH} unchanged")
+
+    write_json(args.manifest, {"files": manifest})
+    pending = load_json(args.delta)
+    all_written, all_deleted = merge_delta(pending, {n: by_file[n][0] for n in written}, deleted)
+    write_json(args.delta, {
+        "written": [
+            {"file": f"{DS_SOURCE_DIR}/{n}", "nodeId": node_id, "url": node_url(node_id)}
+            for n, node_id in sorted(all_written.items())
+        ],
+        "deleted": [
+            {"file": f"{DS_SOURCE_DIR}/{n}", "nodeId": node_id, "url": node_id and node_url(node_id)}
+            for n, node_id in sorted(all_deleted.items())
+        ],
+        "unchanged": len(rendered) - len(all_written),
+        "mappingsChanged": mappings_changed or bool(pending.get("mappingsChanged")),
+    })
+    print(f"Delta: {len(all_written)} written, {len(all_deleted)} deleted since the last publish"
+          f" → {os.path.relpath(args.delta)}")
 
 
 if __name__ == "__main__":
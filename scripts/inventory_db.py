@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Local SQLite database of component inventories and Figma variables.
+
+    python3 scripts/inventory_db.py import inventory.json [more.json] [--variables variables.raw.json]
+    python3 scripts/inventory_db.py search cart checkout --any      # ranked keyword search
+    python3 scripts/inventory_db.py search butt --prefix            # prefix search
+    python3 scripts/inventory_db.py group --by frame                # counts per page/frame/set
+
+Components keep the normalized fields from inventory_snapshot and are
+indexed on node_id, page, frame and component_set_id. An FTS5 table over
+names and `page / frame / set / name` paths (variables: `collection / name`)
+serves keyword, prefix and bm25-ranked search. The path is also indexed with
+camel-case words split apart, so `cart` finds MiniCart and AddToCart.
+Re-importing a source replaces its rows, and a source whose SHA-256 is
+unchanged is skipped. A database from an older schema is rebuilt empty.
+
+The database defaults to .figma-cache/inventory.sqlite (INVENTORY_DB overrides).
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+from inventory_snapshot import file_digest, load_inventory
+from variable_aliases import payload_meta
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_DB = Path(os.environ.get("INVENTORY_DB", REPO_ROOT / ".figma-cache" / "inventory.sqlite"))
+
+SCHEMA_VERSION = 2
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    sha256 TEXT,
+    fields TEXT
+);
+CREATE TABLE IF NOT EXISTS components (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    node_id TEXT,
+    name TEXT,
+    page TEXT,
+    frame TEXT,
+    component_set_id TEXT,
+    component_set_name TEXT,
+    type TEXT,
+    description TEXT,
+    props TEXT,
+    width REAL,
+    height REAL,
+    variants INTEGER
+);
+CREATE INDEX IF NOT EXISTS components_node_id ON components(node_id);
+CREATE INDEX IF NOT EXISTS components_page ON components(page);
+CREATE INDEX IF NOT EXISTS components_frame ON components(frame);
+CREATE INDEX IF NOT EXISTS components_set ON components(component_set_id);
+CREATE INDEX IF NOT EXISTS components_source ON components(source);
+CREATE TABLE IF NOT EXISTS variables (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    variable_id TEXT,
+    name TEXT,
+    collection TEXT,
+    resolved_type TEXT
+);
+CREATE INDEX IF NOT EXISTS variables_variable_id ON variables(variable_id);
+CREATE INDEX IF NOT EXISTS variables_source ON variables(source);
+CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5(
+    name, path, words, kind UNINDEXED, ref UNINDEXED
+);
+"""
+TABLES = ("sources", "components", "variables", "search")
+
+# Boundaries inside MiniCart, addToCart, HTMLView (HTML|View), Size2X
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+
+BATCH = 10000
+
+GROUP_COLUMNS = {"page": "page", "frame": "frame", "set": "component_set_name", "type": "type"}
+
+
+def connect(path=DEFAULT_DB):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        with db:
+            for table in TABLES:
+                db.execute(f"DROP TABLE IF EXISTS {table}")
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    db.executescript(SCHEMA)
+    return db
+
+
+def camel_words(text):
+    """text with camel-case words split apart, or "" when it has none."""
+    split = _CAMEL.sub(" ", text)
+    return split if split != text else ""
+
+
+def _forget(db, source):
+    for table, kind in (("components", "component"), ("variables", "variable")):
+        db.execute(
+            f"DELETE FROM search WHERE kind = ? AND ref IN (SELECT id FROM {table} WHERE source = ?)",
+            (kind, source),
+        )
+        db.execute(f"DELETE FROM {table} WHERE source = ?", (source,))
+    db.execute("DELETE FROM sources WHERE path = ?", (source,))
+
+
+def source_key(source):
+    """How a dump is recorded in the `source` columns."""
+    return "<stdin>" if source == "-" else str(Path(source).resolve())
+
+
+def _current(db, source, digest):
+    row = db.execute("SELECT sha256 FROM sources WHERE path = ?", (source,)).fetchone()
+    return row is not None and digest is not None and row["sha256"] == digest
+
+
+def import_inventory(db, source, force=False):
+    """Load one inventory dump ('-' reads stdin); returns rows imported, or None if unchanged."""
+    inventory = load_inventory(source)
+    key = source_key(source)
+    if source != "-":
+        digest = inventory.header.get("sha256")
+        if not force and _current(db, key, digest):
+            return None
+    else:
+        digest = None
+
+    with db:
+        _forget(db, key)
+        first = _next_id(db, "components")
+        rows = []
+        terms = []
+        for rowid, c in enumerate(inventory, first):
+            rows.append((
+                rowid, key, c.id, c.name, c.page, c.frame, c.set_id, c.set_name, c.type,
+                c.description, None if c.props is None else json.dumps(c.props),
+                c.width, c.height, c.variants,
+            ))
+            path = " / ".join(p for p in (c.page, c.frame, c.set_name, c.name) if p)
+            terms.append((c.name or "", path, camel_words(path), rowid))
+            if len(rows) >= BATCH:
+                _insert_components(db, rows, terms)
+        _insert_components(db, rows, terms)
+        count = _next_id(db, "components") - first
+        db.execute(
+            "INSERT INTO sources (path, kind, sha256, fields) VALUES (?, 'inventory', ?, ?)",
+            (key, digest, json.dumps(inventory.fields)),
+        )
+    return count
+
+
+def _next_id(db, table):
+    return db.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[0]
+
+
+def _insert_components(db, rows, terms):
+    """Flush one batch; rows carry explicit ids so the search rows can point at them."""
+    db.executemany(
+        "INSERT INTO components (id, source, node_id, name, page, frame, component_set_id,"
+        " component_set_name, type, description, props, width, height, variants)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    db.executemany("INSERT INTO search (name, path, words, kind, ref) VALUES (?, ?, ?, 'component', ?)", terms)
+    rows.clear()
+    terms.clear()
+
+
+def import_variables(db, source, force=False):
+    """Load a raw variables file (variables.raw.json or a rollback snapshot)."""
+    key = source_key(source)
+    digest = file_digest(source)
+    if not force and _current(db, key, digest):
+        return None
+    meta = payload_meta(json.loads(Path(source).read_text()))
+    collections = {cid: c.get("name", cid) for cid, c in meta.get("variableCollections", {}).items()}
+
+    with db:
+        _forget(db, key)
+        count = 0
+        for vid, var in meta.get("variables", {}).items():
+            collection = collections.get(var.get("variableCollectionId"), "")
+            cur = db.execute(
+                "INSERT INTO variables (source, variable_id, name, collection, resolved_type)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, vid, var.get("name"), collection, var.get("resolvedType")),
+            )
+            path = f"{collection} / {var.get('name', '')}"
+            db.execute(
+                "INSERT INTO search (name, path, words, kind, ref) VALUES (?, ?, ?, 'variable', ?)",
+                (var.get("name", ""), path, camel_words(path), cur.lastrowid),
+            )
+            count += 1
+        db.execute(
+            "INSERT INTO sources (path, kind, sha256, fields) VALUES (?, 'variables', ?, '{}')",
+            (key, digest),
+        )
+    return count
+
+
+def match_expression(terms, prefix=False, any_term=False):
+    """FTS5 MATCH expression: every term quoted, `*` for prefixes, AND / OR between terms."""
+    quoted = []
+    for term in terms:
+        phrase = '"' + term.replace('"', '""') + '"'
+        quoted.append(phrase + "*" if prefix else phrase)
+    return (" OR " if any_term else " AND ").join(quoted)
+
+
+def search(db, terms, prefix=False, any_term=False, kind=None, source=None, limit=50):
+    """Ranked matches as sqlite3.Row (kind, ref, name, path, score); best first.
+
+    `source` limits hits to components imported from one dump.
+    """
+    sql = (
+        "SELECT kind, ref, name, path, bm25(search, 10.0, 1.0, 1.0) AS score FROM search"
+        " WHERE search MATCH ?"
+    )
+    params = [match_expression(terms, prefix, any_term)]
+    if kind:
+        sql += " AND kind = ?"
+        params.append(kind)
+    if source:
+        sql += " AND kind = 'component' AND ref IN (SELECT id FROM components WHERE source = ?)"
+        params.append(source_key(source))
+    sql += " ORDER BY score LIMIT ?"
+    params.append(limit)
+    return db.execute(sql, params).fetchall()
+
+
+def component(db, rowid):
+    return db.execute("SELECT * FROM components WHERE id = ?", (rowid,)).fetchone()
+
+
+def group_counts(db, by, source=None):
+    """[(value, count)] of components grouped by page, frame, set or type."""
+    column = GROUP_COLUMNS[by]
+    sql = f"SELECT {column} AS value, COUNT(*) AS n FROM components"
+    params = []
+    if source:
+        sql += " WHERE source = ?"
+        params.append(source_key(source))
+    sql += f" GROUP BY {column} ORDER BY n DESC, value"
+    return [(row["value"], row["n"]) for row in db.execute(sql, params)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and query the local inventory database.")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="import inventory dumps and variable files")
+    p.add_argument("inventories", nargs="*", help="inventory dumps ('-' for stdin)")
+    p.add_argument("--variables", action="append", default=[], help="raw variables JSON (repeatable)")
+    p.add_argument("--force", action="store_true", help="re-import unchanged sources")
+
+    p = sub.add_parser("search", help="keyword / prefix search ranked by bm25")
+    p.add_argument("terms", nargs="+")
+    p.add_argument("--prefix", action="store_true", help="match terms as word prefixes")
+    p.add_argument("--any", action="store_true", help="match any term instead of all")
+    p.add_argument("--kind", choices=["component", "variable"])
+    p.add_argument("--source", help="only components imported from this dump")
+    p.add_argument("--limit", type=int, default=50)
+
+    p = sub.add_parser("group", help="component counts per page, frame, set or type")
+    p.add_argument("--by", choices=sorted(GROUP_COLUMNS), default="page")
+    p.add_argument("--source", help="only components imported from this dump")
+
+    args = parser.parse_args()
+    db = connect(args.db)
+
+    if args.command == "import":
+        jobs = [(import_inventory, s) for s in args.inventories]
+        jobs += [(import_variables, s) for s in args.variables]
+        for fn, source in jobs:
+            count = fn(db, source, force=args.force)
+            status = "unchanged, skipped" if count is None else f"{count} rows"
+            print(f"  {source}: {status}")
+    elif args.command == "search":
+        try:
+            rows = search(db, args.terms, args.prefix, args.any, args.kind, args.source, args.limit)
+        except sqlite3.OperationalError as exc:
+            parser.error(f"bad search terms: {exc}")
+        for row in rows:
+            print(f"{-row['score']:8.2f}  {row['kind']:<9}  {row['path']}")
+        return 0 if rows else 1
+    else:
+        for value, count in group_counts(db, args.by, args.source):
+            print(f"{count:8d}  {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""
+Binary snapshot of normalized component records, shared by the inventory analyzers.
+
+The first load_inventory() of a dump streams it through inventory_stream,
+normalizes every record to the fields below, and writes a snapshot to
+.figma-cache/inventory/. Later loads memory-map that snapshot instead of
+parsing JSON again:
+
+    id, name, page, frame, set_id, set_name, type, description,
+    props (variantProperties), width, height, variants (variantCount)
+
+A snapshot is keyed by the source's resolved path, size and SHA-256. When
+size and mtime both match, the snapshot is used without hashing. A touched
+file with the same content is re-hashed once and its mtime is refreshed.
+
+Layout: magic, a JSON header, a fixed-width record array of string-table
+indexes plus numeric columns, uint64 string offsets and a UTF-8 blob. String
+index 0 is "missing", so an absent field stays distinct from "".
+
+Neither side holds a whole column: records are written and iterated in
+blocks of BLOCK rows, and strings are decoded from the blob as rows need
+them. Strings up to INTERN_MAX bytes are stored once; longer ones (mostly
+descriptions) are written as they come, so the intern table stays small.
+
+Requires numpy.
+"""
+import hashlib
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+from inventory_stream import iter_components
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = REPO_ROOT / ".figma-cache" / "inventory"
+
+MAGIC = b"FXINV\x00\x01\x00"
+BLOCK = 4096
+INTERN_MAX = 256
+STRING_FIELDS = ("id", "name", "page", "frame", "set_id", "set_name", "type", "description", "props")
+RECORD = np.dtype(
+    [(field, "<u4") for field in STRING_FIELDS]
+    + [("width", "<f8"), ("height", "<f8"), ("variants", "<i4")]
+)
+
+Component = namedtuple("Component", STRING_FIELDS[:-1] + ("props", "width", "height", "variants"))
+
+
+def normalize(record):
+    """One component record from any dump shape → Component (props as a dict)."""
+    frame = record.get("containing_frame") or {}
+    component_set = frame.get("containingComponentSet") or {}
+    return Component(
+        id=record.get("node_id", record.get("id")),
+        name=record.get("name"),
+        page=record.get("pageName", frame.get("pageName")),
+        frame=frame.get("name", record.get("parentName")),
+        set_id=record.get("component_set_id"),
+        set_name=record.get("componentSetName", component_set.get("name")),
+        type=record.get("type"),
+        description=record.get("description"),
+        props=record.get("variantProperties"),
+        width=record.get("width"),
+        height=record.get("height"),
+        variants=record.get("variantCount"),
+    )
+
+
+def _number(value):
+    if np.isnan(value):
+        return None
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class InventorySnapshot:
+    """Read-only sequence of Component records backed by a memory-mapped snapshot."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as fp:
+            if fp.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"not an inventory snapshot: {self.path}")
+            (header_len,) = struct.unpack("<I", fp.read(4))
+            self.header = json.loads(fp.read(header_len))
+        data = np.memmap(self.path, mode="r", dtype=np.uint8)
+        h = self.header
+        self.records = data[h["records"]:h["records"] + h["count"] * RECORD.itemsize].view(RECORD)
+        self.offsets = data[h["offsets"]:h["offsets"] + (h["strings"] + 1) * 8].view("<u8")
+        self.blob = data[h["blob"]:]
+        self._props = {}  # bounded: cleared when it outgrows BLOCK entries
+
+    @property
+    def source(self):
+        return self.header["source"]
+
+    @property
+    def fields(self):
+        """Scalar fields found next to the component list (e.g. totalComponentSets)."""
+        return self.header["fields"]
+
+    def string(self, index):
+        if index == 0:
+            return None
+        start, end = self.offsets[index - 1], self.offsets[index]
+        return self.blob[start:end].tobytes().decode("utf-8")
+
+    def _props_of(self, index):
+        if index not in self._props:
+            if len(self._props) >= BLOCK:
+                self._props.clear()
+            text = self.string(index)
+            self._props[index] = json.loads(text) if text else None
+        return self._props[index]
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, i):
+        row = self.records[i]
+        string = self.string
+        return Component(
+            *(string(int(row[field])) for field in STRING_FIELDS[:-1]),
+            props=self._props_of(int(row["props"])),
+            width=_number(row["width"]),
+            height=_number(row["height"]),
+            variants=None if row["variants"] < 0 else int(row["variants"]),
+        )
+
+    def column(self, field):
+        """Raw column as a NumPy array (string fields hold string-table indexes)."""
+        return self.records[field]
+
+    def __iter__(self):
+        # Column-wise conversion per block: a NumPy scalar access per field
+        # would dominate, and whole columns would undo the bounded memory
+        for start in range(0, len(self.records), BLOCK):
+            block = self.records[start:start + BLOCK]
+            indexes = [block[field].tolist() for field in STRING_FIELDS[:-1]]
+            table = {i: self.string(i) for i in set().union(*indexes)}
+            columns = [[table[i] for i in column] for column in indexes]
+            props = [self._props_of(i) for i in block["props"].tolist()]
+            sizes = [
+                [None if v != v else (int(v) if v.is_integer() else v) for v in block[field].tolist()]
+                for field in ("width", "height")
+            ]
+            variants = [None if v < 0 else v for v in block["variants"].tolist()]
+            for row in zip(*columns, props, *sizes, variants):
+                yield Component._make(row)
+
+
+def _write_snapshot(target, components, fields, key):
+    """Write Components as a snapshot (temp file + rename); returns the record count.
+
+    Records, offsets and the blob are streamed to anonymous temp files in
+    BLOCK-row batches and concatenated behind the header once the count is known.
+    """
+    strings = {}
+    count = 0
+    string_count = 0
+    blob_size = 0
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryFile(dir=target.parent) as records_fp, \
+            tempfile.TemporaryFile(dir=target.parent) as offsets_fp, \
+            tempfile.TemporaryFile(dir=target.parent) as blob_fp:
+
+        def intern(value):
+            nonlocal string_count, blob_size
+            if value is None:
+                return 0
+            data = value.encode("utf-8")
+            small = len(data) <= INTERN_MAX
+            if small and value in strings:
+                return strings[value]
+            string_count += 1
+            blob_fp.write(data)
+            blob_size += len(data)
+            offsets_fp.write(struct.pack("<Q", blob_size))
+            if small:
+                strings[value] = string_count
+            return string_count
+
+        def flush(rows):
+            records_fp.write(np.array(rows, dtype=RECORD).tobytes())
+            rows.clear()
+
+        offsets_fp.write(struct.pack("<Q", 0))
+        rows = []
+        for component in components:
+            row = [intern(None if getattr(component, f) is None else str(getattr(component, f)))
+                   for f in STRING_FIELDS[:-1]]
+            props = component.props
+            row.append(intern(None if props is None else json.dumps(props, ensure_ascii=False)))
+            for field in ("width", "height"):
+                value = getattr(component, field)
+                row.append(value if isinstance(value, (int, float)) else np.nan)
+            variants = component.variants
+            row.append(variants if isinstance(variants, int) else -1)
+            rows.append(tuple(row))
+            count += 1
+            if len(rows) >= BLOCK:
+                flush(rows)
+        if rows:
+            flush(rows)
+
+        header = {**key, "fields": fields, "count": count, "strings": string_count}
+        # Section offsets depend on the header length: size the header with
+        # widest-possible offsets, then pad the real one to that length.
+        placeholder = json.dumps({**header, "records": 10**18, "offsets": 10**18, "blob": 10**18})
+        start = len(MAGIC) + 4 + len(placeholder.encode())
+        header["records"] = start + (-start % 8)
+        header["offsets"] = header["records"] + count * RECORD.itemsize
+        header["blob"] = header["offsets"] + (string_count + 1) * 8
+        head = json.dumps(header).encode()
+        head += b" " * (header["records"] - len(MAGIC) - 4 - len(head))
+
+        with tempfile.NamedTemporaryFile(dir=target.parent, prefix=f".{target.name}.",
+                                         suffix=".tmp", delete=False) as fp:
+            try:
+                fp.write(MAGIC + struct.pack("<I", len(head)) + head)
+                for part in (records_fp, offsets_fp, blob_fp):
+                    part.seek(0)
+                    shutil.copyfileobj(part, fp)
+                fp.close()
+                os.replace(fp.name, target)
+            except BaseException:
+                fp.close()
+                os.unlink(fp.name)
+                raise
+    return count
+
+
+def snapshot_path(source, cache_dir=CACHE_DIR):
+    key = hashlib.sha1(str(Path(source).resolve()).encode()).hexdigest()[:16]
+    return Path(cache_dir) / f"{key}.bin"
+
+
+def load_inventory(source, cache_dir=CACHE_DIR, refresh=False):
+    """Components of an inventory dump, from its snapshot when it is current.
+
+    `source` may be a path, '-' (stdin) or a file object; the last two are
+    streamed once without a snapshot.
+    """
+    if source == "-" or hasattr(source, "read"):
+        return _Streamed(source)
+
+    source = Path(source).resolve()
+    stat = source.stat()
+    target = snapshot_path(source, cache_dir)
+    if not refresh and target.exists():
+        try:
+            snapshot = InventorySnapshot(target)
+        except (OSError, ValueError):
+            snapshot = None
+        if snapshot and snapshot.header.get("size") == stat.st_size:
+            if snapshot.header.get("mtime_ns") == stat.st_mtime_ns:
+                return snapshot
+            digest = file_digest(source)
+            if snapshot.header.get("sha256") == digest:
+                # touched but unchanged: store the new mtime so the next load skips hashing
+                _write_snapshot(target, iter(snapshot), snapshot.fields, {
+                    "source": str(source), "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns, "sha256": digest,
+                })
+                return InventorySnapshot(target)
+
+    # `fields` fills while the records stream; the header is written after them
+    fields = {}
+    components = (normalize(c) for c in iter_components(source, fields))
+    _write_snapshot(target, components, fields, {
+        "source": str(source), "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns, "sha256": file_digest(source),
+    })
+    return InventorySnapshot(target)
+
+
+class _Streamed:
+    """One pass of normalized Components; `fields` fills as the stream is read."""
+
+    def __init__(self, source):
+        self.source = source
+        self.fields = {}
+
+    def __iter__(self):
+        for record in iter_components(self.source, self.fields):
+            yield normalize(record)
+
+
+if __name__ == "__main__":
+    import time
+
+    for arg in sys.argv[1:] or ["docs/code reports/figma-components-inventory.json"]:
+        started = time.perf_counter()
+        inventory = load_inventory(arg)
+        print(f"{arg}: {len(inventory)} components in {(time.perf_counter() - started) * 1000:.1f} ms")
@@ -0,0 +1,220 @@
+"""
+Incremental reader for Figma component inventory dumps.
+
+Inventory files are one large JSON object holding the component list in one
+of three places:
+
+    {"components": [...]}                  figma-components-inventory.json
+    {"meta": {"components": [...]}}        REST /files/:key/components
+    {"result": {"items": [...], ...}}      MCP get_components output
+
+iter_components() finds the list without parsing the rest of the document
+and yields its records one at a time, so memory stays at one read buffer
+plus whatever the caller aggregates. Scalar fields met on the way (such as
+`totalComponentSets` next to `items`) are collected into `fields`.
+
+A `result` stored as a JSON-encoded string cannot be streamed; it is decoded
+in memory as a fallback.
+"""
+import json
+import re
+import sys
+
+CHUNK = 1 << 20
+
+# Keys whose object value may hold the list, and keys that hold the list
+CONTAINER_KEYS = ("meta", "result")
+LIST_KEYS = ("components", "items")
+
+_decoder = json.JSONDecoder()
+_WS = re.compile(r"[ \t\n\r]*")
+_STRUCT = re.compile(r'["{}\[\]]')
+_STRING_END = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+# what may follow a complete number
+_NUMBER_END = frozenset(",]} \t\r\n")
+
+
+class InventoryError(ValueError):
+    """Raised when a dump holds no component list in a known shape."""
+
+
+class _Reader:
+    """Text buffer over a file that refills on demand and drops consumed input."""
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            return False
+        chunk = self.fp.read(CHUNK)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > CHUNK:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += chunk
+        return True
+
+    def peek(self):
+        """Next non-whitespace character ('' at end of input)."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise InventoryError(f"expected {char!r} near {self.buf[self.pos:self.pos + 40]!r}")
+        self.pos += 1
+
+    def decode(self):
+        """Decode one complete JSON value at the cursor."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # a number cut by the end of the buffer ("12." + "5") decodes short:
+            # read on until it is followed by a delimiter
+            complete = type(value) not in (int, float) or (end < len(self.buf) and self.buf[end] in _NUMBER_END)
+            if complete or not self.fill():
+                self.pos = end
+                return value
+
+    def skip(self):
+        """Step over one value without building it."""
+        if self.peek() not in "{[":
+            self.decode()
+            return
+        depth = 0
+        while True:
+            m = _STRUCT.search(self.buf, self.pos)
+            if m is None:
+                self.pos = len(self.buf)
+                if not self.fill():
+                    raise InventoryError("unexpected end of input")
+                continue
+            char = m.group()
+            self.pos = m.end()
+            if char == '"':
+                self._skip_string()
+            elif char in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _skip_string(self):
+        while True:
+            m = _STRING_END.match(self.buf, self.pos)
+            if m:
+                self.pos = m.end()
+                return
+            # keep the partial string in the buffer until its end arrives
+            if not self.fill():
+                raise InventoryError("unterminated string")
+
+    def iter_array(self):
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.decode()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise InventoryError(f"expected ',' or ']' in array, got {char!r}")
+
+
+def _walk(reader, fields):
+    """Yield records from the list inside the object at the cursor; returns whether one was found."""
+    reader.expect("{")
+    found = False
+    if reader.peek() == "}":
+        reader.pos += 1
+        return found
+    while True:
+        key = reader.decode()
+        reader.expect(":")
+        char = reader.peek()
+        if not found and key in LIST_KEYS and char == "[":
+            yield from reader.iter_array()
+            found = True
+        elif not found and key in CONTAINER_KEYS and char == "{":
+            found = yield from _walk(reader, fields)
+        elif not found and key in CONTAINER_KEYS and char == '"':
+            # JSON-encoded result: nothing to stream
+            yield from iter_records(json.loads(reader.decode()), fields)
+            found = True
+        elif char in "{[":
+            reader.skip()
+        else:
+            fields[key] = reader.decode()
+        char = reader.peek()
+        reader.pos += 1
+        if char == "}":
+            return found
+        if char != ",":
+            raise InventoryError(f"expected ',' or '}}' in object, got {char!r}")
+
+
+def iter_records(data, fields=None):
+    """Same shapes as iter_components(), for an already decoded document."""
+    fields = {} if fields is None else fields
+    if isinstance(data, list):
+        yield from data
+        return
+    for key in CONTAINER_KEYS:
+        inner = data.get(key)
+        if isinstance(inner, str):
+            inner = json.loads(inner)
+        if isinstance(inner, dict):
+            fields.update({k: v for k, v in inner.items() if not isinstance(v, (dict, list))})
+            data = inner
+            break
+    fields.update({k: v for k, v in data.items() if not isinstance(v, (dict, list))})
+    for key in LIST_KEYS:
+        if isinstance(data.get(key), list):
+            yield from data[key]
+            return
+    raise InventoryError("no components/items list in document")
+
+
+def iter_components(source, fields=None):
+    """Yield component records from a path, '-' (stdin) or a text file object.
+
+    `fields` (a dict) receives scalar values seen next to the list; entries
+    after the list are only present once iteration has finished.
+    """
+    fields = {} if fields is None else fields
+    if source == "-":
+        source = sys.stdin
+    if hasattr(source, "read"):
+        yield from _iter_file(source, fields)
+        return
+    with open(source, encoding="utf-8") as fp:
+        yield from _iter_file(fp, fields)
+
+
+def _iter_file(fp, fields):
+    reader = _Reader(fp)
+    char = reader.peek()
+    if char == "[":
+        yield from reader.iter_array()
+        return
+    if not (yield from _walk(reader, fields)):
+        raise InventoryError("no components/items list in document")
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Compile the Figma tokens into one stylesheet: a base :root block in the
+default modes plus, per other mode, a delta block holding only the tokens
+whose resolved value differs from the base.
+
+    Color        SDS Light is the base; SDS Dark goes to [data-theme="dark"] and
+                 to @media (prefers-color-scheme: dark) unless the page set
+                 data-theme="light"
+    Responsive   Desktop is the base; Tablet and Mobile go to max-width media
+                 queries derived from --sds-responsive-device-width (a mode
+                 applies below the next larger device), smaller devices last
+    other        [data-<collection>="<mode>"]
+
+Values are merged like figma-generate-tokens.mjs (see flatten_css.py) and
+written fully resolved, so a delta is exact even when the theme attribute
+sits on a subtree: `--sds-comp-card-bg` is re-declared in the dark block
+because the token it aliases changed. A toggle then restyles only what the
+delta names.
+
+Media-query blocks nest: the Tablet block still matches at Mobile widths, so
+each device's delta is taken against the values in effect just outside its
+query (base plus the blocks for the devices between it and the base), not
+against the base alone.
+
+Limitation: normalized.json resolves cross-collection aliases in their
+default modes, so a token that only varies through an alias into another
+collection's non-default mode is not seen as varying.
+
+    python3 scripts/mode_delta_css.py [-o mcp-server/dist/figma-tokens.css] [--json]
+"""
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+from flatten_css import MCP_DIR, NORMALIZED_PATH, REPO_ROOT, SHEETS, Flattener, collection_values, component_aliases
+
+DEFAULT_OUT = MCP_DIR / "dist" / "figma-tokens.css"
+DEVICE_WIDTH_SUFFIX = "device-width"
+HEADER = "/* Auto-generated from Figma Variables API — DO NOT EDIT MANUALLY */"
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def resolved(data, chosen=None, dark=False):
+    """{css var: literal} for one mode choice; unresolvable tokens keep their declared value."""
+    values = {**collection_values(data, chosen), **component_aliases(dark)}
+    flattener = Flattener(values)
+    return {token: flattener.resolve(token) or value for token, value in values.items()}
+
+
+def _px(value):
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)px\s*", value or "")
+    return float(m.group(1)) if m else None
+
+
+def media_queries(modes, default, values):
+    """{mode id: media query} from each mode's device width, or None when a width is missing."""
+    widths = {}
+    for mode_id in modes:
+        width = next((_px(v) for k, v in values[mode_id].items() if k.endswith(DEVICE_WIDTH_SUFFIX)), None)
+        if width is None:
+            return None
+        widths[mode_id] = width
+    base = widths[default]
+    queries = {}
+    for mode_id, width in widths.items():
+        if mode_id == default:
+            continue
+        if width < base:
+            upper = min(w for w in widths.values() if w > width)
+            queries[mode_id] = f"(max-width: {upper - 1:g}px)"
+        else:
+            queries[mode_id] = f"(min-width: {width:g}px)"
+    return queries
+
+
+def _cascade_order(query):
+    """Sort key putting the query for the more extreme device last, so it wins where two match."""
+    px = float(re.search(r"([\d.]+)px", query).group(1))
+    return (query.startswith("(min"), px if query.startswith("(min") else -px)
+
+
+def _declarations(tokens, indent):
+    return "".join(f"{indent}{name}: {value};\n" for name, value in sorted(tokens.items()))
+
+
+def _block(selector, tokens, indent=""):
+    return f"{indent}{selector} {{\n{_declarations(tokens, indent + '  ')}{indent}}}\n"
+
+
+def compile_sheet(data):
+    """(css text, report) for the base block and every mode delta."""
+    meta = data.get("modeMeta", {})
+    selection = data.get("modeSelection", {})
+    dark_id = selection.get("darkModeId")
+    base = resolved(data)
+    blocks = [("base", ":root", None, base, _block(":root", base))]
+
+    collections = {}
+    for mode_id, info in meta.items():
+        collections.setdefault(info.get("collectionId"), []).append(mode_id)
+    for collection, mode_ids in collections.items():
+        if len(mode_ids) < 2:
+            continue
+        default = next((m for m in mode_ids if meta[m].get("isDefault")), mode_ids[0])
+        name = meta[default].get("collectionName", collection)
+        variants = {m: resolved(data, {collection: m}, dark=m == dark_id) for m in mode_ids}
+        queries = media_queries(mode_ids, default, variants)
+        ordered = [m for m in mode_ids if m != default]
+        if queries:
+            ordered.sort(key=lambda m: _cascade_order(queries[m]))
+        # values in effect before each block: max-width and min-width chains grow away from the base
+        effective = {"(max": dict(base), "(min": dict(base)}
+        for mode_id in ordered:
+            under = effective[queries[mode_id][:4]] if queries else base
+            delta = {t: v for t, v in variants[mode_id].items() if under.get(t) != v}
+            if queries:
+                under.update(delta)
+            mode_name = meta[mode_id].get("modeName", mode_id)
+            if not delta:
+                blocks.append((mode_name, None, name, delta, ""))
+                continue
+            if mode_id == dark_id:
+                selector = '[data-theme="dark"]'
+                css = (
+                    "@media (prefers-color-scheme: dark) {\n"
+                    + _block(':root:not([data-theme="light"])', delta, "  ")
+                    + "}\n"
+                    + _block(selector, delta)
+                )
+            elif queries:
+                selector = f"@media {queries[mode_id]}"
+                css = f"{selector} {{\n{_block(':root', delta, '  ')}}}\n"
+            else:
+                selector = f'[data-{_slug(name)}="{_slug(mode_name)}"]'
+                css = _block(selector, delta)
+            blocks.append((mode_name, selector, name, delta, css))
+
+    text = HEADER + "\n" + "\n".join(css for *_, css in blocks if css)
+    full = sum(len(_block(":root", {**base, **delta}).encode()) for _, _, _, delta, _ in blocks)
+    report = {
+        "bytes": len(text.encode()),
+        "fullRedeclarationBytes": full,
+        "currentSheetsBytes": sum(len(p.read_bytes()) for p in SHEETS.values() if p.exists()),
+        "blocks": [
+            {"mode": mode, "collection": collection, "selector": selector,
+             "tokens": len(delta), "bytes": len(css.encode())}
+            for mode, selector, collection, delta, css in blocks
+        ],
+    }
+    return text, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Base token sheet plus minimal per-mode delta blocks.")
+    parser.add_argument("--normalized", type=Path, default=NORMALIZED_PATH)
+    parser.add_argument("-o", "--output", default=str(DEFAULT_OUT), help="stylesheet path, or - for stdout")
+    parser.add_argument("--json", action="store_true", help="print the size report as JSON")
+    args = parser.parse_args()
+
+    text, report = compile_sheet(json.loads(args.normalized.read_text()))
+    if args.output == "-":
+        sys.stdout.write(text)
+        return 0
+    out = Path(args.output)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(text, encoding="utf-8")
+
+    if args.json:
+        print(json.dumps({"output": str(out), **report}, indent=2))
+        return 0
+    label = out.resolve().relative_to(REPO_ROOT) if out.resolve().is_relative_to(REPO_ROOT) else out
+    print(f"{label}: {report['bytes']:,} bytes "
+          f"(every mode re-declared in full: {report['fullRedeclarationBytes']:,}; "
+          f"current light + dark sheets: {report['currentSheetsBytes']:,})")
+    for block in report["blocks"]:
+        where = block["selector"] or "no block, same as base"
+        label = block["mode"] if block["mode"] == "base" else f"{block['collection']} / {block['mode']}"
+        print(f"  {label:<24} {block['tokens']:>4} tokens {block['bytes']:>7,} bytes  {where}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Match components between two inventory dumps (old and new Figma file) and
+write a node id mapping for node_id_rewriter.py.
+
+Every component gets a structural signature:
+
+    name    normalized name (case, punctuation and "copy" / "v2" suffixes dropped)
+    set     normalized component set name
+    axes    variant properties as sorted axis=value pairs
+    size    width x height in whole pixels
+    page    normalized page name
+
+Matching is a series of hash joins from the strictest key to the loosest. A
+key only joins when it is unique among the still-unmatched components on
+both sides, so an ambiguous key falls through to the next pass. What is left
+goes to a fuzzy pass: candidates come from a character-trigram index over
+set + name, are scored on trigram and word similarity plus agreement of axes, size
+and page, and are assigned best-first. Component sets are then mapped by a
+majority vote of their matched variants.
+
+    python3 scripts/node_id_matcher.py v1-inventory.json v2-inventory.json -o v1-to-v2.json
+    python3 scripts/node_id_rewriter.py v1-to-v2.json --min-confidence 0.8 --dry-run
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from collections import Counter, defaultdict, namedtuple
+from pathlib import Path
+
+from inventory_snapshot import load_inventory
+
+Signature = namedtuple("Signature", "name set axes size page")
+
+# (method, key fields, fields that must be non-empty, confidence)
+PASSES = [
+    ("exact", ("name", "set", "axes", "size", "page"), (), 1.0),
+    ("moved", ("name", "set", "axes", "size"), (), 0.95),
+    ("resized", ("name", "set", "axes", "page"), (), 0.9),
+    ("restructured", ("name", "set", "axes"), (), 0.85),
+    ("renamed", ("set", "axes", "size"), ("set", "axes"), 0.8),
+    ("name", ("name", "set"), ("name",), 0.7),
+]
+
+# Fuzzy pass: candidates kept per component, score weights and confidence scale
+FUZZY_CANDIDATES = 8
+FUZZY_COMMON_GRAM = 100  # trigrams shared by more components than this do not select candidates
+FUZZY_WEIGHTS = {"text": 0.6, "axes": 0.2, "size": 0.1, "page": 0.1}
+FUZZY_SCALE = 0.75  # a fuzzy match never outranks a hash join
+DEFAULT_MIN_CONFIDENCE = 0.4
+
+_SUFFIX = re.compile(r"(?:\s+(?:copy(?:\s+\d+)?|v\d+|\(\d+\)))+$")
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_name(value):
+    """Lower-case words only, without copy / version suffixes: 'Product Card V2' -> 'product card'."""
+    if not value:
+        return ""
+    text = _NON_WORD.sub(" ", _SUFFIX.sub("", value.strip().lower())).strip()
+    return _SUFFIX.sub("", text)
+
+
+def signature(component):
+    props = component.props or {}
+    axes = tuple(sorted((normalize_name(k), str(v).strip().lower()) for k, v in props.items()))
+    size = None
+    if component.width is not None and component.height is not None:
+        size = (round(component.width), round(component.height))
+    return Signature(
+        name=normalize_name(component.name),
+        set=normalize_name(component.set_name),
+        axes=axes,
+        size=size,
+        page=normalize_name(component.page),
+    )
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Side:
+    """One inventory: node ids, signatures and set membership, by position."""
+
+    def __init__(self, components):
+        self.ids = []
+        self.names = []
+        self.sets = []
+        self.sigs = []
+        for c in components:
+            if not c.id:
+                continue
+            self.ids.append(c.id)
+            self.names.append(c.name)
+            self.sets.append(c.set_id)
+            self.sigs.append(signature(c))
+        self.open = set(range(len(self.ids)))
+
+    def keyed(self, fields, required):
+        """{key: [positions]} over unmatched components with every required field set."""
+        groups = defaultdict(list)
+        for i in self.open:
+            sig = self.sigs[i]
+            if all(getattr(sig, f) for f in required):
+                groups[tuple(getattr(sig, f) for f in fields)].append(i)
+        return groups
+
+
+class Matcher:
+    def __init__(self, old, new):
+        self.old = Side(old)
+        self.new = Side(new)
+        self.pairs = []  # (old position, new position, confidence, method)
+
+    def _take(self, i, j, confidence, method):
+        self.old.open.discard(i)
+        self.new.open.discard(j)
+        self.pairs.append((i, j, confidence, method))
+
+    def hash_joins(self):
+        for method, fields, required, confidence in PASSES:
+            new_groups = self.new.keyed(fields, required)
+            for key, olds in self.old.keyed(fields, required).items():
+                news = new_groups.get(key)
+                if len(olds) == 1 and news and len(news) == 1:
+                    self._take(olds[0], news[0], confidence, method)
+
+    @staticmethod
+    def _text(sig):
+        text = f"{sig.set} {sig.name}"
+        return trigrams(text), set(text.split())
+
+    def _fuzzy_score(self, a, b, grams_a, grams_b, words_a, words_b):
+        # character trigrams tolerate edits, whole words keep "Icon 24" apart from "Icon 34"
+        words = len(words_a & words_b) / (len(words_a | words_b) or 1)
+        text = (2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b)) + words) / 2
+        if a.axes or b.axes:
+            union = set(a.axes) | set(b.axes)
+            axes = len(set(a.axes) & set(b.axes)) / len(union)
+        else:
+            axes = 1.0
+        w = FUZZY_WEIGHTS
+        return (
+            w["text"] * text + w["axes"] * axes
+            + w["size"] * (a.size is not None and a.size == b.size)
+            + w["page"] * (a.page == b.page)
+        )
+
+    def fuzzy(self, min_confidence=DEFAULT_MIN_CONFIDENCE):
+        """Trigram-blocked fuzzy matching of whatever the hash joins left."""
+        if not self.old.open or not self.new.open:
+            return
+        index = defaultdict(list)
+        new_text = {}
+        for j in self.new.open:
+            new_text[j] = self._text(self.new.sigs[j])
+            for g in new_text[j][0]:
+                index[g].append(j)
+
+        scored = []
+        for i in self.old.open:
+            sig = self.old.sigs[i]
+            grams, words = self._text(sig)
+            # rare trigrams pick the candidates; the score then uses all of them
+            postings = sorted((index[g] for g in grams if g in index), key=len)
+            selective = [p for p in postings if len(p) <= FUZZY_COMMON_GRAM] or postings[:3]
+            shared = Counter()
+            for posting in selective:
+                shared.update(posting)
+            for j, _ in shared.most_common(FUZZY_CANDIDATES):
+                new_grams, new_words = new_text[j]
+                score = self._fuzzy_score(sig, self.new.sigs[j], grams, new_grams, words, new_words)
+                confidence = round(score * FUZZY_SCALE, 3)
+                if confidence >= min_confidence:
+                    scored.append((confidence, i, j))
+
+        scored.sort(key=lambda t: (-t[0], t[1], t[2]))
+        for confidence, i, j in scored:
+            if i in self.old.open and j in self.new.open:
+                self._take(i, j, confidence, "fuzzy")
+
+    def set_votes(self):
+        """[(old set id, new set id, confidence)] by majority of matched variants."""
+        votes = defaultdict(Counter)
+        weight = defaultdict(float)
+        for i, j, confidence, _ in self.pairs:
+            a, b = self.old.sets[i], self.new.sets[j]
+            if a and b:
+                votes[a][b] += 1
+                weight[a, b] += confidence
+        mapped = {self.old.ids[i] for i, _, _, _ in self.pairs}
+        result = []
+        for a, counter in votes.items():
+            if a in mapped:
+                continue
+            b, n = counter.most_common(1)[0]
+            agreement = n / sum(counter.values())
+            result.append((a, b, round(weight[a, b] / n * agreement, 3)))
+        return result
+
+    def run(self, fuzzy=True, min_confidence=DEFAULT_MIN_CONFIDENCE):
+        self.hash_joins()
+        if fuzzy:
+            self.fuzzy(min_confidence)
+        return self
+
+    def to_json(self):
+        mappings = [
+            {
+                "from": self.old.ids[i], "to": self.new.ids[j], "confidence": confidence,
+                "method": method, "name": self.new.names[j],
+            }
+            for i, j, confidence, method in self.pairs
+        ]
+        mappings += [
+            {"from": a, "to": b, "confidence": confidence, "method": "set-vote"}
+            for a, b, confidence in self.set_votes()
+        ]
+        mappings.sort(key=lambda m: (-m["confidence"], m["from"]))
+        by_method = Counter(m["method"] for m in mappings)
+        return {
+            "summary": {
+                "old": len(self.old.ids),
+                "new": len(self.new.ids),
+                "matched": len(self.pairs),
+                "byMethod": dict(by_method.most_common()),
+            },
+            "mappings": mappings,
+            "unmatched": {
+                "old": sorted(self.old.ids[i] for i in self.old.open),
+                "new": sorted(self.new.ids[j] for j in self.new.open),
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Match components between two inventory dumps.")
+    parser.add_argument("old", help="inventory dump of the old file")
+    parser.add_argument("new", help="inventory dump of the new file")
+    parser.add_argument("-o", "--output", type=Path, help="write the mapping JSON here (default: stdout)")
+    parser.add_argument("--min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE,
+                        help="drop fuzzy matches below this confidence")
+    parser.add_argument("--no-fuzzy", action="store_true", help="hash joins only")
+    args = parser.parse_args()
+
+    old, new = load_inventory(args.old), load_inventory(args.new)
+    started = time.perf_counter()
+    result = Matcher(old, new).run(not args.no_fuzzy, args.min_confidence).to_json()
+    elapsed = time.perf_counter() - started
+    result = {"old": args.old, "new": args.new, **result}
+
+    text = json.dumps(result, indent=2) + "\n"
+    if args.output:
+        args.output.write_text(text)
+    else:
+        sys.stdout.write(text)
+
+    s = result["summary"]
+    methods = ", ".join(f"{k} {v}" for k, v in s["byMethod"].items()) or "none"
+    print(
+        f"Matched {s['matched']} of {s['old']} old / {s['new']} new components "
+        f"in {elapsed * 1000:.0f} ms ({methods}); "
+        f"{len(result['unmatched']['old'])} old unmatched",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Rewrite Figma node IDs across the repository in one pass per file.
+
+The mapping is compiled into a single regex alternation (longest IDs first)
+that matches both the `3068:13907` form and the `3068-13907` form used in
+URLs. Lookarounds keep a short ID from rewriting part of a longer number:
+not next to a digit, and not next to a `:`/`-` that joins it to another
+digit. So `3068:1390` never touches `3068:13907` or `13068:1390`, and `1:2`
+leaves `2026-1-2`, `1-2-3` and `v1:2:3` alone.
+
+Mapping files are JSON, either a plain {"old": "new"} object or a list of
+entries, {"mappings": [{"from": "old", "to": "new", "confidence": 0.9}]}.
+--min-confidence drops list entries below it; entries without a confidence
+are always kept. node_id_matcher.py writes the list form.
+
+    python3 scripts/node_id_rewriter.py mapping.json [--include 'figma/**'] [--exclude 'docs/**'] [--dry-run]
+
+Files are processed in a process pool and written via a temp file plus
+os.replace. Binary and non-UTF-8 files are skipped.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Never walked: VCS data, dependencies, build output and local caches
+DEFAULT_EXCLUDE = [
+    ".git/*", "*/node_modules/*", "node_modules/*", "*/.next/*", ".next/*",
+    "*/dist/*", "*/build/*", ".figma-cache/*", "*.png", "*.jpg", "*.jpeg", "*.gif",
+    "*.webp", "*.ico", "*.pdf", "*.zip", "*.woff", "*.woff2", "*.ttf",
+]
+NODE_ID = re.compile(r"^\d+[:-]\d+$")
+
+
+def load_mapping(path, min_confidence=0.0):
+    """{old id: new id} from a mapping file, in colon form.
+
+    Entries without a `confidence` are always kept.
+    """
+    data = json.loads(Path(path).read_text())
+    if isinstance(data, dict) and isinstance(data.get("mappings"), list):
+        pairs = [
+            (m["from"], m["to"]) for m in data["mappings"]
+            if m.get("from") and m.get("to") and m.get("confidence", 1.0) >= min_confidence
+        ]
+    elif isinstance(data, dict):
+        pairs = list(data.items())
+    else:
+        raise ValueError(f"{path}: expected an object or {{\"mappings\": [...]}}")
+    mapping = {}
+    for old, new in pairs:
+        if not (NODE_ID.match(old) and NODE_ID.match(new)):
+            raise ValueError(f"{path}: not a node id pair: {old!r} -> {new!r}")
+        mapping[old.replace("-", ":")] = new.replace("-", ":")
+    return mapping
+
+
+class NodeIdRewriter:
+    """One compiled pattern for every old ID in both separator forms."""
+
+    def __init__(self, mapping):
+        self.table = {}
+        for old, new in mapping.items():
+            if old == new:
+                continue
+            self.table[old] = new
+            self.table[old.replace(":", "-")] = new.replace(":", "-")
+        keys = sorted(self.table, key=len, reverse=True)
+        alternation = "|".join(re.escape(k) for k in keys) or r"(?!)"
+        self.pattern = re.compile(rf"(?<![0-9])(?<![0-9][:-])(?:{alternation})(?![0-9])(?![:-][0-9])")
+
+    def rewrite(self, text):
+        """(new text, replacement count)."""
+        table = self.table
+        return self.pattern.subn(lambda m: table[m.group()], text)
+
+
+def atomic_write(path, text):
+    """Write via a temp file in the same directory so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        os.chmod(tmp, path.stat().st_mode & 0o777)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _selected(rel, include, exclude):
+    if any(fnmatch(rel, pattern) for pattern in exclude):
+        return False
+    return not include or any(fnmatch(rel, pattern) for pattern in include)
+
+
+def iter_files(root, include=(), exclude=()):
+    """Files under root whose posix relative path matches include and no exclude glob.
+
+    Globs use fnmatch, where `*` also crosses `/`; `figma/*` covers the whole tree.
+    """
+    root = Path(root)
+    exclude = list(DEFAULT_EXCLUDE) + list(exclude)
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = Path(dirpath).relative_to(root).as_posix()
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        # prune excluded directories before descending
+        dirnames[:] = [
+            d for d in dirnames
+            if not any(fnmatch(f"{prefix}{d}/", p) or fnmatch(f"{prefix}{d}/x", p) for p in exclude)
+        ]
+        for name in sorted(filenames):
+            rel = prefix + name
+            if _selected(rel, include, exclude):
+                yield root / rel
+
+
+_worker = None
+
+
+def _init_worker(mapping):
+    global _worker
+    _worker = NodeIdRewriter(mapping)
+
+
+def _rewrite_file(path, dry_run=False):
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            text = f.read()
+    except (UnicodeDecodeError, OSError):
+        return path, 0
+    if "\0" in text:
+        return path, 0
+    updated, count = _worker.rewrite(text)
+    if count and not dry_run:
+        atomic_write(path, updated)
+    return path, count
+
+
+def rewrite_tree(root, mapping, include=(), exclude=(), jobs=None, dry_run=False):
+    """Rewrite every selected file; returns [(path, replacements)] for files that changed."""
+    files = list(iter_files(root, include, exclude))
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(files) or 1))
+    if jobs == 1:
+        _init_worker(mapping)
+        results = [_rewrite_file(p, dry_run) for p in files]
+    else:
+        with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(mapping,)) as pool:
+            results = list(pool.map(_rewrite_file, files, [dry_run] * len(files), chunksize=32))
+    return [(path, count) for path, count in results if count]
+
+
+def add_walk_arguments(parser, include=None):
+    parser.add_argument("--root", type=Path, default=REPO_ROOT)
+    parser.add_argument("--include", action="append", default=include,
+                        help="glob of repo-relative paths to rewrite (repeatable; default: all)")
+    parser.add_argument("--exclude", action="append", default=[],
+                        help="glob of paths to leave alone (repeatable)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--dry-run", action="store_true", help="report without writing")
+
+
+def report(changed, root, dry_run):
+    verb = "would update" if dry_run else "UPDATED"
+    total = 0
+    for path, count in changed:
+        total += count
+        print(f"  {Path(path).relative_to(root)}: {verb} ({count} ids)")
+    print(f"Done! {total} ids in {len(changed)} files.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite Figma node IDs from a mapping file.")
+    parser.add_argument("mapping", type=Path, help="JSON mapping file")
+    parser.add_argument("--min-confidence", type=float, default=0.0,
+                        help="skip mapping entries below this confidence")
+    add_walk_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        mapping = load_mapping(args.mapping, args.min_confidence)
+    except (OSError, ValueError, KeyError) as exc:
+        parser.error(str(exc))
+    root = args.root.resolve()
+    exclude = list(args.exclude)
+    mapping_path = args.mapping.resolve()
+    if mapping_path.is_relative_to(root):
+        exclude.append(mapping_path.relative_to(root).as_posix())  # never rewrite the mapping itself
+    changed = rewrite_tree(root, mapping, args.include or (), exclude, args.jobs, args.dry_run)
+    report(changed, root, args.dry_run)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
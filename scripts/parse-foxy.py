@@ -1,8 +1,30 @@
-import sys, json
-raw = sys.stdin.read().strip()
-r = json.loads(raw)
-inner = json.loads(r['content'][0]['text'])
-data = inner.get('data', inner)
-if isinstance(data, str):
-    data = json.loads(data)
-print(json.dumps(data, indent=2))
+"""Decode foxy-tool-call output from stdin and print the tool data.
+
+Pass --ndjson to stream array data as one JSON value per line.
+"""
+import json
+import sys
+
+from foxy_result import (
+    ResultError,
+    decode_envelope,
+    iter_items,
+    maybe_json,
+    tool_data,
+    tool_payload,
+    write_ndjson,
+)
+
+raw = sys.stdin.read()
+try:
+    r = decode_envelope(raw)
+except ResultError:
+    # Bare envelope without the RESULT prefix
+    r = maybe_json(raw)
+    if not isinstance(r, dict):
+        raise SystemExit("No RESULT envelope on stdin")
+data = tool_data(tool_payload(r))
+if "--ndjson" in sys.argv[1:]:
+    write_ndjson(iter_items(data), sys.stdout)
+else:
+    print(json.dumps(data, indent=2))
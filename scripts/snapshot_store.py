@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Delta-compressed store for the Figma variable snapshots in tokens/figma.
+
+figma-push-variables.mjs writes a full rollback-<timestamp>.json before every
+push, and consecutive snapshots are usually identical or nearly so. The store
+keeps each snapshot as a base payload plus a variable-level delta against
+that base:
+
+    values      {variable id: {mode id: value}} for changed / added mode values
+    dropModes   {variable id: [mode id]} for mode values that disappeared
+    attrs       {variable id: record without valuesByMode} when any other field changed
+    added       full records of variables the base does not have
+    removed     variable ids the snapshot no longer has
+    collections / removedCollections, envelope (status, error), order
+
+Deltas are always taken against the base, never against the previous
+snapshot, so a restore is one base plus one delta however many syncs came
+before. When a delta grows past REBASE_RATIO of its base, the snapshot becomes
+a new base instead.
+
+Objects are gzipped JSON, named by the SHA-256 of their canonical (sorted
+key) content, so identical snapshots share their delta object. index.json lists snapshots
+in capture order.
+
+    python3 scripts/snapshot_store.py add tokens/figma/rollback-*.json [--remove]
+    python3 scripts/snapshot_store.py list
+    python3 scripts/snapshot_store.py restore 2026-03-01T05:36 [-o rollback.json]
+    python3 scripts/snapshot_store.py value -- --sds-color-background-brand-default --at 2026-03-01T05:36
+    python3 scripts/snapshot_store.py prune --keep 20 | --before 2026-02-01
+    python3 scripts/snapshot_store.py compact
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from variable_aliases import payload_meta
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+STORE_DIR = REPO_ROOT / "tokens" / "figma" / "snapshots"
+
+# A delta larger than this fraction of its base (compressed) starts a new base
+REBASE_RATIO = 0.5
+
+
+def canonical(data):
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def digest(data):
+    return hashlib.sha256(canonical(data)).hexdigest()
+
+
+def parse_time(value):
+    """ISO timestamp (any precision, 'Z' or offset) as an aware UTC datetime."""
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+# ── Deltas ──────────────────────────────────────────────────────────────
+
+
+def _split(payload):
+    """(envelope, collections, variables) of an API payload."""
+    meta = payload_meta(payload)
+    envelope = {k: v for k, v in payload.items() if k != "meta"}
+    return envelope, meta.get("variableCollections", {}), meta.get("variables", {})
+
+
+_MISSING = object()
+
+
+def _attrs(record):
+    return {k: v for k, v in record.items() if k != "valuesByMode"}
+
+
+def _order(mine, base):
+    """Key order of `mine`, or None when base order + appended new keys already gives it."""
+    expected = [k for k in base if k in mine] + [k for k in mine if k not in base]
+    return None if list(mine) == expected else list(mine)
+
+
+def make_delta(base, payload):
+    """Variable / mode level difference that turns `base` into `payload`."""
+    base_env, base_cols, base_vars = _split(base)
+    env, cols, variables = _split(payload)
+    delta = {}
+    if env != base_env:
+        delta["envelope"] = env
+
+    changed_cols = {cid: c for cid, c in cols.items() if base_cols.get(cid) != c}
+    if changed_cols:
+        delta["collections"] = changed_cols
+    removed_cols = [cid for cid in base_cols if cid not in cols]
+    if removed_cols:
+        delta["removedCollections"] = removed_cols
+
+    values, drop, attrs, added = {}, {}, {}, {}
+    for vid, record in variables.items():
+        old = base_vars.get(vid)
+        if old is None:
+            added[vid] = record
+            continue
+        if record == old:
+            continue
+        if _attrs(record) != _attrs(old):
+            attrs[vid] = _attrs(record)
+        new_modes, old_modes = record.get("valuesByMode", {}), old.get("valuesByMode", {})
+        changed = {m: v for m, v in new_modes.items() if old_modes.get(m, _MISSING) != v}
+        if changed:
+            values[vid] = changed
+        gone = [m for m in old_modes if m not in new_modes]
+        if gone:
+            drop[vid] = gone
+    for key, part in (("values", values), ("dropModes", drop), ("attrs", attrs), ("added", added)):
+        if part:
+            delta[key] = part
+    removed = [vid for vid in base_vars if vid not in variables]
+    if removed:
+        delta["removed"] = removed
+
+    # Key order is kept so a restored file matches the captured one byte for byte
+    for key, mine, theirs in (("order", variables, base_vars), ("collectionOrder", cols, base_cols),
+                              ("keyOrder", payload, base)):
+        order = _order(mine, theirs)
+        if order is not None:
+            delta[key] = order
+    return delta
+
+
+def _patched(record, vid, delta):
+    """A base variable record with the delta's attrs / mode values for it applied."""
+    attrs, values, drop = delta.get("attrs", {}), delta.get("values", {}), delta.get("dropModes", {})
+    if vid not in attrs and vid not in values and vid not in drop:
+        return record
+    modes = {m: v for m, v in record.get("valuesByMode", {}).items() if m not in drop.get(vid, ())}
+    modes.update(values.get(vid, {}))
+    patched = {**attrs.get(vid, _attrs(record)), "valuesByMode": modes}
+    # keys in the base record's order (valuesByMode sits mid-record in API output)
+    ordered = {k: patched[k] for k in record if k in patched}
+    ordered.update((k, v) for k, v in patched.items() if k not in ordered)
+    return ordered
+
+
+def apply_delta(base, delta):
+    """The payload `delta` was taken from (base is not modified)."""
+    base_env, base_cols, base_vars = _split(base)
+    env = delta.get("envelope", base_env)
+
+    removed_cols = set(delta.get("removedCollections", ()))
+    cols = {cid: c for cid, c in base_cols.items() if cid not in removed_cols}
+    cols.update(delta.get("collections", {}))
+
+    removed = set(delta.get("removed", ()))
+    variables = {
+        vid: _patched(record, vid, delta) for vid, record in base_vars.items() if vid not in removed
+    }
+    variables.update(delta.get("added", {}))
+
+    if "order" in delta:
+        variables = {vid: variables[vid] for vid in delta["order"]}
+    if "collectionOrder" in delta:
+        cols = {cid: cols[cid] for cid in delta["collectionOrder"]}
+
+    meta = {"variableCollections": cols, "variables": variables}
+    meta = {k: meta[k] for k in payload_meta(base) if k in meta} | meta
+    payload = {k: meta if k == "meta" else env[k] for k in base if k == "meta" or k in env}
+    payload.update((k, v) for k, v in env.items() if k not in payload)
+    payload.setdefault("meta", meta)
+    if "keyOrder" in delta:
+        payload = {k: payload[k] for k in delta["keyOrder"]}
+    return payload
+
+
+# ── Store ───────────────────────────────────────────────────────────────
+
+
+class SnapshotStore:
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+        self.index_path = self.root / "index.json"
+        try:
+            self.snapshots = json.loads(self.index_path.read_text())["snapshots"]
+        except FileNotFoundError:
+            self.snapshots = []
+        self._objects = {}
+
+    # objects
+    def _object_path(self, key):
+        return self.root / "objects" / key[:2] / f"{key}.json.gz"
+
+    def put(self, data):
+        """Store a JSON object under its content hash; returns the hash.
+
+        The hash is over sorted keys, but the object is stored in its own key
+        order so a base restores in the order Figma returned it.
+        """
+        key = digest(data)
+        path = self._object_path(key)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+            tmp.write_bytes(gzip.compress(raw, mtime=0))
+            os.replace(tmp, path)
+        self._objects[key] = data
+        return key
+
+    def _stored(self, payload, base_key):
+        """(base, delta) keys for a payload: a delta against base_key, or a new base."""
+        if base_key is not None:
+            delta = make_delta(self.get(base_key), payload)
+            compressed = len(gzip.compress(canonical(delta), mtime=0))
+            if compressed <= REBASE_RATIO * self._object_path(base_key).stat().st_size:
+                return base_key, self.put(delta)
+        return self.put(payload), self.put({})
+
+    def get(self, key):
+        if key not in self._objects:
+            self._objects[key] = json.loads(gzip.decompress(self._object_path(key).read_bytes()))
+        return self._objects[key]
+
+    def save(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.snapshots.sort(key=lambda s: parse_time(s["capturedAt"]))
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": 1, "snapshots": self.snapshots}, indent=2) + "\n")
+        os.replace(tmp, self.index_path)
+
+    # snapshots
+    def add(self, captured_at, payload, source=None):
+        """Record one snapshot; returns its index entry (existing entry if already stored)."""
+        snapshot_id = digest(payload)
+        for entry in self.snapshots:
+            if entry["id"] == snapshot_id and entry["capturedAt"] == captured_at:
+                return entry
+        base_key, delta_key = self._stored(payload, self._latest_base(captured_at))
+        entry = {"id": snapshot_id, "capturedAt": captured_at, "base": base_key, "delta": delta_key}
+        if source:
+            entry["source"] = source
+        self.snapshots.append(entry)
+        self.save()
+        return entry
+
+    def _latest_base(self, captured_at):
+        when = parse_time(captured_at)
+        earlier = [s for s in self.snapshots if parse_time(s["capturedAt"]) <= when]
+        return earlier[-1]["base"] if earlier else (self.snapshots[0]["base"] if self.snapshots else None)
+
+    def is_base(self, entry):
+        """True for the earliest snapshot stored against its base object."""
+        return entry is next(s for s in self.snapshots if s["base"] == entry["base"])
+
+    def find(self, when):
+        """Latest snapshot captured at or before `when` (ISO string)."""
+        when = parse_time(when)
+        match = None
+        for entry in self.snapshots:
+            if parse_time(entry["capturedAt"]) <= when:
+                match = entry
+        if match is None:
+            raise LookupError(f"no snapshot at or before {when.isoformat()}")
+        return match
+
+    def payload(self, entry):
+        payload = apply_delta(self.get(entry["base"]), self.get(entry["delta"]))
+        if digest(payload) != entry["id"]:
+            raise ValueError(f"snapshot {entry['capturedAt']} does not restore to its recorded hash")
+        return payload
+
+    def restore(self, entry):
+        """The rollback file contents ({capturedAt, payload}) of one snapshot."""
+        return {"capturedAt": entry["capturedAt"], "payload": self.payload(entry)}
+
+    def variable(self, entry, vid):
+        """One variable record as of a snapshot, without rebuilding the whole payload."""
+        delta = self.get(entry["delta"])
+        if vid in delta.get("added", {}):
+            return delta["added"][vid]
+        if vid in delta.get("removed", ()):
+            return None
+        record = payload_meta(self.get(entry["base"])).get("variables", {}).get(vid)
+        return None if record is None else _patched(record, vid, delta)
+
+    def find_variable(self, token, entry):
+        """Variable id for an id, a name (optionally 'Collection/Name') or a --sds-* custom property."""
+        payload = self.payload(entry)
+        meta = payload_meta(payload)
+        variables = meta.get("variables", {})
+        if token in variables:
+            return token
+        collections = {cid: c.get("name", "") for cid, c in meta.get("variableCollections", {}).items()}
+        css = f"var({token})" if token.startswith("--") else None
+        for vid, var in variables.items():
+            qualified = f"{collections.get(var.get('variableCollectionId'), '')}/{var.get('name')}"
+            if token in (var.get("name"), qualified) or (css and var.get("codeSyntax", {}).get("WEB") == css):
+                return vid
+        raise LookupError(f"no variable {token!r} in snapshot {entry['capturedAt']}")
+
+    def resolve_variable(self, token, entries):
+        """Variable id for a token in the latest of `entries` that defines it.
+
+        Ids survive renames, so a name changed or removed in later snapshots
+        still resolves to the variable it named back then.
+        """
+        for entry in reversed(entries):
+            try:
+                return self.find_variable(token, entry)
+            except LookupError:
+                continue
+        raise LookupError(f"no variable {token!r} in any snapshot up to {entries[-1]['capturedAt']}")
+
+    # maintenance
+    def prune(self, keep=None, before=None):
+        """Drop snapshots (the newest `keep`, or those captured before a time, survive); returns count."""
+        kept = self.snapshots
+        if before is not None:
+            cutoff = parse_time(before)
+            kept = [s for s in kept if parse_time(s["capturedAt"]) >= cutoff]
+        if keep is not None:
+            kept = kept[-keep:] if keep else []
+        dropped = len(self.snapshots) - len(kept)
+        self.snapshots = kept
+        self.save()
+        return dropped
+
+    def compact(self):
+        """Re-take every delta against as few bases as possible, then drop unused objects."""
+        payloads = [(entry, self.payload(entry)) for entry in self.snapshots]
+        self.snapshots = []
+        base_key = None
+        for entry, payload in payloads:
+            base_key, delta_key = self._stored(payload, base_key)
+            self.snapshots.append({**entry, "base": base_key, "delta": delta_key})
+        self.save()
+        return self.gc()
+
+    def gc(self):
+        """Delete objects no snapshot references; returns bytes freed."""
+        live = {s["base"] for s in self.snapshots} | {s["delta"] for s in self.snapshots}
+        freed = 0
+        for path in (self.root / "objects").glob("*/*.json.gz"):
+            if path.name[:-len(".json.gz")] not in live:
+                freed += path.stat().st_size
+                path.unlink()
+                self._objects.pop(path.name[:-len(".json.gz")], None)
+        return freed
+
+    def disk_usage(self):
+        return sum(p.stat().st_size for p in self.root.rglob("*") if p.is_file())
+
+
+def _rollback_json(data):
+    """Same layout as writeJson() in figma-lib.mjs."""
+    return json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delta-compressed Figma variable snapshot store.")
+    parser.add_argument("--store", type=Path, default=STORE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("add", help="store rollback-*.json snapshots")
+    p.add_argument("files", nargs="+", type=Path)
+    p.add_argument("--remove", action="store_true",
+                   help="delete each file once it restores byte for byte from the store")
+
+    sub.add_parser("list", help="list stored snapshots")
+
+    p = sub.add_parser("restore", help="rebuild the snapshot current at a time")
+    p.add_argument("at", help="ISO time; the latest snapshot at or before it is used")
+    p.add_argument("-o", "--output", type=Path, help="write the rollback JSON here (default: stdout)")
+
+    p = sub.add_parser("value", help="value of one variable at a time, or its history")
+    p.add_argument("token", help="variable id, name, Collection/Name or --sds-* property")
+    p.add_argument("--at", help="ISO time (default: print every change)")
+    p.add_argument("--mode", help="mode id (default: all modes)")
+
+    p = sub.add_parser("prune", help="drop old snapshots and their unused objects")
+    p.add_argument("--keep", type=int, help="keep only the newest N snapshots")
+    p.add_argument("--before", help="drop snapshots captured before this ISO time")
+
+    sub.add_parser("compact", help="rebase deltas and remove unused objects")
+
+    args = parser.parse_args()
+    store = SnapshotStore(args.store)
+
+    if args.command == "add":
+        for path in args.files:
+            data = json.loads(path.read_text())
+            entry = store.add(data["capturedAt"], data["payload"], path.name)
+            kind = "base" if store.is_base(entry) else "delta"
+            print(f"  {path.name}: {entry['capturedAt']} ({kind}, {entry['id'][:12]})")
+            if args.remove:
+                if _rollback_json(store.restore(entry)) != path.read_text():
+                    print(f"  {path.name}: kept, restored copy differs from the original")
+                    continue
+                path.unlink()
+        print(f"Store: {len(store.snapshots)} snapshots, {store.disk_usage() / 1024:.1f} KiB")
+
+    elif args.command == "list":
+        for entry in store.snapshots:
+            delta = store.get(entry["delta"])
+            changes = sum(len(v) for v in delta.get("values", {}).values())
+            kind = "base" if store.is_base(entry) else "delta"
+            print(f"  {entry['capturedAt']}  {entry['id'][:12]}  {kind:<5}  {changes} mode values changed")
+        print(f"{len(store.snapshots)} snapshots, {store.disk_usage() / 1024:.1f} KiB")
+
+    elif args.command == "restore":
+        try:
+            entry = store.find(args.at)
+        except LookupError as exc:
+            parser.error(str(exc))
+        text = _rollback_json(store.restore(entry))
+        if args.output:
+            args.output.write_text(text)
+            print(f"Restored {entry['capturedAt']} → {args.output}", file=sys.stderr)
+        else:
+            sys.stdout.write(text)
+
+    elif args.command == "value":
+        if not store.snapshots:
+            parser.error("store is empty")
+        try:
+            entries = [store.find(args.at)] if args.at else store.snapshots
+            vid = store.resolve_variable(args.token, entries)
+        except LookupError as exc:
+            parser.error(str(exc))
+        previous = object()
+        for entry in entries:
+            record = store.variable(entry, vid)
+            values = None if record is None else record.get("valuesByMode", {})
+            if values is not None and args.mode:
+                values = values.get(args.mode)
+            if values != previous:
+                print(f"{entry['capturedAt']}  {json.dumps(values)}")
+                previous = values
+
+    elif args.command == "prune":
+        if args.keep is None and args.before is None:
+            parser.error("prune needs --keep or --before")
+        dropped = store.prune(args.keep, args.before)
+        freed = store.gc()
+        print(f"Dropped {dropped} snapshots, freed {freed / 1024:.1f} KiB")
+
+    else:
+        freed = store.compact()
+        print(f"Compacted {len(store.snapshots)} snapshots, freed {freed / 1024:.1f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
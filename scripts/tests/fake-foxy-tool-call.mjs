@@ -0,0 +1,21 @@
+#!/usr/bin/env node
+// Stand-in for foxy-tool-call.mjs: one TOOL/ARGS call per process, no Figma.
+//   echo   RESULT whose payload data is ARGS
+//   hang   never answers
+//   crash  exits 1 without a RESULT
+const tool = process.env.TOOL;
+if (!tool) {
+  console.error("TOOL required");
+  process.exit(1);
+}
+const args = JSON.parse(process.env.ARGS || "{}");
+console.log(`joining channel ${process.env.JOIN_CHANNEL}`);
+if (tool === "hang") {
+  setInterval(() => {}, 1000);
+} else if (tool === "crash") {
+  console.error("boom");
+  process.exit(1);
+} else {
+  const text = JSON.stringify({ success: true, data: args });
+  console.log("RESULT " + JSON.stringify({ content: [{ type: "text", text }] }));
+}
@@ -0,0 +1,43 @@
+from flatten_css import Flattener, flatten_html, runtime_root
+
+
+def test_alias_chain_resolves_to_literal():
+    flattener = Flattener({"--sds-a": "var(--sds-b)", "--sds-b": "var(--sds-c)", "--sds-c": "#fff"})
+    assert flattener.flatten("color: var(--sds-a);") == "color: #fff;"
+
+
+def test_cycle_resolves_to_none_and_is_reported():
+    flattener = Flattener({"--sds-a": "var(--sds-b)", "--sds-b": "var(--sds-a)"})
+    assert flattener.resolve("--sds-a") is None
+    assert flattener.flatten("color: var(--sds-a);") == "color: var(--sds-a);"
+    assert flattener.unresolved == {"--sds-a", "--sds-b"}
+
+
+def test_fallback_used_for_undefined_token():
+    flattener = Flattener({"--sds-a": "#000"})
+    assert flattener.flatten("color: var(--sds-missing, var(--sds-a));") == "color: #000;"
+    assert flattener.flatten("border: var(--sds-missing, 1px solid red);") == "border: 1px solid red;"
+    assert flattener.flatten("color: var(--other, blue);") == "color: var(--other, blue);"
+    assert not flattener.unresolved
+
+
+def test_runtime_root_defines_script_tokens():
+    flattener = Flattener({"--sds-a": "var(--sds-b)", "--sds-b": "#111"})
+    assert runtime_root(flattener, ["--sds-a", "--sds-gone"]) == ":root {\n  --sds-a: #111;\n}\n"
+    assert flattener.unresolved == {"--sds-gone"}
+
+
+def test_inline_drops_token_sheets_from_built_page():
+    flattener = Flattener({"--sds-a": "#111", "--sds-b": "var(--sds-a)"})
+    html = (
+        '<head><style rel="stylesheet" crossorigin>:root{--sds-a:#111;--sds-b:var(--sds-a)}'
+        '@media (prefers-color-scheme:dark){:root:not([data-theme=light]){--sds-a:#eee}}'
+        '.x{color:var(--sds-b);--local:1px}</style></head>'
+        '<script>el.innerHTML=`<p style="color:var(--sds-a)">`</script>'
+    )
+    out = flatten_html(html, flattener, runtime_root(flattener, ["--sds-a"]))
+    assert out == (
+        '<head><style rel="stylesheet" crossorigin>:root {\n  --sds-a: #111;\n}\n'
+        '.x{color:#111;--local:1px}</style></head>'
+        '<script>el.innerHTML=`<p style="color:#111">`</script>'
+    )
@@ -0,0 +1,58 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from foxy_bridge import BridgeError, BridgePool, FoxyBridge, wait_result
+from foxy_result import tool_payload
+
+FAKE_TOOL = Path(__file__).with_name("fake-foxy-tool-call.mjs")
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+
+
+@pytest.fixture
+def bridge():
+    with FoxyBridge(tool_path=FAKE_TOOL, start_timeout=5, workers=4) as b:
+        yield b
+
+
+def test_serve_mode_pipelines_calls(bridge):
+    assert bridge.served
+    futures = [bridge.submit("echo", {"n": n}) for n in range(6)]
+    assert [tool_payload(wait_result(f, "echo"))["data"] for f in futures] == [{"n": n} for n in range(6)]
+    assert not bridge._pending
+
+
+def test_timeout_drops_pending_request(bridge):
+    fut = bridge.submit("hang", {}, timeout=30)
+    with pytest.raises(BridgeError, match="timed out"):
+        wait_result(fut, "hang", timeout=0.5)
+    assert not bridge._pending
+
+
+def test_bridge_side_timeout_is_an_error(bridge):
+    with pytest.raises(BridgeError, match="timed out after 1s"):
+        bridge.call("hang", {}, timeout=1)
+    assert not bridge._pending
+
+
+def test_missing_result_is_an_error(bridge):
+    with pytest.raises(BridgeError, match="No RESULT"):
+        bridge.call("crash", {})
+
+
+def test_oneshot_wraps_oserror():
+    # ARGS travels in the environment; a value past the kernel's per-string limit fails exec
+    b = FoxyBridge(tool_path=FAKE_TOOL, shim=FAKE_TOOL.with_name("missing.mjs"), start_timeout=5)
+    with b:
+        assert not b.served
+        with pytest.raises(BridgeError, match="could not start"):
+            b.call("echo", {"blob": "x" * (256 * 1024)})
+        assert tool_payload(b.call("echo", {"ok": 1}))["data"] == {"ok": 1}
+
+
+
+def test_pool_splits_workers():
+    assert [b.workers for b in BridgePool(size=3, tool_path=FAKE_TOOL, workers=8).bridges] == [3, 3, 2]
+    assert [b.workers for b in BridgePool(size=4, tool_path=FAKE_TOOL, workers=2).bridges] == [1, 1]
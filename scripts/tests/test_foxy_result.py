@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from foxy_result import ResultError, decode_envelope, iter_envelopes, iter_images, maybe_json, tool_data, tool_payload
+
+
+def envelope(payload):
+    return {"content": [{"type": "text", "text": json.dumps(payload)}]}
+
+
+def test_decode_envelope_after_log_lines():
+    raw = 'joining channel\nRESULT {"content": []}\ntrailing'
+    assert decode_envelope(raw) == {"content": []}
+    with pytest.raises(ResultError, match="No RESULT"):
+        decode_envelope("nothing here")
+    with pytest.raises(ResultError, match="Malformed"):
+        decode_envelope("RESULT {oops")
+
+
+def test_iter_envelopes_skips_malformed():
+    raw = 'RESULT {"a": 1}\nRESULT {bad\nRESULT {"b": 2}\n'
+    assert list(iter_envelopes(raw)) == [{"a": 1}, {"b": 2}]
+
+
+def test_data_decoded_once_more():
+    payload = tool_payload(envelope({"success": True, "data": json.dumps({"id": "1:2"})}))
+    assert tool_data(payload) == {"id": "1:2"}
+    assert maybe_json("plain text") == "plain text"
+    assert maybe_json('{"a": 1} extra') == '{"a": 1} extra'
+
+
+@pytest.mark.parametrize("payload", [
+    {"content": [{"type": "image", "data": "AAAA"}]},
+    {"success": True, "data": {"content": [{"type": "image", "data": "AAAA"}]}},
+    {"success": True, "data": json.dumps({"content": [{"type": "image", "data": "AAAA"}]})},
+])
+def test_each_image_yielded_once(payload):
+    assert list(iter_images(envelope(payload))) == ["AAAA"]
+
+
+def test_image_items_and_bare_data():
+    assert list(iter_images({"content": [{"type": "image", "data": "BBBB"}]})) == ["BBBB"]
+    blob = "A" * 200
+    assert list(iter_images(envelope({"success": True, "data": blob}))) == [blob]
@@ -0,0 +1,40 @@
+import json
+import sqlite3
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import inventory_db  # noqa: E402
+from inventory_snapshot import load_inventory  # noqa: E402
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(inventory_db, "load_inventory", lambda s: load_inventory(s, cache_dir=tmp_path / "cache"))
+    components = [
+        {"node_id": "1:1", "name": "MiniCart", "pageName": "Shop"},
+        {"node_id": "1:2", "name": "AddToCart", "pageName": "Shop"},
+        {"node_id": "1:3", "name": "Border", "pageName": "Base"},
+    ]
+    source = tmp_path / "inventory.json"
+    source.write_text(json.dumps({"meta": {"components": components}}))
+    db = inventory_db.connect(tmp_path / "inventory.sqlite")
+    inventory_db.import_inventory(db, source)
+    return db
+
+
+def test_camel_case_parts_match(db):
+    hits = inventory_db.search(db, ["cart"], prefix=True)
+    assert sorted(h["name"] for h in hits) == ["AddToCart", "MiniCart"]
+    assert not inventory_db.search(db, ["order"], prefix=True)
+
+
+def test_old_schema_is_rebuilt(tmp_path):
+    path = tmp_path / "old.sqlite"
+    old = sqlite3.connect(path)
+    old.execute("CREATE VIRTUAL TABLE search USING fts5(name, path, kind UNINDEXED, ref UNINDEXED)")
+    old.commit()
+    old.close()
+    db = inventory_db.connect(path)
+    assert [r[1] for r in db.execute("PRAGMA table_info(search)")][:3] == ["name", "path", "words"]
@@ -0,0 +1,24 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import inventory_snapshot  # noqa: E402
+from inventory_snapshot import load_inventory, normalize  # noqa: E402
+
+
+def test_round_trip_across_blocks(monkeypatch, tmp_path):
+    monkeypatch.setattr(inventory_snapshot, "BLOCK", 7)
+    components = [
+        {"node_id": f"1:{i}", "name": f"Button {i % 3}", "description": "long " * (i % 4) * 30 or None,
+         "variantProperties": {"Size": str(i % 2)} if i % 2 else None, "width": i / 2, "height": 10}
+        for i in range(40)
+    ]
+    source = tmp_path / "inventory.json"
+    source.write_text(json.dumps({"meta": {"components": components}}))
+
+    snapshot = load_inventory(source, cache_dir=tmp_path / "cache")
+    assert list(snapshot) == [normalize(c) for c in components]
+    assert snapshot[23] == normalize(components[23])
+    assert [p.name for p in (tmp_path / "cache").iterdir()] == [snapshot.path.name]
@@ -0,0 +1,40 @@
+import io
+import json
+
+import pytest
+
+import inventory_stream
+from inventory_stream import iter_components
+
+DOC = {
+    "meta": {
+        "total": 3,
+        "components": [
+            {"id": "1:2", "w": 12.5, "h": 100, "x": -0.25},
+            {"id": "1:3", "w": 1e10, "h": 0, "ok": True, "set": None},
+            {"id": "1:4", "w": 320, "name": 'Button "primary"'},
+        ],
+        "ratio": 1.125,
+    },
+}
+
+
+@pytest.mark.parametrize("chunk", range(1, 24))
+def test_values_split_across_chunks(monkeypatch, chunk):
+    monkeypatch.setattr(inventory_stream, "CHUNK", chunk)
+    text = json.dumps(DOC, separators=(",", ":"))
+    fields = {}
+    assert list(iter_components(io.StringIO(text), fields)) == DOC["meta"]["components"]
+    assert fields == {"total": 3, "ratio": 1.125}
+
+
+def test_number_split_at_decimal_point(monkeypatch):
+    # the first read ends at "12." and the next one starts with "5"
+    text = '{"components": [{"w": 12.5}]}'
+    monkeypatch.setattr(inventory_stream, "CHUNK", text.index(".") + 1)
+    assert list(iter_components(io.StringIO(text))) == [{"w": 12.5}]
+
+
+def test_top_level_array_of_numbers(monkeypatch):
+    monkeypatch.setattr(inventory_stream, "CHUNK", 3)
+    assert list(iter_components(io.StringIO("[1.25, 300, -7e2]"))) == [1.25, 300, -700.0]
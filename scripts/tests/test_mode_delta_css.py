@@ -0,0 +1,42 @@
+from mode_delta_css import compile_sheet
+
+
+def data(tablet, mobile):
+    meta = {
+        "L": {"collectionId": "color", "collectionName": "Color", "modeName": "SDS Light", "isDefault": True},
+        "D": {"collectionId": "color", "collectionName": "Color", "modeName": "SDS Dark"},
+        "desk": {"collectionId": "resp", "collectionName": "Responsive", "modeName": "Desktop", "isDefault": True},
+        "tab": {"collectionId": "resp", "collectionName": "Responsive", "modeName": "Tablet"},
+        "mob": {"collectionId": "resp", "collectionName": "Responsive", "modeName": "Mobile"},
+    }
+    width = "--sds-responsive-device-width"
+    return {
+        "modeMeta": meta,
+        "modeSelection": {"lightModeId": "L", "darkModeId": "D"},
+        "byMode": {
+            "L": {"--sds-color-x": "#fff"},
+            "D": {"--sds-color-x": "#000"},
+            "desk": {width: "1200px", "--sds-size-gap": "24px"},
+            "tab": {width: "768px", "--sds-size-gap": tablet},
+            "mob": {width: "375px", "--sds-size-gap": mobile},
+        },
+    }
+
+
+def blocks(report):
+    return {b["mode"]: b for b in report["blocks"]}
+
+
+def test_mobile_restores_value_tablet_changed():
+    css, _ = compile_sheet(data(tablet="16px", mobile="24px"))
+    tablet = "@media (max-width: 1199px) {\n  :root {\n    --sds-responsive-device-width: 768px;\n" \
+        "    --sds-size-gap: 16px;\n  }\n}\n"
+    mobile = "@media (max-width: 767px) {\n  :root {\n    --sds-responsive-device-width: 375px;\n" \
+        "    --sds-size-gap: 24px;\n  }\n}\n"
+    assert tablet in css and mobile in css
+    assert css.index(tablet) < css.index(mobile)
+
+
+def test_mobile_inherits_tablet_value():
+    _, report = compile_sheet(data(tablet="16px", mobile="16px"))
+    assert blocks(report)["Mobile"]["tokens"] == 1  # only the device width
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from node_id_rewriter import NodeIdRewriter, load_mapping
+
+
+@pytest.fixture
+def rewriter():
+    return NodeIdRewriter({"3068:1390": "4000:1", "1:2": "9:9"})
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("node 3068:1390 here", "node 4000:1 here"),
+    ("3068:13907 and 13068:1390", "3068:13907 and 13068:1390"),
+    ("?node-id=3068-1390&t=x", "?node-id=4000-1&t=x"),
+    ("I3068:1390;1:2", "I4000:1;9:9"),
+    ('"id": "1:2"', '"id": "9:9"'),
+    ("2026-1-2", "2026-1-2"),
+    ("1-2-3", "1-2-3"),
+    ("v1:2:3", "v1:2:3"),
+    ("0:1:2", "0:1:2"),
+    ("1:2-", "9:9-"),
+])
+def test_rewrite_boundaries(rewriter, text, expected):
+    assert rewriter.rewrite(text)[0] == expected
+
+
+def test_longest_id_wins():
+    rewriter = NodeIdRewriter({"3068:1390": "1:1", "3068:13907": "2:2"})
+    assert rewriter.rewrite("3068:13907 3068:1390") == ("2:2 1:1", 2)
+
+
+def test_load_mapping_forms(tmp_path):
+    plain = tmp_path / "plain.json"
+    plain.write_text(json.dumps({"3068-1390": "4000:1"}))
+    assert load_mapping(plain) == {"3068:1390": "4000:1"}
+    listed = tmp_path / "listed.json"
+    listed.write_text(json.dumps({"mappings": [
+        {"from": "1:2", "to": "3:4", "confidence": 0.4},
+        {"from": "5:6", "to": "7:8"},
+    ]}))
+    assert load_mapping(listed, min_confidence=0.5) == {"5:6": "7:8"}
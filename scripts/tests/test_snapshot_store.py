@@ -0,0 +1,23 @@
+import pytest
+
+from snapshot_store import SnapshotStore
+
+
+def payload(name, value):
+    return {"meta": {
+        "variableCollections": {"c1": {"name": "Color"}},
+        "variables": {"v1": {"name": name, "variableCollectionId": "c1", "valuesByMode": {"m1": value}}},
+    }}
+
+
+def test_history_resolves_renamed_variable(tmp_path):
+    store = SnapshotStore(tmp_path)
+    store.add("2026-03-01T00:00:00Z", payload("Text/Old", 1))
+    store.add("2026-03-02T00:00:00Z", payload("Text/Old", 2))
+    store.add("2026-03-03T00:00:00Z", payload("Text/New", 3))
+
+    assert store.resolve_variable("Text/Old", store.snapshots) == "v1"
+    assert store.resolve_variable("Color/Text/New", store.snapshots) == "v1"
+    assert [store.variable(e, "v1")["valuesByMode"]["m1"] for e in store.snapshots] == [1, 2, 3]
+    with pytest.raises(LookupError, match="Text/New"):
+        store.resolve_variable("Text/New", store.snapshots[:2])
@@ -0,0 +1,63 @@
+import importlib.util
+import random
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from token_colors import TokenColorIndex, to_hex  # noqa: E402
+
+SCRIPTS = Path(__file__).resolve().parents[1]
+
+
+def load(name):
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), SCRIPTS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def bench():
+    return load("bench-tokenize-widgets")
+
+
+@pytest.fixture(scope="module")
+def tokenizer():
+    return load("tokenize-widgets")
+
+
+def test_scanner_matches_approved_map(bench, tokenizer):
+    rng = random.Random(11)
+    for _ in range(10):
+        doc = bench.generate_widget(rng, 80)
+        assert tokenizer.tokenize(doc) == bench.tokenize_chain(doc)
+
+
+@pytest.mark.parametrize("css, expected", [
+    ("background: #1e1e1e", "background: #1e1e1e"),
+    ("color: #ffffff", "color: #ffffff"),
+    ("color: #fee9e7", "color: #fee9e7"),
+    (".b:hover { background: #1e1e1e }", ".b:hover { background: var(--sds-color-background-brand-hover) }"),
+    (".b { background: #1e1e1e }", ".b { background: #1e1e1e }"),
+])
+def test_state_tokens_need_their_context(tokenizer, css, expected):
+    assert tokenizer._scan(css) == expected
+
+
+def test_lookup_cache_is_per_instance():
+    index = TokenColorIndex([("--sds-color-text-default-default", "text", "#1e1e1e")])
+    other = TokenColorIndex([("--sds-color-text-default-default", "text", "#2c2c2c")])
+    assert index.lookup("#1e1e1e", "text") == "--sds-color-text-default-default"
+    assert other.lookup("#1e1e1e", "text") is None
+    assert index._cache and not hasattr(TokenColorIndex.lookup, "cache_info")
+
+
+def test_per_mode_index():
+    indexes = TokenColorIndex.per_mode()
+    assert list(indexes) == ["SDS Light", "SDS Dark"]
+    light, dark = indexes.values()
+    token = "--sds-color-background-default-default"
+    assert light.token_value(token) != dark.token_value(token)
+    assert dark.lookup(to_hex(dark.token_value(token)), "background") == token
@@ -0,0 +1,308 @@
+"""
+Color parsing and a nearest-token color index built from variables.normalized.json.
+
+The index maps a CSS color literal to the semantic `--sds-color-*` token with
+the same resolved value in a mode, split by role (background / text / border)
+so `color: #1e1e1e` and `background: #1e1e1e` can land on different tokens.
+Exact matches win; otherwise the nearest token in OKLab (alpha included) is
+returned when it lies within `tolerance`. Lookups are vectorized with NumPy.
+
+State tokens are never a nearest match: `-on-*` tokens (text on a filled
+surface) are not matched at all, and `-hover` tokens only exactly and only
+when the caller says the declaration is in a :hover rule. A bare literal says
+nothing about the surface under it or the interaction state it styles.
+
+Requires numpy.
+"""
+import colorsys
+import json
+import math
+import re
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+NORMALIZED_PATH = REPO_ROOT / "tokens" / "figma" / "variables.normalized.json"
+
+# ΔE in OKLab units; 0.02 is about one just-noticeable difference
+DEFAULT_TOLERANCE = 0.03
+
+ROLES = ("background", "text", "border", "icon")
+HOVER = "hover"
+
+# CSS Color 4 named colors
+_NAMED_HEX = {
+    "aliceblue": "f0f8ff", "antiquewhite": "faebd7", "aqua": "00ffff",
+    "aquamarine": "7fffd4", "azure": "f0ffff", "beige": "f5f5dc", "bisque": "ffe4c4",
+    "black": "000000", "blanchedalmond": "ffebcd", "blue": "0000ff", "blueviolet": "8a2be2",
+    "brown": "a52a2a", "burlywood": "deb887", "cadetblue": "5f9ea0", "chartreuse": "7fff00",
+    "chocolate": "d2691e", "coral": "ff7f50", "cornflowerblue": "6495ed",
+    "cornsilk": "fff8dc", "crimson": "dc143c", "cyan": "00ffff", "darkblue": "00008b",
+    "darkcyan": "008b8b", "darkgoldenrod": "b8860b", "darkgray": "a9a9a9",
+    "darkgreen": "006400", "darkgrey": "a9a9a9", "darkkhaki": "bdb76b",
+    "darkmagenta": "8b008b", "darkolivegreen": "556b2f", "darkorange": "ff8c00",
+    "darkorchid": "9932cc", "darkred": "8b0000", "darksalmon": "e9967a",
+    "darkseagreen": "8fbc8f", "darkslateblue": "483d8b", "darkslategray": "2f4f4f",
+    "darkslategrey": "2f4f4f", "darkturquoise": "00ced1", "darkviolet": "9400d3",
+    "deeppink": "ff1493", "deepskyblue": "00bfff", "dimgray": "696969", "dimgrey": "696969",
+    "dodgerblue": "1e90ff", "firebrick": "b22222", "floralwhite": "fffaf0",
+    "forestgreen": "228b22", "fuchsia": "ff00ff", "gainsboro": "dcdcdc",
+    "ghostwhite": "f8f8ff", "gold": "ffd700", "goldenrod": "daa520", "gray": "808080",
+    "green": "008000", "greenyellow": "adff2f", "grey": "808080", "honeydew": "f0fff0",
+    "hotpink": "ff69b4", "indianred": "cd5c5c", "indigo": "4b0082", "ivory": "fffff0",
+    "khaki": "f0e68c", "lavender": "e6e6fa", "lavenderblush": "fff0f5",
+    "lawngreen": "7cfc00", "lemonchiffon": "fffacd", "lightblue": "add8e6",
+    "lightcoral": "f08080", "lightcyan": "e0ffff", "lightgoldenrodyellow": "fafad2",
+    "lightgray": "d3d3d3", "lightgreen": "90ee90", "lightgrey": "d3d3d3",
+    "lightpink": "ffb6c1", "lightsalmon": "ffa07a", "lightseagreen": "20b2aa",
+    "lightskyblue": "87cefa", "lightslategray": "778899", "lightslategrey": "778899",
+    "lightsteelblue": "b0c4de", "lightyellow": "ffffe0", "lime": "00ff00",
+    "limegreen": "32cd32", "linen": "faf0e6", "magenta": "ff00ff", "maroon": "800000",
+    "mediumaquamarine": "66cdaa", "mediumblue": "0000cd", "mediumorchid": "ba55d3",
+    "mediumpurple": "9370db", "mediumseagreen": "3cb371", "mediumslateblue": "7b68ee",
+    "mediumspringgreen": "00fa9a", "mediumturquoise": "48d1cc", "mediumvioletred": "c71585",
+    "midnightblue": "191970", "mintcream": "f5fffa", "mistyrose": "ffe4e1",
+    "moccasin": "ffe4b5", "navajowhite": "ffdead", "navy": "000080", "oldlace": "fdf5e6",
+    "olive": "808000", "olivedrab": "6b8e23", "orange": "ffa500", "orangered": "ff4500",
+    "orchid": "da70d6", "palegoldenrod": "eee8aa", "palegreen": "98fb98",
+    "paleturquoise": "afeeee", "palevioletred": "db7093", "papayawhip": "ffefd5",
+    "peachpuff": "ffdab9", "peru": "cd853f", "pink": "ffc0cb", "plum": "dda0dd",
+    "powderblue": "b0e0e6", "purple": "800080", "rebeccapurple": "663399", "red": "ff0000",
+    "rosybrown": "bc8f8f", "royalblue": "4169e1", "saddlebrown": "8b4513",
+    "salmon": "fa8072", "sandybrown": "f4a460", "seagreen": "2e8b57", "seashell": "fff5ee",
+    "sienna": "a0522d", "silver": "c0c0c0", "skyblue": "87ceeb", "slateblue": "6a5acd",
+    "slategray": "708090", "slategrey": "708090", "snow": "fffafa", "springgreen": "00ff7f",
+    "steelblue": "4682b4", "tan": "d2b48c", "teal": "008080", "thistle": "d8bfd8",
+    "tomato": "ff6347", "turquoise": "40e0d0", "violet": "ee82ee", "wheat": "f5deb3",
+    "white": "ffffff", "whitesmoke": "f5f5f5", "yellow": "ffff00", "yellowgreen": "9acd32",
+}
+NAMED_COLORS = {
+    name: tuple(int(h[i:i + 2], 16) / 255 for i in (0, 2, 4)) + (1.0,)
+    for name, h in _NAMED_HEX.items()
+}
+NAMED_COLORS["transparent"] = (0.0, 0.0, 0.0, 0.0)
+
+_NUM = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:e[-+]?\d+)?"
+_FUNC_RE = re.compile(
+    rf"^(rgba?|hsla?)\(\s*({_NUM}(?:deg|turn|rad|%)?)\s*[, ]\s*({_NUM}%?)\s*[, ]\s*({_NUM}%?)"
+    rf"\s*(?:[,/]\s*({_NUM}%?)\s*)?\)$",
+    re.IGNORECASE,
+)
+
+
+def _channel(text, scale):
+    """A CSS channel value: percentages are 0..100%, plain numbers 0..scale."""
+    if text.endswith("%"):
+        return float(text[:-1]) / 100
+    return float(text) / scale
+
+
+def _hue(text):
+    text = text.lower()
+    if text.endswith("deg"):
+        return float(text[:-3]) / 360
+    if text.endswith("turn"):
+        return float(text[:-4])
+    if text.endswith("rad"):
+        return float(text[:-3]) / (2 * math.pi)
+    return float(text) / 360
+
+
+def parse_color(text):
+    """Parse #rgb[a], #rrggbb[aa], rgb[a](), hsl[a]() or a named color to RGBA floats."""
+    value = text.strip().lower()
+    if value in NAMED_COLORS:
+        return NAMED_COLORS[value]
+    if value.startswith("#"):
+        digits = value[1:]
+        if len(digits) in (3, 4):
+            digits = "".join(c * 2 for c in digits)
+        if len(digits) not in (6, 8):
+            return None
+        try:
+            parts = [int(digits[i:i + 2], 16) / 255 for i in range(0, len(digits), 2)]
+        except ValueError:
+            return None
+        return tuple(parts) if len(parts) == 4 else (*parts, 1.0)
+
+    m = _FUNC_RE.match(value)
+    if not m:
+        return None
+    kind, a, b, c, alpha = m.groups()
+    try:
+        alpha = 1.0 if alpha is None else _channel(alpha, 1)
+        if kind.startswith("rgb"):
+            rgb = (_channel(a, 255), _channel(b, 255), _channel(c, 255))
+        else:
+            rgb = colorsys.hls_to_rgb(_hue(a) % 1.0, _channel(c, 100), _channel(b, 100))
+    except ValueError:
+        return None
+    return tuple(min(1.0, max(0.0, x)) for x in (*rgb, alpha))
+
+
+def to_hex(rgba):
+    """#rrggbb (or #rrggbbaa when translucent), rounding like Math.round in figma-lib.mjs."""
+    parts = [max(0, min(255, math.floor(x * 255 + 0.5))) for x in rgba]
+    if len(parts) == 4 and parts[3] >= 255:
+        parts = parts[:3]
+    return "#" + "".join(f"{p:02x}" for p in parts[:4])
+
+
+def srgb_to_oklab(rgb):
+    """Vectorized sRGB (…, 3) floats in 0..1 → OKLab (…, 3)."""
+    rgb = np.asarray(rgb, dtype=np.float64)
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    lms = linear @ np.array([
+        [0.4122214708, 0.2119034982, 0.0883024619],
+        [0.5363325363, 0.6806995451, 0.2817188376],
+        [0.0514459929, 0.1073969566, 0.6299787005],
+    ])
+    lms = np.cbrt(lms)
+    return lms @ np.array([
+        [0.2104542553, 1.9779984951, 0.0259040371],
+        [0.7936177850, -2.4285922050, 0.7827717662],
+        [-0.0040720468, 0.4505937099, -0.8086757660],
+    ])
+
+
+def oklab_features(rgba):
+    """(…, 4) RGBA → (…, 4) OKLab + alpha, the space distances are measured in."""
+    rgba = np.asarray(rgba, dtype=np.float64)
+    return np.concatenate([srgb_to_oklab(rgba[..., :3]), rgba[..., 3:4]], axis=-1)
+
+
+def token_role(css_var):
+    """background / text / border / icon for --sds-color-<role>-… tokens, else None."""
+    parts = css_var.split("-")
+    if len(parts) > 4 and parts[2:4] == ["sds", "color"] and parts[4] in ROLES:
+        return parts[4]
+    return None
+
+
+def token_state(css_var):
+    """"hover" or "on" for interaction / on-surface tokens, else None."""
+    parts = css_var.split("-")[5:]
+    if "on" in parts:
+        return "on"
+    if HOVER in parts:
+        return HOVER
+    return None
+
+
+def color_modes(data):
+    """{mode name: mode id} for the Color modes in modeSelection, light first."""
+    selection = data.get("modeSelection", {})
+    return {
+        selection.get(f"{kind}ModeName") or kind: selection[f"{kind}ModeId"]
+        for kind in ("light", "dark") if selection.get(f"{kind}ModeId")
+    }
+
+
+def _preference(css_var):
+    """Sort key among tokens sharing a value: default family, base states, short names."""
+    parts = css_var.split("-")[5:]
+    return (
+        parts[:1] != ["default"],
+        "hover" in parts or "disabled" in parts,
+        "on" in parts,
+        len(parts),
+        css_var,
+    )
+
+
+class TokenColorIndex:
+    """Reverse index resolved color → semantic token for one mode, per role."""
+
+    def __init__(self, entries, tolerance=DEFAULT_TOLERANCE, mode_id=None):
+        """entries: iterable of (css_var, role, color text)."""
+        self.tolerance = tolerance
+        self.mode_id = mode_id
+        self.values = {}
+        self._cache = {}
+        grouped = {}
+        for css_var, role, value in entries:
+            rgba = parse_color(value)
+            if rgba is None:
+                continue
+            self.values[css_var] = rgba
+            grouped.setdefault(role, []).append((css_var, rgba))
+        # role → (base token names, their OKLab features, hex → base token, hex → hover token)
+        self.roles = {}
+        for role, items in grouped.items():
+            items.sort(key=lambda item: _preference(item[0]))
+            base = [(name, rgba) for name, rgba in items if token_state(name) is None]
+            exact, hover = {}, {}
+            for name, rgba in items:
+                state = token_state(name)
+                if state is None:
+                    exact.setdefault(to_hex(rgba), name)
+                elif state == HOVER:
+                    hover.setdefault(to_hex(rgba), name)
+            features = oklab_features([rgba for _, rgba in base]) if base else np.empty((0, 4))
+            self.roles[role] = ([name for name, _ in base], features, exact, hover)
+
+    @classmethod
+    def from_normalized(cls, path=NORMALIZED_PATH, mode_id=None, tolerance=DEFAULT_TOLERANCE):
+        """Build from variables.normalized.json; mode defaults to modeSelection.lightModeId."""
+        return cls.from_data(json.loads(Path(path).read_text()), mode_id, tolerance)
+
+    @classmethod
+    def per_mode(cls, path=NORMALIZED_PATH, tolerance=DEFAULT_TOLERANCE):
+        """{Color mode name: index} for every mode in modeSelection."""
+        data = json.loads(Path(path).read_text())
+        return {name: cls.from_data(data, mode_id, tolerance) for name, mode_id in color_modes(data).items()}
+
+    @classmethod
+    def from_data(cls, data, mode_id=None, tolerance=DEFAULT_TOLERANCE):
+        """Build from parsed variables.normalized.json data."""
+        mode_id = mode_id or data.get("modeSelection", {}).get("lightModeId")
+        entries = []
+        for var in data.get("variables", []):
+            if var.get("resolvedType") != "COLOR":
+                continue
+            role = token_role(var.get("cssVar", ""))
+            mode = var.get("modes", {}).get(mode_id)
+            if role and mode and mode.get("value"):
+                entries.append((var["cssVar"], role, mode["value"]))
+        return cls(entries, tolerance, mode_id)
+
+    def nearest_many(self, colors, role):
+        """Vectorized lookup: RGBA array (M, 4) → [(base token or None, ΔE)] per row."""
+        if role not in self.roles or not len(colors) or not self.roles[role][0]:
+            return [(None, math.inf)] * len(colors)
+        names, features = self.roles[role][:2]
+        query = oklab_features(colors)
+        dist = np.linalg.norm(query[:, None, :] - features[None, :, :], axis=-1)
+        best = dist.argmin(axis=1)  # first minimum = preferred name among equals
+        out = []
+        for row, col in enumerate(best):
+            delta = float(dist[row, col])
+            out.append((names[col] if delta <= self.tolerance else None, delta))
+        return out
+
+    def lookup(self, text, role, state=None):
+        """Token for a CSS color literal in a role, or None when nothing is close enough.
+
+        With state="hover" an exact `-hover` token is preferred over a base token.
+        """
+        key = (text, role, state)
+        if key not in self._cache:
+            self._cache[key] = self._lookup(text, role, state)
+        return self._cache[key]
+
+    def _lookup(self, text, role, state):
+        rgba = parse_color(text)
+        if rgba is None or role not in self.roles:
+            return None
+        _, _, exact, hover = self.roles[role]
+        hex_value = to_hex(rgba)
+        if state == HOVER and hex_value in hover:
+            return hover[hex_value]
+        if hex_value in exact:
+            return exact[hex_value]
+        return self.nearest_many(np.array([rgba]), role)[0][0]
+
+    def token_value(self, css_var):
+        """Resolved RGBA of a token in this index's mode."""
+        return self.values.get(css_var)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Inverted index of `var(--sds-…)` usages in the widgets (with their shared.css)
+and web-client, joined against the tokens variables.normalized.json defines.
+
+Each source file contributes its usages (token, line, property the var() sits
+in) and its own `--sds-*: …` declarations. The generated token sheets
+(mcp-server/tokens, web-client/tokens) contribute definitions and the var()
+references between them, so a Figma token reached only through a component
+token (`--sds-comp-badge-bg: var(--sds-color-…)`) still counts as used.
+
+The per-file results are cached in .figma-cache/token-usage-index.json keyed
+by mtime and size; a run re-reads only the files that changed, so `who` is
+answered from the cache plus a stat() per file.
+
+Reported:
+
+- undefined: used, but neither in normalized.json nor declared in a sheet or
+  the using code
+- unused: in normalized.json, but not reached from any usage
+- required-missing: token-name-map.json requiredTokens not in normalized.json
+
+    python3 scripts/token_usage.py who -- --sds-color-text-default-default
+    python3 scripts/token_usage.py who -- '--sds-comp-*'
+    python3 scripts/token_usage.py report [--json] [--fail]
+"""
+import argparse
+import bisect
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from fnmatch import fnmatch
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+NORMALIZED_PATH = REPO_ROOT / "tokens" / "figma" / "variables.normalized.json"
+TOKEN_NAME_MAP = REPO_ROOT / "tokens" / "figma" / "token-name-map.json"
+DEFAULT_CACHE = REPO_ROOT / ".figma-cache" / "token-usage-index.json"
+CACHE_VERSION = 1
+
+ROOTS = ("mcp-server/widgets", "mcp-server/src/widgets", "web-client")
+SHEET_DIRS = ("mcp-server/tokens", "web-client/tokens")
+SUFFIXES = (".html", ".css", ".tsx", ".ts", ".jsx", ".js", ".mjs")
+# Dependencies, build output (public/widgets is a bundle of mcp-server/widgets) and the sheets
+EXCLUDE_DIRS = {"node_modules", ".next", "dist", "build", "public", "tokens"}
+
+_USE = re.compile(r"var\(\s*(--sds-[\w-]+)")
+_DEFINE = re.compile(r"(?<![\w-])[\"']?(--sds-[\w-]+)[\"']?\s*:\s*([^;{}]*)")
+_PROP = re.compile(r"(-{0,2}[A-Za-z][\w-]*)[\"']?\s*:\s*[^;{}:]*$")
+_DELIMITERS = re.compile(r"[;{}\n]")
+
+
+def _property(text, start):
+    """Property (CSS or style-object key) whose value contains position `start`."""
+    head = text[max(0, start - 240):start]
+    cut = [m.end() for m in _DELIMITERS.finditer(head)]
+    m = _PROP.search(head[cut[-1]:] if cut else head)
+    return m.group(1) if m else None
+
+
+def scan_file(path):
+    """{"uses": [[token, line, property]], "defines": [[token, line, [referenced tokens]]]}."""
+    text = Path(path).read_text(encoding="utf-8", errors="replace")
+    line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+
+    def line_of(pos):
+        return bisect.bisect_right(line_starts, pos)
+
+    uses = [[m.group(1), line_of(m.start()), _property(text, m.start())] for m in _USE.finditer(text)]
+    defines = [
+        [m.group(1), line_of(m.start(1)), sorted(set(_USE.findall(m.group(2))))]
+        for m in _DEFINE.finditer(text)
+    ]
+    return {"uses": uses, "defines": defines}
+
+
+def discover(root=REPO_ROOT):
+    """(source files, sheet files) as repo-relative posix paths."""
+    sources = []
+    for top in ROOTS:
+        for path in (root / top).rglob("*"):
+            if path.suffix in SUFFIXES and path.is_file() \
+                    and not EXCLUDE_DIRS.intersection(path.relative_to(root).parts[:-1]):
+                sources.append(path.relative_to(root).as_posix())
+    sheets = [p.relative_to(root).as_posix() for d in SHEET_DIRS for p in (root / d).glob("*.css")]
+    return sorted(sources), sorted(sheets)
+
+
+class UsageIndex:
+    """Cached per-file scan results and the inverted token → usages index built from them."""
+
+    def __init__(self, cache_path=DEFAULT_CACHE, root=REPO_ROOT):
+        self.cache_path = Path(cache_path)
+        self.root = root
+        self.files = {}
+        self.sheets = set()
+        self.rescanned = 0
+
+    def _load_cache(self):
+        try:
+            data = json.loads(self.cache_path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return data.get("files", {}) if data.get("version") == CACHE_VERSION else {}
+
+    def _save_cache(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": CACHE_VERSION, "files": self.files}, separators=(",", ":")))
+        os.replace(tmp, self.cache_path)
+
+    def refresh(self, rebuild=False):
+        """Bring the index up to date, re-reading only files whose mtime or size changed."""
+        previous = {} if rebuild else self._load_cache()
+        sources, sheets = discover(self.root)
+        self.sheets = set(sheets)
+        self.files = {}
+        for rel in sources + sheets:
+            st = (self.root / rel).stat()
+            entry = previous.get(rel)
+            if entry and entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                self.files[rel] = entry
+                continue
+            self.files[rel] = {"mtime": st.st_mtime_ns, "size": st.st_size, **scan_file(self.root / rel)}
+            self.rescanned += 1
+        if self.rescanned or previous.keys() != self.files.keys():
+            self._save_cache()
+        return self
+
+    def usages(self):
+        """{token: [(file, line, property)]} over the source files (sheets excluded)."""
+        index = defaultdict(list)
+        for rel, entry in self.files.items():
+            if rel in self.sheets:
+                continue
+            for token, line, prop in entry["uses"]:
+                index[token].append((rel, line, prop))
+        return index
+
+    def definitions(self):
+        """{token: [(file, line, [referenced tokens])]} from sheets and source declarations."""
+        defined = defaultdict(list)
+        for rel, entry in self.files.items():
+            for token, line, refs in entry["defines"]:
+                defined[token].append((rel, line, refs))
+        return defined
+
+    def who(self, pattern):
+        """Usages of one token, or of every token matching a glob."""
+        index = self.usages()
+        if any(c in pattern for c in "*?["):
+            return {t: index[t] for t in sorted(index) if fnmatch(t, pattern)}
+        return {pattern: index.get(pattern, [])}
+
+
+def load_figma_tokens(path=NORMALIZED_PATH):
+    data = json.loads(Path(path).read_text())
+    return {v["cssVar"] for v in data.get("variables", []) if v.get("cssVar")}
+
+
+def load_required(path=TOKEN_NAME_MAP):
+    try:
+        required = json.loads(Path(path).read_text()).get("requiredTokens", [])
+    except (OSError, ValueError):
+        return []
+    return required if isinstance(required, list) else []
+
+
+def report(index, figma, required):
+    usages, defined = index.usages(), index.definitions()
+    # a token is used when code references it or a used token's definition does
+    reached, stack = set(), list(usages)
+    while stack:
+        token = stack.pop()
+        if token in reached:
+            continue
+        reached.add(token)
+        for _, _, refs in defined.get(token, ()):
+            stack.extend(refs)
+
+    undefined = {
+        t: [f"{f}:{n}" for f, n, _ in sites]
+        for t, sites in sorted(usages.items()) if t not in figma and t not in defined
+    }
+    return {
+        "summary": {
+            "files": len(index.files) - len(index.sheets),
+            "usages": sum(len(s) for s in usages.values()),
+            "tokensUsed": len(usages),
+            "figmaTokens": len(figma),
+            "undefined": len(undefined),
+            "unused": len(figma - reached),
+            "requiredMissing": sum(t not in figma for t in required),
+        },
+        "undefined": undefined,
+        "unused": sorted(figma - reached),
+        "requiredMissing": [t for t in required if t not in figma],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index --sds-* custom property usage.")
+    parser.add_argument("--cache", type=Path, default=DEFAULT_CACHE)
+    parser.add_argument("--rebuild", action="store_true", help="ignore the cache and re-read every file")
+    sub = parser.add_subparsers(dest="command")
+    who = sub.add_parser("who", help="where a token (or glob of tokens) is used")
+    who.add_argument("token")
+    who.add_argument("--json", action="store_true")
+    rep = sub.add_parser("report", help="undefined, unused and required-but-missing tokens")
+    rep.add_argument("--normalized", type=Path, default=NORMALIZED_PATH)
+    rep.add_argument("--json", action="store_true")
+    rep.add_argument("--limit", type=int, default=40, help="unused tokens listed")
+    rep.add_argument("--fail", action="store_true", help="exit 1 on undefined or required-missing tokens")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = UsageIndex(args.cache).refresh(args.rebuild)
+    refreshed = (time.perf_counter() - started) * 1000
+
+    if args.command == "who":
+        result = index.who(args.token)
+        if args.json:
+            print(json.dumps({t: [{"file": f, "line": n, "property": p} for f, n, p in sites]
+                              for t, sites in result.items()}, indent=2))
+        else:
+            for token, sites in result.items():
+                print(f"{token}: {len(sites)} usages")
+                for f, n, p in sites:
+                    print(f"  {f}:{n}" + (f"  ({p})" if p else ""))
+        return 0 if any(result.values()) else 1
+
+    result = report(index, load_figma_tokens(getattr(args, "normalized", NORMALIZED_PATH)), load_required())
+    if getattr(args, "json", False):
+        print(json.dumps(result, indent=2))
+    else:
+        s = result["summary"]
+        print(f"{s['usages']} usages of {s['tokensUsed']} tokens in {s['files']} files "
+              f"({index.rescanned} re-read, {refreshed:.0f} ms)")
+        print(f"  {s['undefined']} undefined, {s['unused']} of {s['figmaTokens']} Figma tokens unused, "
+              f"{s['requiredMissing']} required missing")
+        for token, sites in result["undefined"].items():
+            print(f"\nundefined {token}: " + ", ".join(sites))
+        for token in result["requiredMissing"]:
+            print(f"\nrequired but missing: {token}")
+        limit = getattr(args, "limit", 40)
+        if result["unused"]:
+            print("\nunused:")
+            for token in result["unused"][:limit]:
+                print(f"  {token}")
+            if len(result["unused"]) > limit:
+                print(f"  … {len(result['unused']) - limit} more")
+    failed = result["undefined"] or result["requiredMissing"]
+    return 1 if getattr(args, "fail", False) and failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,137 +1,157 @@
 #!/usr/bin/env python3
 """
-Tokenize hardcoded CSS hex colors in MCP widget HTML files.
-Replaces all raw hex values with Figma Design System CSS custom property tokens.
+Tokenize hardcoded CSS colors in MCP widget HTML files.
+Replaces raw hex / rgb() / hsl() / named values with Figma Design System CSS
+custom property tokens derived from tokens/figma/variables.normalized.json.
 Context-aware: differentiates background, color (text), and border properties.
 """
+import argparse
+import hashlib
+import json
 import re
 import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import token_colors
+from token_colors import DEFAULT_TOLERANCE, HOVER, NORMALIZED_PATH, TokenColorIndex, color_modes, to_hex
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 WIDGETS_DIR = Path(
     os.environ.get("WIDGETS_DIR", str(REPO_ROOT / "mcp-server" / "widgets"))
 ).expanduser().resolve()
 
-# Files needing full tokenization (100% hardcoded)
-FULL_TOKENIZE = [
-    "checkout-form.html",
-    "order-confirmation.html",
-    "price-tag.html",
-    "product-detail.html",
-    "review-rating.html",
-    "wishlist.html",
-]
+WEB_CLIENT_DIR = REPO_ROOT / "web-client"
+CACHE_DIR = REPO_ROOT / ".figma-cache"
+DEFAULT_MANIFEST = CACHE_DIR / "tokenize-manifest.json"
 
-# Files needing partial fixes
-PARTIAL_FIX = [
-    "cart-summary.html",
-    "cart-view.html",
-]
+SUFFIXES = (".html", ".css")
+# Build output, dependencies and the generated token sheets themselves
+EXCLUDE_DIRS = {"node_modules", ".next", "dist", "build", "tokens"}
 
 
-def tokenize(content):
-    """Replace hardcoded hex colors with CSS custom property tokens."""
-
-    # ── Step 1: Remove body { display:flex; ... background:#f5f5f5; } override ──
-    # shared.css already handles body styling
-    content = re.sub(
-        r'\n?\s*body\s*\{\s*display\s*:\s*flex\s*;[^}]*\}',
-        '',
-        content
+# ── Token index (color → CSS custom property) per property role ──
+# Built at startup from variables.normalized.json in one Color mode (light
+# unless --mode says otherwise), so a Figma palette change needs no edit here.
+# TOKEN_DELTA_E sets the OKLab tolerance for near-miss literals.
+def load_index(mode=None):
+    """Token index for a Color mode name ("SDS Dark", or just "dark"); None is the light mode."""
+    data = json.loads(NORMALIZED_PATH.read_text())
+    mode_id = None
+    if mode:
+        modes = color_modes(data)
+        matches = [mid for name, mid in modes.items()
+                   if mode.lower() == name.lower() or mode.lower() in name.lower().split()]
+        if len(matches) != 1:
+            raise SystemExit(f"Unknown Color mode {mode!r}; have {', '.join(modes)}")
+        mode_id = matches[0]
+    return TokenColorIndex.from_data(
+        data, mode_id, tolerance=float(os.environ.get("TOKEN_DELTA_E", DEFAULT_TOLERANCE))
     )
 
-    # ── Step 2: Border replacements (do FIRST so border #d9d9d9 doesn't get caught by bg) ──
-    border_solid_map = {
-        '#d9d9d9': 'var(--sds-color-border-default-default)',
-    }
-    for hex_val, token in border_solid_map.items():
-        content = re.sub(
-            rf'(border\s*:\s*\d+px\s+solid\s+){re.escape(hex_val)}',
-            rf'\g<1>{token}',
-            content,
-            flags=re.IGNORECASE
-        )
-
-    border_color_map = {
-        '#d9d9d9': 'var(--sds-color-border-default-default)',
-        '#2c2c2c': 'var(--sds-color-border-brand-default)',
-        '#eb221e': 'var(--sds-color-border-danger-tertiary)',
-    }
-    for hex_val, token in border_color_map.items():
-        content = re.sub(
-            rf'(border-color\s*:\s*){re.escape(hex_val)}',
-            rf'\g<1>{token}',
-            content,
-            flags=re.IGNORECASE
-        )
-
-    # ── Step 3: Background property replacements ──
-    bg_map = [
-        ('#ffffff', 'var(--sds-color-background-default-default)'),
-        ('#f5f5f5', 'var(--sds-color-background-default-secondary)'),
-        ('#2c2c2c', 'var(--sds-color-background-brand-default)'),
-        ('#eb221e', 'var(--sds-color-background-danger-default)'),
-        ('#fee9e7', 'var(--sds-color-background-danger-tertiary)'),
-        ('#ebffee', 'var(--sds-color-background-positive-tertiary)'),
-        ('#e5e5e5', 'var(--sds-color-background-default-secondary-hover)'),
-        ('#d9d9d9', 'var(--sds-color-background-default-tertiary)'),
-        ('#f5a623', 'var(--sds-color-background-warning-default)'),
-    ]
-    for hex_val, token in bg_map:
-        content = re.sub(
-            rf'(background(?:-color)?\s*:\s*){re.escape(hex_val)}',
-            rf'\g<1>{token}',
-            content,
-            flags=re.IGNORECASE
-        )
-
-    # Handle rgba overlay
-    content = re.sub(
-        r'(background(?:-color)?\s*:\s*)rgba\(\s*0\s*,\s*0\s*,\s*0\s*,\s*0\.5\s*\)',
-        r'\g<1>var(--sds-color-background-utilities-overlay)',
-        content
-    )
 
-    # ── Step 4: Text color property replacements ──
-    color_map = [
-        ('#1e1e1e', 'var(--sds-color-text-default-default)'),
-        ('#757575', 'var(--sds-color-text-default-secondary)'),
-        ('#b3b3b3', 'var(--sds-color-text-default-tertiary)'),
-        ('#2c2c2c', 'var(--sds-color-text-brand-default)'),
-        ('#f5f5f5', 'var(--sds-color-text-brand-on-brand)'),
-        ('#900b09', 'var(--sds-color-text-danger-default)'),
-        ('#8f0b09', 'var(--sds-color-text-danger-default)'),
-        ('#02542d', 'var(--sds-color-text-positive-default)'),
-        ('#14ae5c', 'var(--sds-color-text-positive-tertiary)'),
-        ('#f5a623', 'var(--sds-color-background-warning-default)'),
-    ]
-    for hex_val, token in color_map:
-        # Match "color:" NOT preceded by "background-" or "border-"
-        content = re.sub(
-            rf'(?<![a-zA-Z-])color\s*:\s*{re.escape(hex_val)}',
-            rf'color: {token}',
-            content,
-            flags=re.IGNORECASE
-        )
-
-    # Handle "color: white"
-    content = re.sub(
-        r'(?<![a-zA-Z-])color\s*:\s*white(?![a-zA-Z])',
-        r'color: var(--sds-color-text-brand-on-brand)',
-        content,
-        flags=re.IGNORECASE
-    )
+INDEX = load_index()
+
+
+def use_mode(mode):
+    """Switch the module index to another Color mode (also the worker initializer)."""
+    global INDEX
+    INDEX = load_index(mode)
+
+CONTEXT_ROLES = {
+    'divider': 'border',
+    'border_solid': 'border',
+    'border_color': 'border',
+    'bg': 'background',
+    'color': 'text',
+}
+
+# Only CSS is tokenized: <style> blocks and inline style="..." attributes.
+REGION_RE = re.compile(
+    r'(?=[<s])(?:(?P<open><style\b[^>]*>)(?P<css>.*?)(?P<close></style>)'
+    r'|(?P<attr>(?<![\w-])style\s*=\s*)(?P<q>["\'])(?P<inline>.*?)(?P=q))',
+    re.DOTALL | re.IGNORECASE,
+)
+
+_COLOR = r'#[0-9a-f]{3,8}(?![0-9a-f])|(?:rgba?|hsla?)\([^)]*\)|(?:white|black)(?![\w-])'
+
+# One scanner for every property context; the first alternative that matches
+# at a position wins, so the more specific contexts come first. Every context
+# starts with a property name, so the shared guard rejects most positions on
+# their first character.
+SCANNER = re.compile(
+    r'(?<![\w-])(?=[bhc])(?:'
+    # shared.css already handles body styling: drop `body { display:flex; ... }`
+    r'(?<![.#])(?P<body>body\s*\{\s*display\s*:\s*flex\s*;[^}]*\})'
+    # dividers use "height:1px; background:" as separators → border token
+    rf'|(?P<divider>height\s*:\s*1px\s*;\s*background\s*:\s*)'
+    rf'(?P<divider_val>{_COLOR}|var\(--sds-color-background-[\w-]+\))'
+    rf'|(?P<border_solid>border\s*:\s*\d+px\s+solid\s+)(?P<border_solid_val>{_COLOR})'
+    rf'|(?P<border_color>border-color\s*:\s*)(?P<border_color_val>{_COLOR})'
+    rf'|(?P<bg>background(?:-color)?\s*:\s*)(?P<bg_val>{_COLOR})'
+    # the guard keeps "background-color:" / "border-color:" out of this branch
+    rf'|(?P<color>color\s*:\s*)(?P<color_val>{_COLOR})'
+    r')',
+    re.IGNORECASE,
+)
+
+
+def _rule_state(css, pos):
+    """HOVER when position `pos` is a declaration inside a `:hover` rule, else None."""
+    brace = css.rfind('{', 0, pos)
+    if brace < 0 or css.rfind('}', 0, pos) > brace:
+        return None
+    start = max(css.rfind('}', 0, brace), css.rfind('{', 0, brace), css.rfind(';', 0, brace)) + 1
+    return HOVER if ':hover' in css[start:brace] else None
 
-    # ── Step 5: Fix divider backgrounds ──
-    # Dividers use "height:1px; background:" as visual separators → should use border token
-    content = re.sub(
-        r'(height\s*:\s*1px\s*;\s*background\s*:\s*)var\(--sds-color-background-default-tertiary\)',
-        r'\g<1>var(--sds-color-border-default-default)',
-        content
-    )
 
-    return content
+def _dispatch(m, state=None):
+    """Pick the token for one matched declaration; unknown values stay as-is."""
+    kind = m.lastgroup[:-len('_val')]
+    prefix, value = m.group(kind), m.group(f'{kind}_val')
+    if value.startswith('var('):
+        # divider already on a background token: move it to the border token
+        rgba = INDEX.token_value(value[4:-1])
+        value = to_hex(rgba) if rgba else value
+    token = INDEX.lookup(value, CONTEXT_ROLES[kind], state)
+    if token is None:
+        return m.group(0)
+    if kind == 'color':
+        prefix = 'color: '
+    return f'{prefix}var({token})'
+
+
+def _scan(css):
+    """Single pass of SCANNER over one CSS region."""
+    out = []
+    pos = 0
+    for m in SCANNER.finditer(css):
+        piece = css[pos:m.start()]
+        if m.lastgroup == 'body':
+            out.append(piece.rstrip())  # the rule goes with its leading whitespace
+        else:
+            out.append(piece)
+            out.append(_dispatch(m, _rule_state(css, m.start())))
+        pos = m.end()
+    out.append(css[pos:])
+    return ''.join(out)
+
+
+def _tokenize_region(m):
+    if m.group('css') is not None:
+        return m.group('open') + _scan(m.group('css')) + m.group('close')
+    q = m.group('q')
+    return m.group('attr') + q + _scan(m.group('inline')) + q
+
+
+def tokenize(content):
+    """Replace hardcoded hex colors with CSS custom property tokens.
+
+    A single compiled scanner walks each <style> block and inline style
+    attribute once and picks the token per property context in _dispatch.
+    """
+    return REGION_RE.sub(_tokenize_region, content)
 
 
 def fix_wishlist(content):
@@ -139,44 +159,161 @@ def fix_wishlist(content):
     return content.replace('</html>\n</html>', '</html>')
 
 
-def main():
-    changes = 0
-    all_files = FULL_TOKENIZE + PARTIAL_FIX
+def discover(roots):
+    """Every .html/.css file under the roots, in a stable order."""
+    files = []
+    for root in roots:
+        for path in root.rglob("*"):
+            if path.suffix not in SUFFIXES or not path.is_file():
+                continue
+            if EXCLUDE_DIRS.intersection(path.relative_to(root).parts[:-1]):
+                continue
+            files.append(path)
+    return sorted(set(files))
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
 
-    for fname in all_files:
-        fpath = WIDGETS_DIR / fname
-        if not fpath.exists():
-            print(f"  SKIP {fname}: not found")
-            continue
 
-        with open(fpath, 'r', encoding='utf-8') as f:
-            original = f.read()
+def token_map_hash():
+    """Changes whenever the output of tokenize() could change for the same input.
 
+    Covers the token values, the matching code (token_colors.py and this
+    script), the Color mode and the ΔE tolerance.
+    """
+    h = hashlib.sha256(NORMALIZED_PATH.read_bytes())
+    for source in (Path(token_colors.__file__), Path(__file__)):
+        h.update(source.read_bytes())
+    h.update(f"{INDEX.mode_id}|{INDEX.tolerance}|{SCANNER.pattern}|{REGION_RE.pattern}".encode())
+    return h.hexdigest()
+
+
+def load_manifest(path, map_hash):
+    """{file: content hash} from the last run, or {} when the token map changed."""
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return data.get("files", {}) if data.get("tokenMap") == map_hash else {}
+
+
+def save_manifest(path, map_hash, files):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"tokenMap": map_hash, "files": files}, indent=2, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def atomic_write(path, text):
+    """Write via a temp file in the same directory so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        os.chmod(tmp, path.stat().st_mode & 0o777)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def process_file(path):
+    """Tokenize one file in a worker; returns (changed, remaining hex, final content hash)."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        original = f.read()
+
+    if path.suffix == ".css":
+        updated = _scan(original)
+    else:
         updated = tokenize(original)
+    if path.name == "wishlist.html":
+        updated = fix_wishlist(updated)
+
+    if updated == original:
+        return False, None, content_hash(original.encode("utf-8"))
+    atomic_write(path, updated)
 
-        if fname == 'wishlist.html':
-            updated = fix_wishlist(updated)
+    # Count remaining hardcoded hex values in CSS
+    css = updated
+    if path.suffix == ".html":
+        style_match = re.search(r'<style>(.*?)</style>', updated, re.DOTALL)
+        css = style_match.group(1) if style_match else ""
+    remaining = re.findall(r'#[0-9a-fA-F]{6}\b', css)
+    return True, remaining, content_hash(updated.encode("utf-8"))
 
-        if updated != original:
-            with open(fpath, 'w', encoding='utf-8') as f:
-                f.write(updated)
-            changes += 1
 
-            # Count remaining hardcoded hex values in <style> block
-            style_match = re.search(r'<style>(.*?)</style>', updated, re.DOTALL)
-            if style_match:
-                style_content = style_match.group(1)
-                remaining = re.findall(r'#[0-9a-fA-F]{6}\b', style_content)
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--web-client", action="store_true",
+        help="also tokenize HTML/CSS under web-client/ (tokens/ and build output excluded)",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1,
+        help="worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--manifest", type=Path, default=DEFAULT_MANIFEST,
+        help=f"content-hash manifest (default: {DEFAULT_MANIFEST.relative_to(REPO_ROOT)})",
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="ignore the manifest and process every file",
+    )
+    parser.add_argument(
+        "--mode",
+        help='Color mode whose values literals are matched against, e.g. "SDS Dark" or dark '
+             "(default: the light mode)",
+    )
+    return parser.parse_args()
+
+
+def _label(path):
+    try:
+        return str(path.relative_to(REPO_ROOT))
+    except ValueError:
+        return str(path)
+
+
+def main():
+    args = parse_args()
+    if args.mode:
+        use_mode(args.mode)
+    roots = [WIDGETS_DIR] + ([WEB_CLIENT_DIR] if args.web_client else [])
+    map_hash = token_map_hash()
+    previous = {} if args.force else load_manifest(args.manifest, map_hash)
+
+    manifest = {}
+    todo = []
+    for path in discover(roots):
+        label = _label(path)
+        digest = content_hash(path.read_bytes())
+        if previous.get(label) == digest:
+            manifest[label] = digest
+        else:
+            todo.append((label, path))
+
+    changes = 0
+    if todo:
+        jobs = max(1, min(args.jobs, len(todo)))
+        init = {"initializer": use_mode, "initargs": (args.mode,)} if args.mode else {}
+        with ProcessPoolExecutor(max_workers=jobs, **init) as pool:
+            results = pool.map(process_file, [path for _, path in todo])
+            for (label, _), (changed, remaining, digest) in zip(todo, results):
+                manifest[label] = digest
+                if not changed:
+                    print(f"  NO CHANGES {label}")
+                    continue
+                changes += 1
                 if remaining:
-                    print(f"  TOKENIZED {fname}  (⚠ {len(remaining)} hex values remain: {remaining})")
+                    print(f"  TOKENIZED {label}  (⚠ {len(remaining)} hex values remain: {remaining})")
                 else:
-                    print(f"  TOKENIZED {fname}  (✓ 0 hardcoded hex remaining)")
-            else:
-                print(f"  TOKENIZED {fname}")
-        else:
-            print(f"  NO CHANGES {fname}")
+                    print(f"  TOKENIZED {label}  (✓ 0 hardcoded hex remaining)")
 
-    print(f"\n  Done. {changes} files updated.")
+    save_manifest(args.manifest, map_hash, manifest)
+    skipped = len(manifest) - len(todo)
+    print(f"\n  Done. {changes} files updated, {len(todo)} checked, {skipped} unchanged since last run.")
 
 
 if __name__ == '__main__':
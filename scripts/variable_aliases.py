@@ -0,0 +1,225 @@
+"""
+Transitive VARIABLE_ALIAS resolution over a Figma variables payload.
+
+Mirrors resolveValue() in figma-normalizer.mjs (same aliasChain and
+reason values: resolved / empty / cycle / missing-variable) but builds the
+alias graph once and memoizes every (variable, mode) result, so resolving
+a whole file is O(variables x modes) instead of a scan per lookup.
+
+When an alias crosses into another collection the requested mode usually
+does not exist there; the target's mode is then picked by name through
+modeMeta, falling back to the target collection's defaultModeId.
+
+    python3 scripts/variable_aliases.py [tokens/figma/variables.raw.json] [--json]
+"""
+import argparse
+import json
+import math
+import sys
+from collections import deque, namedtuple
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+RAW_PATH = REPO_ROOT / "tokens" / "figma" / "variables.raw.json"
+
+Resolution = namedtuple("Resolution", "value aliasChain reason")
+
+
+def payload_meta(data):
+    """The `meta` object of a raw snapshot, a rollback file or a bare API response."""
+    if "payload" in data:
+        data = data["payload"] or {}
+    return data.get("meta", data)
+
+
+def rgba_to_css_one(rgba):
+    """One RGBA color as CSS exactly like rgbaToCss() in figma-lib.mjs: hex when opaque, else rgba()."""
+    r, g, b, *rest = rgba
+    alpha = rest[0] if rest else 1
+    ints = [max(0, min(255, math.floor(x * 255 + 0.5))) for x in (r, g, b)]
+    if alpha >= 0.999:
+        return "#" + "".join(f"{x:02x}" for x in ints)
+    return f"rgba({ints[0]}, {ints[1]}, {ints[2]}, {round(alpha * 100) / 100:.2f})"
+
+
+def is_alias(value):
+    return isinstance(value, dict) and value.get("type") == "VARIABLE_ALIAS" and value.get("id")
+
+
+class AliasResolver:
+    """Resolve every variable x mode of one payload to its final value."""
+
+    def __init__(self, meta):
+        self.variables = meta.get("variables", {})
+        self.collections = meta.get("variableCollections", {})
+        self.mode_meta = {}
+        self._modes_by_name = {}
+        for cid, collection in self.collections.items():
+            by_name = self._modes_by_name.setdefault(cid, {})
+            for mode in collection.get("modes", []):
+                self.mode_meta[mode["modeId"]] = {
+                    "modeName": mode["name"],
+                    "collectionId": cid,
+                    "isDefault": collection.get("defaultModeId") == mode["modeId"],
+                }
+                by_name[mode["name"]] = mode["modeId"]
+        self._memo = {}
+
+    @classmethod
+    def from_file(cls, path=RAW_PATH):
+        return cls(payload_meta(json.loads(Path(path).read_text())))
+
+    def modes_of(self, var_id):
+        """Mode ids of the variable's own collection."""
+        var = self.variables.get(var_id, {})
+        collection = self.collections.get(var.get("variableCollectionId"), {})
+        return [mode["modeId"] for mode in collection.get("modes", [])]
+
+    def mode_for(self, var, mode_id):
+        """The mode of `var` to read for a request in `mode_id`."""
+        values = var.get("valuesByMode", {})
+        if mode_id in values:
+            return mode_id
+        cid = var.get("variableCollectionId")
+        name = self.mode_meta.get(mode_id, {}).get("modeName")
+        same_name = self._modes_by_name.get(cid, {}).get(name)
+        if same_name in values:
+            return same_name
+        return self.collections.get(cid, {}).get("defaultModeId")
+
+    def resolve(self, var_id, mode_id):
+        """Resolution(value, aliasChain, reason) for one variable in one mode."""
+        path = []
+        on_path = set()
+        key = (var_id, mode_id)
+        while True:
+            if key in self._memo:
+                result = self._memo[key]
+                break
+            vid, mid = key
+            if vid in on_path:
+                result = Resolution(None, (vid,), "cycle")
+                break
+            var = self.variables.get(vid)
+            if var is None:
+                result = Resolution(None, (vid,), "missing-variable")
+                break
+            path.append(key)
+            on_path.add(vid)
+            mid = self.mode_for(var, mid)
+            raw = var.get("valuesByMode", {}).get(mid) if mid else None
+            if is_alias(raw):
+                key = (raw["id"], mid)
+                continue
+            result = Resolution(raw, (), "empty" if raw is None else "resolved")
+            break
+
+        # A cycle's chain depends on where the walk entered it, so only
+        # acyclic results are cached.
+        for key in reversed(path):
+            result = Resolution(result.value, (key[0],) + result.aliasChain, result.reason)
+            if result.reason != "cycle":
+                self._memo[key] = result
+        return result
+
+    def alias_edges(self):
+        """{variable id: set of alias target ids} across all modes."""
+        edges = {}
+        for vid, var in self.variables.items():
+            for value in var.get("valuesByMode", {}).values():
+                if is_alias(value):
+                    edges.setdefault(vid, set()).add(value["id"])
+        return edges
+
+    def topological_order(self):
+        """Variable ids with alias targets before their sources (Kahn).
+
+        Variables on a cycle cannot be ordered and come last.
+        """
+        edges = self.alias_edges()
+        pending = {vid: len(edges.get(vid, ())) for vid in self.variables}
+        dependents = {}
+        for vid, targets in edges.items():
+            for target in targets:
+                if target in self.variables:
+                    dependents.setdefault(target, []).append(vid)
+                else:
+                    pending[vid] -= 1  # dangling: nothing to wait for
+        queue = deque(vid for vid, n in pending.items() if n == 0)
+        order = []
+        while queue:
+            vid = queue.popleft()
+            order.append(vid)
+            for source in dependents.get(vid, ()):
+                pending[source] -= 1
+                if pending[source] == 0:
+                    queue.append(source)
+        ordered = set(order)
+        order.extend(vid for vid in self.variables if vid not in ordered)
+        return order
+
+    def resolve_all(self):
+        """{variable id: {mode id: Resolution}} for every mode of each variable."""
+        return {
+            vid: {mid: self.resolve(vid, mid) for mid in self.modes_of(vid)}
+            for vid in self.topological_order()
+        }
+
+    def problems(self, resolved=None):
+        """(cycles, dangling): cycles as id lists, dangling as (source, mode, missing id)."""
+        resolved = resolved if resolved is not None else self.resolve_all()
+        cycles = {}
+        dangling = []
+        for vid, modes in resolved.items():
+            for mid, res in modes.items():
+                chain = res.aliasChain
+                if res.reason == "cycle":
+                    loop = chain[chain.index(chain[-1]):-1]
+                    start = loop.index(min(loop))
+                    cycles.setdefault(loop[start:] + loop[:start], None)
+                elif res.reason == "missing-variable" and len(chain) > 1:
+                    dangling.append((vid, mid, chain[-1]))
+        return [list(c) for c in cycles], dangling
+
+    def name(self, var_id):
+        return self.variables.get(var_id, {}).get("name", var_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report alias cycles and dangling alias targets.")
+    parser.add_argument("path", nargs="?", type=Path, default=RAW_PATH)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    resolver = AliasResolver.from_file(args.path)
+    resolved = resolver.resolve_all()
+    cycles, dangling = resolver.problems(resolved)
+    aliased = sum(
+        1 for modes in resolved.values() for res in modes.values() if len(res.aliasChain) > 1
+    )
+
+    if args.json:
+        json.dump({
+            "variables": len(resolved),
+            "aliasedValues": aliased,
+            "cycles": cycles,
+            "dangling": [
+                {"variableId": vid, "modeId": mid, "missingId": target}
+                for vid, mid, target in dangling
+            ],
+        }, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"Variables: {len(resolved)}  aliased values: {aliased}")
+        print(f"Cycles: {len(cycles)}")
+        for cycle in cycles:
+            print("  " + " -> ".join(resolver.name(v) for v in cycle + cycle[:1]))
+        print(f"Dangling aliases: {len(dangling)}")
+        for vid, mid, target in dangling:
+            mode = resolver.mode_meta.get(mid, {}).get("modeName", mid)
+            print(f"  {resolver.name(vid)} [{mode}] -> {target}")
+    return 1 if cycles or dangling else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Diff two Figma variable snapshots by variable id.
+
+Either side may be a raw payload (variables.raw.json), a rollback file, or
+`@<ISO time>` for the snapshot_store entry current at that time. By default
+the current variables.raw.json is compared with the newest rollback snapshot.
+
+Reported:
+
+- added / removed variables
+- renamed variables (same id, new name or collection)
+- alias retargets per mode (alias → other alias, alias ↔ literal); each says
+  whether the resolved value moved, so flattening an alias to the value it
+  already had is told apart from a real edit
+- changed literal values per mode; colors are compared as OKLab ΔE
+  (vectorized over every common color) and changes below --threshold count
+  as float noise, FLOAT values below --float-threshold likewise
+
+    python3 scripts/variable_diff.py [OLD] [NEW] [--threshold 0.002] [--json] [--fail-on-change]
+"""
+import argparse
+import json
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+from token_colors import srgb_to_oklab
+from variable_aliases import RAW_PATH, AliasResolver, is_alias, payload_meta, rgba_to_css_one
+from variable_store import rgba_to_css
+
+ROLLBACK_DIR = RAW_PATH.parent
+
+# OKLab distance below which a color edit is float noise (a visible step is ~0.02)
+DEFAULT_THRESHOLD = 0.002
+DEFAULT_FLOAT_THRESHOLD = 1e-6
+ALPHA_STEP = 1 / 255
+
+Snapshot = namedtuple("Snapshot", "label variables collections modes resolver")
+
+
+def _snapshot(label, meta):
+    collections = meta.get("variableCollections", {})
+    modes = {m["modeId"]: m["name"] for c in collections.values() for m in c.get("modes", [])}
+    return Snapshot(label, meta.get("variables", {}), collections, modes, AliasResolver(meta))
+
+
+def load_snapshot(source):
+    """Snapshot from a file path or '@<time>' (snapshot store)."""
+    if source.startswith("@"):
+        from snapshot_store import SnapshotStore
+
+        store = SnapshotStore()
+        entry = store.find(source[1:])
+        return _snapshot(f"store@{entry['capturedAt']}", payload_meta(store.payload(entry)))
+    return _snapshot(source, payload_meta(json.loads(Path(source).read_text())))
+
+
+def latest_rollback():
+    files = sorted(ROLLBACK_DIR.glob("rollback-*.json"))
+    return str(files[-1]) if files else None
+
+
+def _qualified(snapshot, var):
+    collection = snapshot.collections.get(var.get("variableCollectionId"), {}).get("name", "")
+    return f"{collection}/{var.get('name', '')}"
+
+
+def _rgba(value):
+    return (value.get("r", 0), value.get("g", 0), value.get("b", 0), value.get("a", 1))
+
+
+def _is_color(value):
+    return isinstance(value, dict) and "r" in value
+
+
+def _show(value, snapshot):
+    """Readable form of a raw mode value."""
+    if is_alias(value):
+        target = snapshot.variables.get(value["id"])
+        return f"→ {target['name']}" if target else f"→ {value['id']} (missing)"
+    if _is_color(value):
+        return rgba_to_css_one(_rgba(value))
+    return value
+
+
+def _same_value(a, b, threshold, float_threshold):
+    if _is_color(a) and _is_color(b):
+        lab = srgb_to_oklab(np.array([_rgba(a)[:3], _rgba(b)[:3]]))
+        return np.linalg.norm(lab[0] - lab[1]) < threshold and abs(_rgba(a)[3] - _rgba(b)[3]) < ALPHA_STEP
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return abs(a - b) < float_threshold
+    return a == b
+
+
+def diff(old, new, threshold=DEFAULT_THRESHOLD, float_threshold=DEFAULT_FLOAT_THRESHOLD):
+    """Report dict comparing two Snapshots."""
+    added = [vid for vid in new.variables if vid not in old.variables]
+    removed = [vid for vid in old.variables if vid not in new.variables]
+    renamed, retargets, changed = [], [], []
+    colors = []   # (vid, mode, old rgba, new rgba)
+    floats = []   # (vid, mode, old, new)
+
+    for vid, var in new.variables.items():
+        before = old.variables.get(vid)
+        if before is None:
+            continue
+        old_name, new_name = _qualified(old, before), _qualified(new, var)
+        if old_name != new_name:
+            renamed.append({"id": vid, "old": old_name, "new": new_name})
+        old_modes, new_modes = before.get("valuesByMode", {}), var.get("valuesByMode", {})
+        for mode in new_modes.keys() | old_modes.keys():
+            a, b = old_modes.get(mode), new_modes.get(mode)
+            if a == b:
+                continue
+            if is_alias(a) or is_alias(b):
+                resolved_a = old.resolver.resolve(vid, mode).value if a is not None else None
+                resolved_b = new.resolver.resolve(vid, mode).value if b is not None else None
+                retargets.append({
+                    "id": vid, "name": var.get("name"), "mode": mode,
+                    "old": _show(a, old), "new": _show(b, new),
+                    "valueChanged": not _same_value(resolved_a, resolved_b, threshold, float_threshold),
+                })
+            elif _is_color(a) and _is_color(b):
+                colors.append((vid, mode, _rgba(a), _rgba(b)))
+            elif isinstance(a, (int, float)) and isinstance(b, (int, float)) \
+                    and not isinstance(a, bool) and not isinstance(b, bool):
+                floats.append((vid, mode, a, b))
+            else:
+                changed.append({
+                    "id": vid, "name": var.get("name"), "mode": mode,
+                    "old": _show(a, old), "new": _show(b, new),
+                })
+
+    suppressed = 0
+    if colors:
+        before = np.array([c[2] for c in colors], dtype=np.float64)
+        after = np.array([c[3] for c in colors], dtype=np.float64)
+        delta_e = np.linalg.norm(srgb_to_oklab(after[:, :3]) - srgb_to_oklab(before[:, :3]), axis=1)
+        alpha = np.abs(after[:, 3] - before[:, 3])
+        keep = (delta_e >= threshold) | (alpha >= ALPHA_STEP)
+        suppressed += int((~keep).sum())
+        old_css, new_css = rgba_to_css(before), rgba_to_css(after)
+        for i in np.flatnonzero(keep):
+            vid, mode = colors[i][:2]
+            changed.append({
+                "id": vid, "name": new.variables[vid].get("name"), "mode": mode,
+                "old": old_css[i], "new": new_css[i], "deltaE": round(float(delta_e[i]), 4),
+            })
+    if floats:
+        before = np.array([f[2] for f in floats], dtype=np.float64)
+        after = np.array([f[3] for f in floats], dtype=np.float64)
+        keep = np.abs(after - before) >= float_threshold
+        suppressed += int((~keep).sum())
+        for i in np.flatnonzero(keep):
+            vid, mode, a, b = floats[i]
+            changed.append({"id": vid, "name": new.variables[vid].get("name"), "mode": mode, "old": a, "new": b})
+
+    for item in retargets + changed:
+        item["modeName"] = new.modes.get(item["mode"], old.modes.get(item["mode"], item["mode"]))
+    changed.sort(key=lambda c: (c["name"] or "", c["modeName"]))
+    retargets.sort(key=lambda c: (c["name"] or "", c["modeName"]))
+
+    def brief(snapshot, vid):
+        var = snapshot.variables[vid]
+        return {"id": vid, "name": _qualified(snapshot, var), "type": var.get("resolvedType")}
+
+    return {
+        "old": old.label,
+        "new": new.label,
+        "summary": {
+            "added": len(added),
+            "removed": len(removed),
+            "renamed": len(renamed),
+            "aliasRetargets": len(retargets),
+            "retargetsChangingValue": sum(r["valueChanged"] for r in retargets),
+            "changed": len(changed),
+            "suppressed": suppressed,
+        },
+        "added": [brief(new, vid) for vid in added],
+        "removed": [brief(old, vid) for vid in removed],
+        "renamed": renamed,
+        "aliasRetargets": retargets,
+        "changed": changed,
+    }
+
+
+def has_changes(report):
+    s = report["summary"]
+    return any(s[k] for k in ("added", "removed", "renamed", "aliasRetargets", "changed"))
+
+
+def print_report(report, limit):
+    s = report["summary"]
+    print(f"{report['old']} → {report['new']}")
+    print(
+        f"  {s['added']} added, {s['removed']} removed, {s['renamed']} renamed, "
+        f"{s['aliasRetargets']} alias retargets ({s['retargetsChangingValue']} change the value), "
+        f"{s['changed']} values changed "
+        f"({s['suppressed']} below threshold)"
+    )
+
+    def section(title, rows, fmt):
+        if not rows:
+            return
+        print(f"\n{title}:")
+        for row in rows[:limit]:
+            print("  " + fmt(row))
+        if len(rows) > limit:
+            print(f"  … {len(rows) - limit} more")
+
+    section("Added", report["added"], lambda r: f"+ {r['name']} ({r['type']})")
+    section("Removed", report["removed"], lambda r: f"- {r['name']} ({r['type']})")
+    section("Renamed", report["renamed"], lambda r: f"{r['old']} → {r['new']}")
+    section("Alias retargets", report["aliasRetargets"],
+            lambda r: f"{r['name']} [{r['modeName']}]: {r['old']}  ⇒  {r['new']}"
+                      + ("" if r["valueChanged"] else "  (same value)"))
+    section("Changed", report["changed"], lambda r: (
+        f"{r['name']} [{r['modeName']}]: {r['old']} → {r['new']}"
+        + (f"  ΔE {r['deltaE']:.3f}" if "deltaE" in r else "")
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two Figma variable snapshots.")
+    parser.add_argument("old", nargs="?", help="older snapshot (default: newest tokens/figma/rollback-*.json)")
+    parser.add_argument("new", nargs="?", default=str(RAW_PATH), help="newer snapshot (default: variables.raw.json)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"OKLab ΔE below which color edits are ignored (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--float-threshold", type=float, default=DEFAULT_FLOAT_THRESHOLD)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--limit", type=int, default=50, help="rows per section in the text report")
+    parser.add_argument("--fail-on-change", action="store_true", help="exit 1 when anything changed")
+    args = parser.parse_args()
+
+    old_source = args.old or latest_rollback()
+    if old_source is None:
+        parser.error("no OLD snapshot given and no tokens/figma/rollback-*.json found")
+    try:
+        old, new = load_snapshot(old_source), load_snapshot(args.new)
+    except (OSError, ValueError, LookupError) as exc:
+        parser.error(str(exc))
+
+    report = diff(old, new, args.threshold, args.float_threshold)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report, args.limit)
+    return 1 if args.fail_on_change and has_changes(report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Segment trie over `/`-separated Figma variable names with glob queries.
+
+Names are indexed under their collection, e.g. `Color/Background/Brand/Default`.
+Pattern segments are matched case-insensitively:
+
+    Background/Brand/Default    exact name
+    Background/*/Default        `*`, `?` and `[...]` match within one segment
+    Background/Brand/**         `**` matches zero or more segments
+    **/800                      any name ending in `800`
+
+Patterns match names in every collection unless `collection` is given, or
+`qualified=True` makes the first segment match the collection name
+(`color/*/brand/**`). Literal segments are dict lookups, so a query touches
+only the branches it can match instead of scanning every variable.
+
+    python3 scripts/variable_names.py 'Background/Brand/**' [--collection Color] [--type COLOR]
+"""
+import argparse
+import json
+import sys
+from fnmatch import fnmatchcase
+from pathlib import Path
+
+from variable_aliases import RAW_PATH, payload_meta
+
+_GLOB_CHARS = set("*?[")
+
+
+class _Node:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children = {}
+        self.ids = []
+
+
+def split_name(name):
+    return [segment.strip().lower() for segment in name.split("/")]
+
+
+class VariableNameIndex:
+    """Collection-rooted trie of variable names → variable ids."""
+
+    def __init__(self, meta):
+        self.variables = meta.get("variables", {})
+        collections = meta.get("variableCollections", {})
+        self.collection_names = {cid: c.get("name", cid) for cid, c in collections.items()}
+        self.root = _Node()
+        for vid, var in self.variables.items():
+            collection = self.collection_names.get(var.get("variableCollectionId"), "")
+            node = self.root
+            for segment in [collection.lower()] + split_name(var.get("name", "")):
+                node = node.children.setdefault(segment, _Node())
+            node.ids.append(vid)
+
+    @classmethod
+    def from_file(cls, path=RAW_PATH):
+        return cls(payload_meta(json.loads(Path(path).read_text())))
+
+    def query(self, pattern, collection=None, types=None, qualified=False):
+        """Variable ids whose name matches `pattern`, in index order."""
+        segments = split_name(pattern)
+        if not qualified:
+            segments = [collection.lower() if collection else "*"] + segments
+        elif collection:
+            raise ValueError("pass either collection or a qualified pattern")
+        types = {t.upper() for t in types} if types else None
+
+        out = []
+        seen = set()
+        for vid in self._match(self.root, segments, 0, set()):
+            if vid in seen:
+                continue
+            seen.add(vid)
+            if types and self.variables[vid].get("resolvedType") not in types:
+                continue
+            out.append(vid)
+        return out
+
+    def prefix(self, prefix, **filters):
+        """Variable ids under a name prefix (`Background/Brand` → `Background/Brand/**`)."""
+        return self.query(prefix.rstrip("/") + "/**", **filters)
+
+    def _match(self, node, segments, i, visited):
+        key = (id(node), i)
+        if key in visited:  # `**` can reach the same state along several paths
+            return
+        visited.add(key)
+        if i == len(segments):
+            yield from node.ids
+            return
+        segment = segments[i]
+        if segment == "**":
+            yield from self._match(node, segments, i + 1, visited)
+            for child in node.children.values():
+                yield from self._match(child, segments, i, visited)
+        elif _GLOB_CHARS.intersection(segment):
+            for name, child in node.children.items():
+                if fnmatchcase(name, segment):
+                    yield from self._match(child, segments, i + 1, visited)
+        else:
+            child = node.children.get(segment)
+            if child is not None:
+                yield from self._match(child, segments, i + 1, visited)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query Figma variables by name pattern.")
+    parser.add_argument("pattern", help="e.g. 'Background/Brand/**' or '**/800'")
+    parser.add_argument("--path", type=Path, default=RAW_PATH, help="raw variables file")
+    parser.add_argument("--collection", help="only this collection (by name)")
+    parser.add_argument("--type", action="append", dest="types",
+                        help="COLOR, FLOAT, STRING or BOOLEAN (repeatable)")
+    parser.add_argument("--qualified", action="store_true",
+                        help="the first pattern segment is the collection name")
+    parser.add_argument("--ids", action="store_true", help="print variable ids only")
+    args = parser.parse_args()
+
+    index = VariableNameIndex.from_file(args.path)
+    try:
+        ids = index.query(args.pattern, collection=args.collection,
+                          types=args.types, qualified=args.qualified)
+    except ValueError as exc:
+        parser.error(str(exc))
+    for vid in ids:
+        if args.ids:
+            print(vid)
+            continue
+        var = index.variables[vid]
+        collection = index.collection_names.get(var.get("variableCollectionId"), "?")
+        print(f"{vid:<28} {var.get('resolvedType', '?'):<8} {collection} / {var.get('name')}")
+    return 0 if ids else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
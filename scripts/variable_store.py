@@ -0,0 +1,252 @@
+"""
+Columnar, NumPy-backed store of the resolved values in variables.raw.json.
+
+The nested payload is walked once (aliases resolved with AliasResolver) and
+kept as flat columns:
+
+- names / ids: interned strings, `row` looks a variable up by either
+- type_codes (int8 into TYPES) and collection_codes (int16 into collection_ids)
+- colors: (N_color, modes, 4) float32 RGBA, NaN where a mode has no value
+- floats: (N_float, modes) float64, NaN when missing
+- strings: (N_string, modes) object, None when missing
+- booleans: (N_boolean, modes) int8, -1 when missing
+
+`slots[row]` is a variable's row in its type's array. Mode columns are a
+collection's modes in order (`mode_slot` maps a mode id to its column), so
+`modes` is the widest collection. Hex / rgba() / oklch() conversion is
+vectorized and rounds like rgbaToCss() in figma-lib.mjs (Math.round(x * 255)).
+
+Requires numpy.
+
+    python3 scripts/variable_store.py [variables.raw.json] [--mode "SDS Dark"] [--format oklch]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from token_colors import srgb_to_oklab
+from variable_aliases import RAW_PATH, AliasResolver, payload_meta
+
+TYPES = ("COLOR", "FLOAT", "STRING", "BOOLEAN")
+TYPE_CODES = {name: code for code, name in enumerate(TYPES)}
+
+_HEX_BYTES = np.array([f"{i:02x}" for i in range(256)])
+
+
+def to_255(rgba):
+    """Channel floats → uint8 the way figma-lib rounds: clamp(Math.round(x * 255))."""
+    return np.clip(np.floor(np.asarray(rgba, dtype=np.float64) * 255 + 0.5), 0, 255).astype(np.uint8)
+
+
+def rgba_to_hex(rgba, alpha=False):
+    """(…, 4) RGBA → array of '#rrggbb' strings ('#rrggbbaa' with alpha=True)."""
+    channels = to_255(rgba)[..., : 4 if alpha else 3]
+    out = np.full(channels.shape[:-1], "#", dtype=object)
+    for i in range(channels.shape[-1]):
+        out = out + _HEX_BYTES[channels[..., i]].astype(object)
+    return out
+
+
+def rgba_to_css(rgba):
+    """(…, 4) RGBA → CSS values exactly as rgbaToCss(): hex when opaque, else rgba().
+
+    variable_aliases.rgba_to_css_one formats a single color without NumPy.
+    """
+    rgba = np.asarray(rgba, dtype=np.float64)
+    ints = to_255(rgba[..., :3]).astype(object)
+    alpha = np.char.mod("%.2f", np.round(rgba[..., 3], 2)).astype(object)
+    translucent = (
+        "rgba(" + ints[..., 0].astype(str).astype(object) + ", "
+        + ints[..., 1].astype(str).astype(object) + ", "
+        + ints[..., 2].astype(str).astype(object) + ", " + alpha + ")"
+    )
+    return np.where(rgba[..., 3] >= 0.999, rgba_to_hex(rgba), translucent)
+
+
+def rgba_to_oklch(rgba):
+    """(…, 4) RGBA → (…, 4) float array of L (0..1), C, hue in degrees, alpha."""
+    rgba = np.asarray(rgba, dtype=np.float64)
+    lab = srgb_to_oklab(rgba[..., :3])
+    chroma = np.hypot(lab[..., 1], lab[..., 2])
+    hue = np.degrees(np.arctan2(lab[..., 2], lab[..., 1])) % 360
+    return np.stack([lab[..., 0], chroma, hue, rgba[..., 3]], axis=-1)
+
+
+def _fmt(fmt, values):
+    return np.char.mod(fmt, values).astype(object)
+
+
+def oklch_css(rgba):
+    """(…, 4) RGBA → 'oklch(L% C H)' strings, with ' / A' when translucent."""
+    lch = rgba_to_oklch(rgba)
+    alpha = np.where(lch[..., 3] < 0.999, _fmt(" / %.2f", lch[..., 3]), "")
+    return (
+        "oklch(" + _fmt("%.2f%%", lch[..., 0] * 100) + " " + _fmt("%.4f", lch[..., 1])
+        + " " + _fmt("%.2f", lch[..., 2]) + alpha + ")"
+    )
+
+
+class VariableStore:
+    """Resolved variable values of one raw payload, stored column-wise."""
+
+    def __init__(self, meta):
+        resolver = AliasResolver(meta)
+        self.collection_ids = [sys.intern(cid) for cid in resolver.collections]
+        collection_index = {cid: code for code, cid in enumerate(self.collection_ids)}
+        self.collection_modes = [
+            [sys.intern(m["modeId"]) for m in resolver.collections[cid].get("modes", [])]
+            for cid in self.collection_ids
+        ]
+        self.mode_names = {mid: info["modeName"] for mid, info in resolver.mode_meta.items()}
+        self._mode_slots = {
+            mid: (code, slot)
+            for code, modes in enumerate(self.collection_modes)
+            for slot, mid in enumerate(modes)
+        }
+        self._collection_index = collection_index
+        # (mode name, collection code or None) → first mode id with that name
+        self._mode_ids = {}
+        for mid, mode_name in self.mode_names.items():
+            self._mode_ids.setdefault((mode_name, None), mid)
+            if mid in self._mode_slots:
+                self._mode_ids.setdefault((mode_name, self._mode_slots[mid][0]), mid)
+        width = max((len(modes) for modes in self.collection_modes), default=0)
+
+        variables = resolver.variables
+        n = len(variables)
+        self.ids = []
+        self.names = []
+        self.type_codes = np.full(n, -1, dtype=np.int8)
+        self.collection_codes = np.full(n, -1, dtype=np.int16)
+        self.slots = np.full(n, -1, dtype=np.int32)
+        counts = [0] * len(TYPES)
+        for row, (vid, var) in enumerate(variables.items()):
+            self.ids.append(sys.intern(vid))
+            self.names.append(sys.intern(var.get("name", "")))
+            code = TYPE_CODES.get(var.get("resolvedType"), -1)
+            self.type_codes[row] = code
+            self.collection_codes[row] = collection_index.get(var.get("variableCollectionId"), -1)
+            if code >= 0:
+                self.slots[row] = counts[code]
+                counts[code] += 1
+
+        self.colors = np.full((counts[0], width, 4), np.nan, dtype=np.float32)
+        self.floats = np.full((counts[1], width), np.nan, dtype=np.float64)
+        self.strings = np.full((counts[2], width), None, dtype=object)
+        self.booleans = np.full((counts[3], width), -1, dtype=np.int8)
+
+        for row in range(n):
+            code, slot, cc = self.type_codes[row], self.slots[row], self.collection_codes[row]
+            if code < 0 or cc < 0:
+                continue
+            for col, mid in enumerate(self.collection_modes[cc]):
+                value = resolver.resolve(self.ids[row], mid).value
+                if value is None:
+                    continue
+                if code == 0 and isinstance(value, dict):
+                    self.colors[slot, col] = (
+                        value.get("r", 0), value.get("g", 0), value.get("b", 0), value.get("a", 1)
+                    )
+                elif code == 1 and isinstance(value, (int, float)):
+                    self.floats[slot, col] = value
+                elif code == 2:
+                    self.strings[slot, col] = str(value)
+                elif code == 3:
+                    self.booleans[slot, col] = bool(value)
+
+        self._rows = {}
+        for row, (vid, name) in enumerate(zip(self.ids, self.names)):
+            self._rows[vid] = row
+            self._rows.setdefault(name, row)
+
+    @classmethod
+    def from_file(cls, path=RAW_PATH):
+        return cls(payload_meta(json.loads(Path(path).read_text())))
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the NumPy columns (interned strings not counted)."""
+        arrays = (self.type_codes, self.collection_codes, self.slots,
+                  self.colors, self.floats, self.strings, self.booleans)
+        return sum(a.nbytes for a in arrays)
+
+    def row(self, key):
+        """Row of a variable id or name (first variable with that name)."""
+        return self._rows[key]
+
+    def mode_slot(self, mode_id):
+        """(collection code, column) of a mode id."""
+        return self._mode_slots[mode_id]
+
+    def mode_id(self, name, collection=None):
+        """Mode id by mode name, optionally within one collection id."""
+        code = None if collection is None else self._collection_index.get(collection, -1)
+        try:
+            return self._mode_ids[name, code]
+        except KeyError:
+            raise KeyError(name) from None
+
+    def rows_of(self, type_name, mode_id=None):
+        """Rows of one resolved type, limited to the mode's collection when given."""
+        mask = self.type_codes == TYPE_CODES[type_name]
+        if mode_id is not None:
+            mask &= self.collection_codes == self._mode_slots[mode_id][0]
+        return np.flatnonzero(mask)
+
+    def value(self, key, mode_id):
+        """Resolved value of one variable in one of its collection's modes."""
+        row = self.row(key)
+        code, slot = self.type_codes[row], self.slots[row]
+        cc, col = self._mode_slots[mode_id]
+        if cc != self.collection_codes[row]:
+            raise KeyError(f"{key} has no mode {mode_id}")
+        if code == 0:
+            rgba = self.colors[slot, col]
+            return None if np.isnan(rgba[0]) else rgba
+        if code == 1:
+            number = self.floats[slot, col]
+            return None if np.isnan(number) else float(number)
+        if code == 2:
+            return self.strings[slot, col]
+        flag = self.booleans[slot, col]
+        return None if flag < 0 else bool(flag)
+
+    def colors_in_mode(self, mode_id):
+        """(rows, (M, 4) RGBA) of the colors defined in a mode."""
+        rows = self.rows_of("COLOR", mode_id)
+        rgba = self.colors[self.slots[rows], self._mode_slots[mode_id][1]]
+        keep = ~np.isnan(rgba[:, 0])
+        return rows[keep], rgba[keep]
+
+
+FORMATS = {"hex": rgba_to_css, "oklch": oklch_css}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize or dump the columnar variable store.")
+    parser.add_argument("path", nargs="?", type=Path, default=RAW_PATH)
+    parser.add_argument("--mode", help="mode name or id whose colors to print")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="hex",
+                        help="hex prints figma-lib CSS values (hex or rgba())")
+    args = parser.parse_args()
+
+    store = VariableStore.from_file(args.path)
+    counts = {name: int((store.type_codes == code).sum()) for code, name in enumerate(TYPES)}
+    print(f"Variables: {len(store)}  {counts}  modes per collection: <= {store.colors.shape[1]}")
+    print(f"Column memory: {store.nbytes / 1024:.1f} KiB")
+    if not args.mode:
+        return
+    mode_id = args.mode if args.mode in store.mode_names else store.mode_id(args.mode)
+    rows, rgba = store.colors_in_mode(mode_id)
+    for row, css in zip(rows, FORMATS[args.format](rgba)):
+        print(f"  {store.names[row]:<48} {css}")
+
+
+if __name__ == "__main__":
+    main()
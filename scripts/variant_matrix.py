@@ -0,0 +1,130 @@
+"""
+Variant matrix of a Figma component set: axes x values with a bitmap of the
+combinations that exist.
+
+Variants are added one at a time (a single pass over the inventory). Axes are
+the union of every variant's `variantProperties` keys in first-seen order; a
+variant without an axis counts as the value "". finish() lays the axes out
+as a mixed-radix index and sets one bit per existing combination, which
+gives missing combinations, duplicates and per-axis cardinality.
+"""
+import itertools
+
+# Cap on missing / duplicate combinations listed per set (counts are exact)
+MAX_LISTED = 1000
+
+
+class VariantMatrix:
+    def __init__(self, name):
+        self.name = name
+        self.axes = {}   # axis -> {value: code}
+        self.rows = []   # one {axis: value code} per variant
+        self.ids = []
+        self._finished = None
+
+    def add(self, props, node_id=None):
+        row = {}
+        for axis, value in (props or {}).items():
+            values = self.axes.setdefault(axis, {})
+            row[axis] = values.setdefault(value, len(values))
+        self.rows.append(row)
+        self.ids.append(node_id)
+        self._finished = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def finish(self):
+        """Axis order, per-axis values, radix strides, bitmap and duplicate groups."""
+        if self._finished:
+            return self._finished
+        axes = list(self.axes)
+        values = []
+        absent = []
+        for axis in axes:
+            vals = list(self.axes[axis])
+            if "" not in vals and any(axis not in row for row in self.rows):
+                vals.append("")  # variants without this axis
+            values.append(vals)
+            absent.append(vals.index("") if "" in vals else None)
+        strides = []
+        size = 1
+        for vals in reversed(values):
+            strides.append(size)
+            size *= len(vals)
+        strides.reverse()
+
+        bitmap = bytearray((size + 7) // 8)
+        groups = {}
+        for i, row in enumerate(self.rows):
+            index = 0
+            for a, axis in enumerate(axes):
+                code = row.get(axis)
+                index += strides[a] * (absent[a] if code is None else code)
+            byte, bit = divmod(index, 8)
+            if bitmap[byte] >> bit & 1:
+                groups.setdefault(index, []).append(i)
+            else:
+                bitmap[byte] |= 1 << bit
+                groups[index] = [i]
+        self._finished = (axes, values, strides, size, bitmap, groups)
+        return self._finished
+
+    def _combo(self, index):
+        axes, values, strides, _, _, _ = self.finish()
+        return {axis: values[a][index // strides[a] % len(values[a])] for a, axis in enumerate(axes)}
+
+    @property
+    def combinations(self):
+        return self.finish()[3]
+
+    def axis_values(self):
+        """{axis: sorted values}, "" included when some variant lacks the axis."""
+        axes, values, _, _, _, _ = self.finish()
+        return {axis: sorted(values[a], key=str) for a, axis in enumerate(axes)}
+
+    def cardinality(self):
+        axes, values, _, _, _, _ = self.finish()
+        return {axis: len(values[a]) for a, axis in enumerate(axes)}
+
+    def present_count(self):
+        return len(self.finish()[5])
+
+    def iter_missing(self):
+        """Combinations with no variant, in index order."""
+        _, _, _, size, bitmap, _ = self.finish()
+        for byte_index, byte in enumerate(bitmap):
+            if byte == 0xFF:
+                continue
+            for bit in range(8):
+                index = byte_index * 8 + bit
+                if index < size and not byte >> bit & 1:
+                    yield self._combo(index)
+
+    def duplicates(self):
+        """[(combination, [node ids])] for combinations held by more than one variant."""
+        axes, _, _, _, _, groups = self.finish()
+        if not axes:
+            return []  # not a variant set: nothing to compare
+        return [
+            (self._combo(index), [self.ids[i] for i in rows])
+            for index, rows in groups.items() if len(rows) > 1
+        ]
+
+    def to_json(self, max_listed=MAX_LISTED):
+        size = self.combinations
+        missing = list(itertools.islice(self.iter_missing(), max_listed))
+        duplicates = self.duplicates()
+        return {
+            "name": self.name,
+            "variants": len(self.rows),
+            "axes": self.axis_values(),
+            "cardinality": self.cardinality(),
+            "combinations": size,
+            "present": self.present_count(),
+            "missingCount": size - self.present_count(),
+            "missing": missing,
+            "duplicates": [
+                {"combination": combo, "ids": ids} for combo, ids in duplicates[:max_listed]
+            ],
+        }